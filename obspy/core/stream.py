@@ -9,26 +9,31 @@ Module for handling ObsPy Stream objects.
     (http://www.gnu.org/copyleft/lesser.html)
 """
 from glob import glob, has_magic
+from itertools import izip
 from obspy.core.trace import Trace
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile, getExampleFile
 from obspy.core.util.base import ENTRY_POINTS, _readFromPlugin, \
-    _getFunctionFromEntryPoint
+    _getFunctionFromEntryPoint, createEmptyDataChunk
 from obspy.core.util.decorator import uncompressFile, raiseIfMasked
 from pkg_resources import load_entry_point
 import cPickle
 import copy
 import fnmatch
-import math
+import multiprocessing
 import numpy as np
 import os
 import urllib2
 import warnings
 
 
+# filters which can be applied to 2-D arrays of traces with one trace per row
+BATCH_FILTERS = ['bandpass', 'bandstop', 'highpass', 'lowpass']
+
+
 def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
          endtime=None, nearest_sample=True, dtype=None, apply_calib=False,
-         **kwargs):
+         workers=None, lazy=False, **kwargs):
     """
     Read waveform files into an ObsPy Stream object.
 
@@ -71,6 +76,21 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     :type apply_calib: bool, optional
     :param apply_calib: Automatically applies the calibration factor
         ``trace.stats.calib`` for each trace, if set. Defaults to ``False``.
+    :type workers: int, optional
+    :param workers: Number of worker processes used to read multiple files
+        matching a wildcard pattern concurrently. The resulting traces are
+        always assembled in sorted file name order. Files which cannot be
+        read do not abort the whole read but are reported in a single
+        warning. Defaults to ``None`` which reads all files sequentially
+        within the current process.
+    :type lazy: bool, optional
+    :param lazy: If set to ``True``, only the headers of local files are read
+        and the data samples of each trace are read not before
+        ``trace.data`` is accessed for the first time. Trimming a lazy
+        trace before accessing its data restricts the data read from file to
+        the remaining time span. Requires a waveform plug-in supporting the
+        ``headonly`` option, e.g. ``"MSEED"``, ``"SAC"``, ``"GSE2"`` or
+        ``"SEGY"``. Defaults to ``False``.
     :param kwargs: Additional keyword arguments passed to the underlying
         waveform reader method.
     :return: An ObsPy :class:`~obspy.core.stream.Stream` object.
@@ -198,6 +218,21 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
         >>> print(st)  # doctest: +ELLIPSIS
         1 Trace(s) in Stream:
         .RJOB..Z | 2005-08-31T02:33:59.999999Z - ... | 200.0 Hz, 2001 samples
+
+    (7) Reading many local files concurrently using four worker processes.
+
+        >>> from obspy import read  # doctest: +SKIP
+        >>> st = read("/path/to/archive/*.mseed", workers=4)  # doctest: +SKIP
+
+    (8) Reading only headers and loading data samples on demand.
+
+        >>> from obspy import read
+        >>> st = read("/path/to/test.sac", lazy=True)
+        >>> print(st)  # doctest: +ELLIPSIS
+        1 Trace(s) in Stream:
+        .STA..Q | 1978-07-18T08:00:10.000000Z - ... | 1.0 Hz, 100 samples
+        >>> st[0].data  # doctest: +ELLIPSIS
+        array([ -8.74227766e-08,  -3.09016973e-01, ...
     """
     # add default parameters to kwargs so sub-modules may handle them
     kwargs['starttime'] = starttime
@@ -245,8 +280,21 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     else:
         # some file name
         pathname = pathname_or_url
-        for file in sorted(glob(pathname)):
-            st.extend(_read(file, format, headonly, **kwargs).traces)
+        files = sorted(glob(pathname))
+        # lazy reading requires only headers in the first place
+        read_headonly = headonly or lazy
+        if workers and workers > 1 and len(files) > 1:
+            traces_per_file = _readParallel(files, format, read_headonly,
+                                            workers, **kwargs)
+        else:
+            traces_per_file = (_read(file, format, read_headonly,
+                                     **kwargs).traces for file in files)
+        for file, traces in izip(files, traces_per_file):
+            if lazy and not headonly:
+                for i, trace in enumerate(traces):
+                    _setLazyLoader(trace, file, i, dtype=dtype,
+                                   apply_calib=apply_calib, **kwargs)
+            st.extend(traces)
         if len(st) == 0:
             # try to give more specific information why the stream is empty
             if has_magic(pathname) and not glob(pathname):
@@ -270,13 +318,17 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
         st._ltrim(starttime, nearest_sample=nearest_sample)
     if endtime:
         st._rtrim(endtime, nearest_sample=nearest_sample)
-    # convert to dtype if given
+    # convert to dtype if given - lazy traces are handled by their loader
     if dtype:
         for tr in st:
+            if tr.isLazy():
+                continue
             tr.data = np.require(tr.data, dtype)
     # applies calibration factor
     if apply_calib:
         for tr in st:
+            if tr.isLazy():
+                continue
             tr.data = tr.data * tr.stats.calib
     return st
 
@@ -294,6 +346,119 @@ def _read(filename, format=None, headonly=False, **kwargs):
     return stream
 
 
+def _setLazyLoader(trace, filename, index, **kwargs):
+    """
+    Turns a trace read with ``headonly=True`` into a lazy trace whose data
+    samples are read from given file on first access.
+
+    Traces without any samples in the header or traces for which the
+    plug-in returned data anyway are left untouched.
+    """
+    if trace.stats.npts == 0 or len(trace.data) != 0:
+        return
+    trace._lazy_loader = _LazyTraceLoader(filename, trace.stats._format,
+                                          index, **kwargs)
+    del trace.__dict__['data']
+
+
+class _LazyTraceLoader(object):
+    """
+    Reads the data samples of a single lazy trace.
+
+    The file is read using the format detected while reading the headers.
+    Only the time span given by the current header of the lazy trace is
+    requested from the waveform plug-in and the matching trace is cut out of
+    the result.
+    """
+    def __init__(self, filename, format, index, dtype=None, apply_calib=False,
+                 **kwargs):
+        self.filename = filename
+        self.format = format
+        self.index = index
+        self.dtype = dtype
+        self.apply_calib = apply_calib
+        for key in ['starttime', 'endtime', 'nearest_sample']:
+            kwargs.pop(key, None)
+        self.kwargs = kwargs
+
+    def __call__(self, trace):
+        """
+        Returns the data samples of given lazy trace.
+        """
+        stats = trace.stats
+        starttime = stats.starttime
+        endtime = stats.endtime
+        st = _read(self.filename, self.format, headonly=False,
+                   starttime=starttime, endtime=endtime, **self.kwargs)
+        # most plug-ins return the traces of a file always in the same order
+        candidates = st.traces
+        if self.index < len(candidates):
+            candidates = [candidates[self.index]] + candidates
+        tolerance = 0.5 * stats.delta
+        for tr in candidates:
+            if tr.id != trace.id or \
+               tr.stats.sampling_rate != stats.sampling_rate or \
+               tr.stats.starttime > starttime + tolerance or \
+               tr.stats.endtime < endtime - tolerance:
+                continue
+            tr.trim(starttime, endtime)
+            break
+        else:
+            msg = "Could not read data of lazy trace %s from file %s" % \
+                (trace.id, self.filename)
+            raise Exception(msg)
+        data = tr.data
+        if self.dtype:
+            data = np.require(data, self.dtype)
+        if self.apply_calib:
+            data = data * stats.calib
+        return data
+
+
+def _readWorker(args):
+    """
+    Reads a single file within a worker process of :func:`_readParallel`.
+
+    Exceptions are caught and returned as string, so a single broken file
+    will not abort the whole pool.
+    """
+    filename, format, headonly, kwargs = args
+    try:
+        traces = _read(filename, format, headonly, **kwargs).traces
+    except Exception, e:
+        return None, "%s: %s" % (e.__class__.__name__, e)
+    return traces, None
+
+
+def _readParallel(files, format=None, headonly=False, workers=2, **kwargs):
+    """
+    Reads multiple files concurrently using a pool of worker processes.
+
+    Returns a list containing the list of traces of each file in the order of
+    the given file list. Errors are collected per file and emitted as one
+    single warning.
+    """
+    jobs = [(file, format, headonly, kwargs) for file in files]
+    pool = multiprocessing.Pool(processes=workers)
+    try:
+        results = pool.map(_readWorker, jobs)
+    finally:
+        pool.close()
+        pool.join()
+    traces_per_file = []
+    errors = []
+    for file, (traces, error) in izip(files, results):
+        if error is not None:
+            errors.append("%s (%s)" % (file, error))
+            traces = []
+        traces_per_file.append(traces)
+    if errors:
+        msg = "Could not read %d of %d files:\n\t%s" % \
+            (len(errors), len(files), "\n\t".join(errors))
+        warnings.warn(msg, UserWarning)
+    return traces_per_file
+
+
 def _createExampleStream(headonly=False):
     """
     Create an example stream.
@@ -731,7 +896,7 @@ class Stream(object):
             msg = 'Extend only supports a list of Trace objects as argument.'
             raise TypeError(msg)
 
-    def getGaps(self, min_gap=None, max_gap=None):
+    def getGaps(self, min_gap=None, max_gap=None, as_array=False):
         """
         Returns a list of all trace gaps/overlaps of the Stream object.
 
@@ -739,6 +904,12 @@ class Stream(object):
             value is assumed to be in seconds. Defaults to None.
         :param max_gap: All gaps larger than this value will be omitted. The
             value is assumed to be in seconds. Defaults to None.
+        :type as_array: bool, optional
+        :param as_array: If ``True``, a NumPy structured array with the fields
+            ``'network'``, ``'station'``, ``'location'``, ``'channel'``,
+            ``'starttime'``, ``'endtime'``, ``'delta'`` and ``'samples'`` is
+            returned instead of a list. Start and end times of the gaps are
+            given as POSIX timestamps. Defaults to ``False``.
 
         The returned list contains one item in the following form for each gap/
         overlap: [network, station, location, channel, starttime of the gap,
@@ -774,49 +945,72 @@ class Stream(object):
         Source            Last Sample                 ...
         BW.RJOB..EHZ      2009-08-24T00:20:13.000000Z ...
         Total: 1 gap(s) and 0 overlap(s)
-        """
-        # Create shallow copy of the traces to be able to sort them later on.
-        copied_traces = copy.copy(self.traces)
-        self.sort()
+        >>> gaps = st.getGaps(as_array=True)
+        >>> print(gaps['channel'])
+        ['EHZ']
+        >>> print(gaps['samples'])
+        [99]
+        """
+        stats = [tr.stats for tr in self.traces]
+        keys = ['network', 'station', 'location', 'channel']
+        columns = [np.array([getattr(st, key) for st in stats] or [''])
+                   for key in keys]
+        dtype = [(key, column.dtype) for key, column in zip(keys, columns)]
+        dtype += [('starttime', 'f8'), ('endtime', 'f8'), ('delta', 'f8'),
+                  ('samples', 'i8')]
+        if len(stats) < 2:
+            if as_array:
+                return np.empty(0, dtype=dtype)
+            return []
+        starttimes = np.array([st.starttime.timestamp for st in stats])
+        endtimes = np.array([st.endtime.timestamp for st in stats])
+        sampling_rates = np.array([st.sampling_rate for st in stats])
+        deltas = np.array([st.delta for st in stats])
+        # sort by id, start- and endtime without touching the traces; lexsort
+        # is stable and uses the last key as primary sort key
+        order = np.lexsort([endtimes, starttimes] + columns[::-1])
+        left = order[:-1]
+        right = order[1:]
+        # only compare traces with the same network, station, location and
+        # channel
+        same = np.ones(len(left), dtype='bool')
+        for column in columns:
+            same &= column[left] == column[right]
+        gap = starttimes[right] - endtimes[left]
+        # check that any overlap is not larger than the trace coverage
+        coverage = endtimes[right] - starttimes[right]
+        gap = np.where((gap < 0) & (-gap > coverage), -coverage, gap)
+        # check gap/overlap criteria
+        if min_gap:
+            same &= ~(gap < min_gap)
+        if max_gap:
+            same &= ~(gap > max_gap)
+        # number of missing samples, rounding half away from zero like round()
+        product = np.abs(gap) * sampling_rates[left]
+        nsamples = np.floor(product + 0.5)
+        nsamples[nsamples - product > 0.5] -= 1
+        nsamples = nsamples.astype('i8')
+        # skip if is equal to delta (1 / sampling rate) - different sampling
+        # rates should always result in a gap or overlap
+        same &= ~((deltas[left] == deltas[right]) & (nsamples == 1))
+        nsamples = np.where(gap > 0, nsamples - 1, nsamples + 1)
+        idx = np.nonzero(same)[0]
+        if as_array:
+            gaps = np.empty(len(idx), dtype=dtype)
+            for key, column in zip(keys, columns):
+                gaps[key] = column[left[idx]]
+            gaps['starttime'] = endtimes[left[idx]]
+            gaps['endtime'] = starttimes[right[idx]]
+            gaps['delta'] = gap[idx]
+            gaps['samples'] = nsamples[idx]
+            return gaps
         gap_list = []
-        for _i in xrange(len(self.traces) - 1):
-            # skip traces with different network, station, location or channel
-            if self.traces[_i].id != self.traces[_i + 1].id:
-                continue
-            # different sampling rates should always result in a gap or overlap
-            if self.traces[_i].stats.delta == self.traces[_i + 1].stats.delta:
-                flag = True
-            else:
-                flag = False
-            stats = self.traces[_i].stats
-            stime = stats['endtime']
-            etime = self.traces[_i + 1].stats['starttime']
-            delta = etime.timestamp - stime.timestamp
-            # Check that any overlap is not larger than the trace coverage
-            if delta < 0:
-                temp = self.traces[_i + 1].stats['endtime'].timestamp - \
-                       etime.timestamp
-                if (delta * -1) > temp:
-                    delta = -1 * temp
-            # Check gap/overlap criteria
-            if min_gap and delta < min_gap:
-                continue
-            if max_gap and delta > max_gap:
-                continue
-            # Number of missing samples
-            nsamples = int(round(math.fabs(delta) * stats['sampling_rate']))
-            # skip if is equal to delta (1 / sampling rate)
-            if flag and nsamples == 1:
-                continue
-            elif delta > 0:
-                nsamples -= 1
-            else:
-                nsamples += 1
-            gap_list.append([stats['network'], stats['station'],
-                             stats['location'], stats['channel'],
-                             stime, etime, delta, nsamples])
-        # Set the original traces to not alter the stream object.
-        self.traces = copied_traces
+        for _i in idx:
+            st = stats[left[_i]]
+            gap_list.append([st['network'], st['station'], st['location'],
+                             st['channel'], st['endtime'],
+                             stats[right[_i]]['starttime'], float(gap[_i]),
+                             int(nsamples[_i])])
         return gap_list
 
     def insert(self, position, object):
@@ -1591,14 +1785,14 @@ class Stream(object):
                     "calibration factors!"
                 raise Exception(msg)
             #check paz factor
-            if trace.stats.has_key('paz') is True:
+            if 'paz' in trace.stats:
                 paz.setdefault(trace.id, trace.stats.paz)
                 if trace.stats.paz != paz[trace.id]:
                     msg = "Can't merge traces with same ids but differing " + \
                         "paz factors!"
                     raise Exception(msg)
             # check coordinates
-            if trace.stats.has_key('coordinates') is True:
+            if 'coordinates' in trace.stats:
                 coordinate.setdefault(trace.id, trace.stats.coordinates)
                 if trace.stats.coordinates != coordinate[trace.id]:
                     msg = "Can't merge traces with same ids but differing " + \
@@ -1678,14 +1872,22 @@ class Stream(object):
         self.traces = []
         # loop through ids
         for _id in traces_dict.keys():
-            cur_trace = traces_dict[_id].pop(0)
-            # loop through traces of same id
-            for _i in xrange(len(traces_dict[_id])):
-                trace = traces_dict[_id].pop(0)
-                # disable sanity checks because there are already done
-                cur_trace = cur_trace.__add__(trace, method,
-                    fill_value=fill_value, sanity_checks=False,
-                    interpolation_samples=interpolation_samples)
+            traces = traces_dict.pop(_id)
+            if len(traces) == 1:
+                self.traces.append(traces[0])
+                continue
+            # compute layout first, allocate once and copy every trace once
+            try:
+                cur_trace = _mergeTraces(traces, method, fill_value,
+                                         interpolation_samples)
+            except _MergeFallback:
+                cur_trace = traces.pop(0)
+                # loop through traces of same id
+                for trace in traces:
+                    # disable sanity checks because there are already done
+                    cur_trace = cur_trace.__add__(trace, method,
+                        fill_value=fill_value, sanity_checks=False,
+                        interpolation_samples=interpolation_samples)
             self.traces.append(cur_trace)
 
         # trying to restore order, newly created traces are placed at
@@ -1843,9 +2045,41 @@ class Stream(object):
             st = read()
             st.filter("highpass", freq=1.0)
             st.plot()
+
+        .. note::
+
+            Traces sharing sampling rate and number of samples are stacked
+            into a 2-D array for the Butterworth filters, so the filter is
+            designed only once and applied to all these traces in one go.
         """
+        type = type.lower()
+        if type not in BATCH_FILTERS or len(self) < 2:
+            for tr in self:
+                tr.filter(type, **options)
+            return
+        func = _getFunctionFromEntryPoint('filter', type)
+        # group traces with same sampling rate and number of samples
+        groups = {}
         for tr in self:
-            tr.filter(type, **options)
+            if isinstance(tr.data, np.ma.masked_array) or \
+               tr.data.dtype.kind not in 'biuf':
+                tr.filter(type, **options)
+                continue
+            key = (tr.stats.sampling_rate, len(tr.data))
+            groups.setdefault(key, []).append(tr)
+        proc_info = "filter:%s:%s" % (type, options)
+        for (df, npts), traces in groups.iteritems():
+            if len(traces) == 1:
+                traces[0].filter(type, **options)
+                continue
+            block = np.empty((len(traces), npts), dtype='float64')
+            for i, tr in enumerate(traces):
+                block[i] = tr.data
+            block = func(block, df=df, **options)
+            # rows of the filtered block are assigned as views
+            for tr, data in izip(traces, block):
+                tr.data = data
+                tr._addProcessingInfo(proc_info)
 
     def trigger(self, type, **options):
         """
@@ -2534,6 +2768,191 @@ class Stream(object):
         return new_stream
 
 
+class _MergeFallback(Exception):
+    """
+    Raised by :func:`_mergeTraces` for rare layouts which are handled by
+    successively adding traces via :meth:`~obspy.core.trace.Trace.__add__`.
+    """
+    pass
+
+
+def _mergeLayout(traces, method, interpolation_samples):
+    """
+    Computes the gap/overlap layout of sorted traces with the same id.
+
+    Returns a list with one ``(case, position, delta)`` tuple per trace
+    (starting with the second one) and the number of samples of the merged
+    trace. All positions refer to the sample index within the merged trace,
+    exactly as they would result from folding the traces pairwise using
+    :meth:`~obspy.core.trace.Trace.__add__`.
+    """
+    first = traces[0]
+    starttime = first.stats.starttime
+    sr = first.stats.sampling_rate
+    try:
+        dt = 1.0 / float(sr)
+    except ZeroDivisionError:
+        dt = 0
+    npts = len(first)
+    layout = []
+    for trace in traces[1:]:
+        if npts == 0:
+            endtime = starttime
+        else:
+            endtime = starttime + (npts - 1) * dt
+        lenrt = len(trace)
+        delta = int(round((trace.stats.starttime - endtime) * sr)) - 1
+        delta_endtime = endtime - trace.stats.endtime
+        if delta < 0 and delta_endtime < 0:
+            # overlap
+            delta = abs(delta)
+            if delta > lenrt:
+                raise _MergeFallback
+            pos = npts - delta
+            if method == 1 and interpolation_samples >= -1:
+                if interpolation_samples == -1 or \
+                   interpolation_samples > delta:
+                    samples = delta
+                else:
+                    samples = interpolation_samples
+                if samples >= lenrt:
+                    # contained trace, see Trace.__add__
+                    layout.append(('overlap', pos, delta))
+                    continue
+            npts = pos + lenrt
+            layout.append(('overlap', pos, delta))
+        elif delta < 0 and delta_endtime >= 0:
+            # contained trace
+            pos = npts - abs(delta)
+            if pos + lenrt > npts:
+                raise _MergeFallback
+            layout.append(('contained', pos, lenrt))
+        elif delta == 0:
+            # exact fit
+            layout.append(('fit', npts, 0))
+            npts += lenrt
+        else:
+            # gap
+            layout.append(('gap', npts, delta))
+            npts += delta + lenrt
+    return layout, npts
+
+
+def _mergeTraces(traces, method=0, fill_value=None, interpolation_samples=0):
+    """
+    Merges sorted traces with the same id into a single new trace.
+
+    The result is identical to folding the traces pairwise using
+    :meth:`~obspy.core.trace.Trace.__add__`, but the layout of the merged
+    trace is computed first. Thus the output array is allocated only once
+    (with a mask only if required) and every trace is copied exactly once.
+    Raises :class:`_MergeFallback` for layouts which can't be handled this
+    way.
+    """
+    first = traces[0]
+    layout, npts = _mergeLayout(traces, method, interpolation_samples)
+    dtype = first.data.dtype
+    data = np.empty(npts, dtype=dtype)
+    # state of the merged trace: number of valid samples and mask
+    state = {'npts': 0, 'mask': None}
+
+    def getMask():
+        if state['mask'] is None:
+            state['mask'] = np.zeros(npts, dtype='bool')
+        return state['mask']
+
+    def isMasked(i):
+        return state['mask'] is not None and state['mask'][i]
+
+    def put(pos, values):
+        end = pos + len(values)
+        if isinstance(values, np.ma.masked_array):
+            data[pos:end] = values.data
+            getMask()[pos:end] = np.ma.getmaskarray(values)
+        else:
+            data[pos:end] = values
+            if state['mask'] is not None:
+                state['mask'][pos:end] = False
+        state['npts'] = max(state['npts'], end)
+
+    def allEqual(pos, values):
+        # emulates np.all(np.equal(a, b)) including masked array semantics,
+        # which ignore masked values and fail if all values are masked
+        end = pos + len(values)
+        equal = data[pos:end] == np.ma.getdata(values)
+        if state['mask'] is None and \
+           not isinstance(values, np.ma.masked_array):
+            return bool(np.all(equal))
+        mask = np.ma.getmaskarray(values).copy()
+        if state['mask'] is not None:
+            mask |= state['mask'][pos:end]
+        if np.all(mask):
+            return False
+        return bool(np.all(equal | mask))
+
+    def emptyChunk(size, rt):
+        last = state['npts'] - 1
+        if fill_value == "latest":
+            if isMasked(last):
+                raise _MergeFallback
+            value = data[last]
+        elif fill_value == "interpolate":
+            if isMasked(last) or rt.data[0] is np.ma.masked:
+                raise _MergeFallback
+            value = (data[last], rt.data[0])
+        else:
+            value = fill_value
+        return createEmptyDataChunk(size, dtype, value)
+
+    put(0, first.data)
+    for (case, pos, delta), rt in izip(layout, traces[1:]):
+        if case == 'overlap':
+            if allEqual(pos, rt.data[:delta]):
+                put(pos, rt.data)
+            elif method == 0:
+                chunk = emptyChunk(delta, rt)
+                put(pos, chunk)
+                put(pos + delta, rt.data[delta:])
+            elif method == 1 and interpolation_samples >= -1:
+                if interpolation_samples == -1 or \
+                   interpolation_samples > delta:
+                    samples = delta
+                else:
+                    samples = interpolation_samples
+                if samples >= len(rt):
+                    # contained trace
+                    continue
+                # left sample of the interpolation, see Trace.__add__
+                index = max(pos - 1, 0)
+                rs = rt.data[samples]
+                if isMasked(index) or rs is np.ma.masked:
+                    raise _MergeFallback
+                interpolation = np.linspace(data[index], rs, samples + 2)
+                put(pos, np.require(interpolation[1:-1], dtype))
+                put(pos + samples, rt.data[samples:])
+            else:
+                raise NotImplementedError
+        elif case == 'contained':
+            if allEqual(pos, rt.data):
+                continue
+            elif method == 0:
+                put(pos, emptyChunk(delta, rt))
+            elif method == 1:
+                continue
+            else:
+                raise NotImplementedError
+        elif case == 'fit':
+            put(pos, rt.data)
+        else:
+            put(pos, emptyChunk(delta, rt))
+            put(pos + delta, rt.data)
+    if state['mask'] is not None:
+        data = np.ma.masked_array(data, mask=state['mask'])
+    out = first.__class__(header=copy.deepcopy(first.stats))
+    out.data = data
+    return out
+
+
 def isPickle(filename):  # @UnusedVariable
     """
     Checks whether a file is a pickled ObsPy Stream file.
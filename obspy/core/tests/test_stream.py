@@ -7,6 +7,8 @@ import cPickle
 import numpy as np
 import os
 import pickle
+import shutil
+import tempfile
 import unittest
 import warnings
 
@@ -1241,6 +1243,37 @@ class StreamTestCase(unittest.TestCase):
         gaps = st.getGaps()
         self.assertEquals(len(gaps), 1)
 
+    def test_getGapsAsArray(self):
+        """
+        Gaps and overlaps returned as structured array must match the list.
+        """
+        st = self.mseed_stream.copy()
+        # add an overlap and an unrelated trace without gaps
+        tr = st[1].copy()
+        tr.stats.starttime -= 1.0
+        st.append(tr)
+        tr = st[0].copy()
+        tr.stats.channel = 'EHZ'
+        st.insert(0, tr)
+        traces = st.traces[:]
+        gap_list = st.getGaps()
+        gaps = st.getGaps(as_array=True)
+        # stream is not altered
+        self.assertEquals(st.traces, traces)
+        self.assertEquals(len(gaps), 4)
+        self.assertEquals(len(gaps), len(gap_list))
+        for gap, item in zip(gaps, gap_list):
+            self.assertEquals(list(gap)[:4], item[:4])
+            self.assertEquals(gap['starttime'], item[4].timestamp)
+            self.assertEquals(gap['endtime'], item[5].timestamp)
+            self.assertEquals(gap['delta'], item[6])
+            self.assertEquals(gap['samples'], item[7])
+        self.assertEquals((gaps['delta'] < 0).sum(), 1)
+        # empty stream
+        gaps = Stream().getGaps(as_array=True)
+        self.assertEquals(len(gaps), 0)
+        self.assertTrue('samples' in gaps.dtype.names)
+
     def test_comparisons(self):
         """
         Tests all rich comparison operators (==, !=, <, <=, >, >=)
@@ -1636,6 +1669,88 @@ class StreamTestCase(unittest.TestCase):
         tr = read('/path/to/slist_float.ascii', headonly=True)[0]
         self.assertFalse(tr.data)
 
+    def test_readParallel(self):
+        """
+        Reading multiple files using worker processes returns the same stream
+        as reading the files sequentially.
+        """
+        path = os.path.join(os.path.dirname(__file__), 'data', '*_[2f]*.ascii')
+        st1 = read(path)
+        st2 = read(path, workers=3)
+        self.assertEquals(len(st1), len(st2))
+        self.assertEquals(st1, st2)
+        for tr1, tr2 in zip(st1, st2):
+            self.assertEquals(tr1.stats._format, tr2.stats._format)
+        # one worker falls back to sequential reading
+        st3 = read(path, workers=1)
+        self.assertEquals(st1, st3)
+
+    def test_readParallelCollectsErrors(self):
+        """
+        A broken file within a parallel read raises a warning but all other
+        files are still read.
+        """
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(os.path.dirname(__file__), 'data')
+            for filename in ['slist.ascii', 'tspair.ascii']:
+                shutil.copy(os.path.join(path, filename), tempdir)
+            open(os.path.join(tempdir, 'broken.ascii'), 'wb').write('XXX')
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                st = read(os.path.join(tempdir, '*.ascii'), workers=2)
+            self.assertEquals(len(st), 2)
+            self.assertEquals(len(w), 1)
+            self.assertTrue('broken.ascii' in str(w[0].message))
+            self.assertTrue('Could not read 1 of 3 files' in
+                            str(w[0].message))
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_readLazy(self):
+        """
+        Lazy reading defers reading of the data samples until Trace.data is
+        accessed for the first time.
+        """
+        for filename in ['/path/to/test.sac', '/path/to/test.mseed',
+                         '/path/to/loc_RJOB20050831023349.z']:
+            st1 = read(filename)
+            st2 = read(filename, lazy=True)
+            self.assertTrue(st2[0].isLazy())
+            self.assertEquals(len(st2[0]), st1[0].stats.npts)
+            self.assertEquals(st1[0].stats, st2[0].stats)
+            # string representation does not read data
+            str(st2)
+            self.assertTrue(st2[0].isLazy())
+            # copies are lazy as well
+            st3 = st2.copy()
+            self.assertTrue(st3[0].isLazy())
+            np.testing.assert_array_equal(st1[0].data, st2[0].data)
+            self.assertFalse(st2[0].isLazy())
+            self.assertTrue(st3[0].isLazy())
+            self.assertEquals(st1, st3)
+
+    def test_readLazyTrim(self):
+        """
+        Trimming a lazy trace changes only its header and the trimmed time
+        span is read afterwards.
+        """
+        st1 = read('/path/to/test.mseed')
+        t = st1[0].stats.starttime
+        st1.trim(t + 10, t + 20.5)
+        st2 = read('/path/to/test.mseed', lazy=True)
+        st2.trim(t + 10, t + 20.5)
+        self.assertTrue(st2[0].isLazy())
+        self.assertEquals(st1[0].stats, st2[0].stats)
+        np.testing.assert_array_equal(st1[0].data, st2[0].data)
+        # time window and dtype given by read
+        st3 = read('/path/to/test.mseed', lazy=True, starttime=t + 10,
+                   endtime=t + 20.5, dtype='float32')
+        self.assertTrue(st3[0].isLazy())
+        self.assertEquals(st1[0].stats, st3[0].stats)
+        self.assertEquals(st3[0].data.dtype, np.float32)
+        np.testing.assert_array_equal(st1[0].data, st3[0].data)
+
     def test_copy(self):
         """
         Testing the copy method of the Stream object.
@@ -1664,6 +1779,47 @@ class StreamTestCase(unittest.TestCase):
         st.merge(fill_value='interpolate')
         self.assertEquals(len(st), 1)
 
+    def test_mergeManySegments(self):
+        """
+        Merging many segments at once must give the same results as adding
+        the traces successively.
+        """
+        np.random.seed(815)
+        data = np.random.randint(0, 5, 1000).astype('int32')
+        for method in [0, 1]:
+            for fill_value in [None, 0, 'latest', 'interpolate']:
+                for interpolation_samples in [-1, 0, 2]:
+                    st = Stream()
+                    for _i in xrange(50):
+                        start = np.random.randint(0, 900)
+                        tr = Trace(data[start:start + 1 +
+                                        np.random.randint(0, 80)].copy())
+                        # introduce some overlaps with differing data
+                        if np.random.rand() < 0.2:
+                            tr.data[0] += 1
+                        tr.stats.starttime += start
+                        st.append(tr)
+                    st.sort(keys=['starttime', 'endtime'])
+                    expected = st[0]
+                    for tr in st[1:]:
+                        expected = expected.__add__(
+                            tr, method=method, fill_value=fill_value,
+                            interpolation_samples=interpolation_samples)
+                    st.merge(method=method, fill_value=fill_value,
+                             interpolation_samples=interpolation_samples)
+                    self.assertEquals(len(st), 1)
+                    self.assertEquals(st[0].stats, expected.stats)
+                    self.assertEquals(st[0].data.dtype, expected.data.dtype)
+                    self.assertEquals(
+                        isinstance(st[0].data, np.ma.MaskedArray),
+                        isinstance(expected.data, np.ma.MaskedArray))
+                    np.testing.assert_array_equal(
+                        np.ma.getmaskarray(st[0].data),
+                        np.ma.getmaskarray(expected.data))
+                    np.testing.assert_array_equal(
+                        np.ma.filled(st[0].data, 0),
+                        np.ma.filled(expected.data, 0))
+
     def test_rotate(self):
         """
         Testing the rotate method.
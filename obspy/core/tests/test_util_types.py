@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from obspy.core.util.types import Enum
+from obspy.core.util.types import Enum, LRUCache
 import unittest
 
 
@@ -41,6 +41,37 @@ class UtilTypesTestCase(unittest.TestCase):
         self.assertEquals(units(99), None)
         self.assertEquals(units('xxx'), None)
 
+    def test_lruCache(self):
+        """
+        Tests for the LRU cache type.
+        """
+        cache = LRUCache(maxsize=3)
+        for i in xrange(5):
+            cache[i] = str(i)
+        # least recently used items are discarded
+        self.assertEquals(len(cache), 3)
+        self.assertEquals(cache.keys(), [2, 3, 4])
+        self.assertEquals(cache.get(0), None)
+        self.assertEquals(cache.get(0, 'x'), 'x')
+        self.assertRaises(KeyError, cache.__getitem__, 1)
+        # a lookup marks an item as recently used
+        self.assertEquals(cache[2], '2')
+        cache[5] = '5'
+        self.assertEquals(cache.keys(), [4, 2, 5])
+        self.assertTrue(2 in cache)
+        self.assertFalse(3 in cache)
+        # hits and misses
+        self.assertEquals(cache.hits, 1)
+        self.assertEquals(cache.misses, 3)
+        self.assertEquals(cache.info(), {'hits': 1, 'misses': 3,
+                                         'maxsize': 3, 'size': 3})
+        del cache[2]
+        self.assertEquals(cache.keys(), [4, 5])
+        cache.clear()
+        self.assertEquals(len(cache), 0)
+        self.assertEquals(cache.hits, 0)
+        self.assertEquals(cache.misses, 0)
+
 
 def suite():
     return unittest.makeSuite(UtilTypesTestCase, 'test')
@@ -2,7 +2,8 @@
 
 from obspy import Trace, read
 from obspy.core.utcdatetime import UTCDateTime
-from obspy.core.util.base import NamedTemporaryFile, _getEntryPoints
+from obspy.core.util.base import NamedTemporaryFile, _getEntryPoints, \
+    _ENTRY_POINT_FUNCTIONS, _FORMAT_CACHE, _getFormatCacheKey
 from pkg_resources import load_entry_point
 import StringIO
 import cStringIO
@@ -310,6 +311,47 @@ class WaveformPluginsTestCase(unittest.TestCase):
         # cleanup
         os.remove(tmpfile)
 
+    def test_formatDetectionCache(self):
+        """
+        The automatic format detection remembers the detected format per
+        directory and file extension and checks it first.
+        """
+        path = os.path.dirname(__file__)
+        sac_path = os.path.join(path, os.pardir, os.pardir, 'sac', 'tests',
+                                'data')
+        mseed_path = os.path.join(path, os.pardir, os.pardir, 'mseed',
+                                  'tests', 'data')
+        sac_file = os.path.join(sac_path, 'test.sac')
+        mseed_file = os.path.join(mseed_path, 'test.mseed')
+        sac_key = _getFormatCacheKey('waveform', sac_file)
+        mseed_key = _getFormatCacheKey('waveform', mseed_file)
+        _FORMAT_CACHE.clear()
+        st = read(sac_file)
+        self.assertEquals(st[0].stats._format, 'SAC')
+        self.assertEquals(_FORMAT_CACHE[sac_key], 'SAC')
+        # all other isFormat functions must not be called for a second file
+        # within the same directory
+        key = ('obspy.plugin.waveform.MSEED', 'isFormat')
+        original = _ENTRY_POINT_FUNCTIONS.get(key)
+
+        def failing_isFormat(filename):
+            raise AssertionError('isFormat called for MSEED')
+        _ENTRY_POINT_FUNCTIONS[key] = failing_isFormat
+        try:
+            st = read(os.path.join(sac_path, 'seism.sac'))
+        finally:
+            if original is None:
+                del _ENTRY_POINT_FUNCTIONS[key]
+            else:
+                _ENTRY_POINT_FUNCTIONS[key] = original
+        self.assertEquals(st[0].stats._format, 'SAC')
+        # a wrong cached format falls back to the default detection
+        _FORMAT_CACHE[mseed_key] = 'SAC'
+        st = read(mseed_file)
+        self.assertEquals(st[0].stats._format, 'MSEED')
+        self.assertEquals(_FORMAT_CACHE[mseed_key], 'MSEED')
+        _FORMAT_CACHE.clear()
+
 
 def suite():
     return unittest.makeSuite(WaveformPluginsTestCase, 'test')
@@ -333,8 +333,8 @@ class Trace(object):
                 out = out + ' | '\
                       "%(starttime)s - %(endtime)s | " + \
                       "%(sampling_rate).1f Hz, %(npts)d samples"
-        # check for masked array
-        if np.ma.count_masked(self.data):
+        # check for masked array - skip lazy traces to prevent reading data
+        if not self.isLazy() and np.ma.count_masked(self.data):
             out += ' (masked)'
         return trace_id + out % (self.stats)
 
@@ -353,6 +353,8 @@ class Trace(object):
         >>> len(trace)
         4
         """
+        if self.isLazy():
+            return self.stats.npts
         return len(self.data)
 
     count = __len__
@@ -367,8 +369,63 @@ class Trace(object):
                 msg = "Trace.data must be a NumPy array."
                 ValueError(msg)
             self.stats.npts = len(value)
+            # explicitly set data replaces any deferred data of a lazy trace
+            self.__dict__.pop('_lazy_loader', None)
         return super(Trace, self).__setattr__(key, value)
 
+    def __getattr__(self, key):
+        """
+        __getattr__ method of Trace object.
+
+        Reads the data samples of a lazy trace on first access of
+        ``Trace.data``.
+        """
+        if key == 'data' and '_lazy_loader' in self.__dict__:
+            loader = self.__dict__['_lazy_loader']
+            self.data = loader(self)
+            return self.data
+        msg = "'%s' object has no attribute '%s'"
+        raise AttributeError(msg % (self.__class__.__name__, key))
+
+    def isLazy(self):
+        """
+        Returns ``True`` if the data samples of the trace have not been read
+        yet.
+
+        Lazy traces are created by :func:`~obspy.core.stream.read` using the
+        ``lazy=True`` option. Accessing :attr:`Trace.data` reads the data.
+
+        .. rubric:: Example
+
+        >>> from obspy import read
+        >>> tr = read('/path/to/test.sac', lazy=True)[0]
+        >>> tr.isLazy()
+        True
+        >>> len(tr.data)
+        100
+        >>> tr.isLazy()
+        False
+        """
+        return 'data' not in self.__dict__ and \
+            '_lazy_loader' in self.__dict__
+
+    def _trimLazy(self, method, *args, **kwargs):
+        """
+        Trims the header of a lazy trace without reading its data.
+
+        The trim method is applied to a placeholder array of the correct
+        length which does not allocate any memory per sample.
+        """
+        loader = self.__dict__.pop('_lazy_loader')
+        placeholder = np.lib.stride_tricks.as_strided(
+            np.zeros(1), shape=(self.stats.npts,), strides=(0,))
+        super(Trace, self).__setattr__('data', placeholder)
+        try:
+            method(*args, **kwargs)
+        finally:
+            del self.__dict__['data']
+            self.__dict__['_lazy_loader'] = loader
+
     def __getitem__(self, index):
         """
         __getitem__ method of Trace object.
@@ -821,6 +878,9 @@ class Trace(object):
         >>> tr.stats.starttime
         UTCDateTime(1970, 1, 1, 0, 0, 8)
         """
+        if self.isLazy() and not pad:
+            return self._trimLazy(self._ltrim, starttime,
+                                  nearest_sample=nearest_sample)
         org_dtype = self.data.dtype
         if isinstance(starttime, float) or isinstance(starttime, int):
             starttime = UTCDateTime(self.stats.starttime) + starttime
@@ -881,6 +941,9 @@ class Trace(object):
         >>> tr.stats.endtime
         UTCDateTime(1970, 1, 1, 0, 0, 2)
         """
+        if self.isLazy() and not pad:
+            return self._trimLazy(self._rtrim, endtime,
+                                  nearest_sample=nearest_sample)
         org_dtype = self.data.dtype
         if isinstance(endtime, float) or isinstance(endtime, int):
             endtime = UTCDateTime(self.stats.endtime) - endtime
@@ -1198,6 +1261,11 @@ class Trace(object):
             Minimax optimal bandpass using Remez algorithm (uses
             :func:`obspy.signal.filter.remezFIR`).
 
+        The Butterworth filters and ``'remezFIR'`` accept the option
+        ``engine='fft'`` to filter long traces by convolution with the
+        (truncated) impulse response of the filter via the overlap-save
+        method instead of applying the filter directly.
+
         .. rubric:: Example
 
         >>> from obspy import read
@@ -35,6 +35,29 @@ WAVEFORM_PREFERRED_ORDER = ['MSEED', 'SAC', 'GSE2', 'SEISAN', 'SACXY', 'GSE1',
                             'Q', 'SH_ASC', 'SLIST', 'TSPAIR', 'SEGY', 'SU',
                             'SEG2', 'WAV', 'PICKLE', 'DATAMARK', 'CSS']
 
+# magic byte signatures used as prefilter for the automatic format detection;
+# each format maps to a list of (offset, bytes) tuples of which at least one
+# has to match the beginning of a file - formats without any reliable
+# signature are not listed and will be checked in default order
+WAVEFORM_MAGIC_BYTES = {
+    'MSEED': [(6, 'D'), (6, 'R'), (6, 'Q'), (6, 'M'), (6, 'V')],
+    'GSE1': [(0, 'WID1'), (0, 'XW01')],
+    'Q': [(0, '43981')],
+    'SH_ASC': [(0, 'DELTA:')],
+    'SLIST': [(0, 'TIMESERIES')],
+    'TSPAIR': [(0, 'TIMESERIES')],
+    'SEG2': [(0, '\x55\x3a'), (0, '\x3a\x55')],
+    'WAV': [(0, 'RIFF')],
+}
+MAGIC_BYTES = {
+    'waveform': WAVEFORM_MAGIC_BYTES,
+}
+# number of bytes read from the beginning of a file for the prefilter
+MAGIC_BYTES_HEADER_SIZE = 4096
+# maximal number of directory/extension pairs remembered by the format
+# detection before the cache is reset
+FORMAT_CACHE_MAX_SIZE = 1000
+
 _sys_is_le = sys.byteorder == 'little'
 NATIVE_BYTEORDER = _sys_is_le and '<' or '>'
 
@@ -309,6 +332,13 @@ ENTRY_POINTS = {
 }
 
 
+# resolved entry point functions, keyed by entry point group and name
+_ENTRY_POINT_FUNCTIONS = {}
+# winning formats of the automatic format detection, keyed by plug-in type,
+# directory and file extension
+_FORMAT_CACHE = {}
+
+
 def _getFunctionFromEntryPoint(group, type):
     """
     A "automagic" function searching a given dict of entry points for a valid
@@ -347,11 +377,135 @@ def _getFunctionFromEntryPoint(group, type):
     # import function point
     # any issue during import of entry point should be raised, so the user has
     # a chance to correct the problem
-    func = load_entry_point(entry_point.dist.key,
-            'obspy.plugin.%s' % (group), entry_point.name)
+    key = ('obspy.plugin.%s' % (group), entry_point.name)
+    try:
+        return _ENTRY_POINT_FUNCTIONS[key]
+    except KeyError:
+        pass
+    func = load_entry_point(entry_point.dist.key, *key)
+    _ENTRY_POINT_FUNCTIONS[key] = func
     return func
 
 
+def _getPluginFunction(plugin_type, format_ep, name):
+    """
+    Returns function ``name`` (e.g. ``'isFormat'`` or ``'readFormat'``) of
+    given format entry point.
+
+    Resolved functions are cached, so :func:`pkg_resources.load_entry_point`
+    is called only once per plug-in function.
+
+    .. rubric:: Example
+
+    >>> ep = ENTRY_POINTS['waveform']['SLIST']
+    >>> _getPluginFunction('waveform', ep, 'isFormat')  # doctest: +ELLIPSIS
+    <function isSLIST at 0x...>
+    """
+    key = ('obspy.plugin.%s.%s' % (plugin_type, format_ep.name), name)
+    try:
+        return _ENTRY_POINT_FUNCTIONS[key]
+    except KeyError:
+        pass
+    func = load_entry_point(format_ep.dist.key, *key)
+    _ENTRY_POINT_FUNCTIONS[key] = func
+    return func
+
+
+def _readMagicHeader(filename, size=MAGIC_BYTES_HEADER_SIZE):
+    """
+    Returns the first ``size`` bytes of a file name or file-like object.
+
+    The position of a file-like object is restored afterwards. An empty
+    string is returned if nothing could be read.
+    """
+    try:
+        if isinstance(filename, basestring):
+            fh = open(filename, 'rb')
+            try:
+                return fh.read(size)
+            finally:
+                fh.close()
+        position = filename.tell()
+        header = filename.read(size)
+        filename.seek(position)
+        return header
+    except:
+        return ''
+
+
+def _matchMagicBytes(header, signatures):
+    """
+    Checks if any of the given (offset, bytes) signatures matches header.
+
+    .. rubric:: Example
+
+    >>> _matchMagicBytes('000001D ', [(6, 'D'), (6, 'R')])
+    True
+    >>> _matchMagicBytes('RIFF', [(6, 'D'), (6, 'R')])
+    False
+    """
+    for offset, magic in signatures:
+        if header[offset:offset + len(magic)] == magic:
+            return True
+    return False
+
+
+def _getFormatCacheKey(plugin_type, filename):
+    """
+    Returns the key used to remember the detected format of a file or
+    ``None`` for file-like objects.
+    """
+    if not isinstance(filename, basestring):
+        return None
+    dirname, basename = os.path.split(os.path.abspath(filename))
+    return (plugin_type, dirname, os.path.splitext(basename)[1])
+
+
+def _detectFormat(plugin_type, filename):
+    """
+    Automatically detects the format of a file using the isFormat functions
+    of all available plug-ins.
+
+    Candidates are checked in the following order: first the format
+    previously detected for a file within the same directory and with the
+    same file extension, followed by all formats whose magic byte signature
+    matches the beginning of the file, followed by all remaining formats in
+    default order. The first format whose isFormat function succeeds wins.
+
+    :returns: Entry point of detected format.
+    """
+    EPS = ENTRY_POINTS[plugin_type]
+    candidates = []
+    # format previously detected for same directory and extension
+    key = _getFormatCacheKey(plugin_type, filename)
+    cached = _FORMAT_CACHE.get(key)
+    if cached in EPS:
+        candidates.append(cached)
+    # formats with a matching magic byte signature
+    signatures = MAGIC_BYTES.get(plugin_type, {})
+    if signatures:
+        header = _readMagicHeader(filename)
+        for name in EPS:
+            if name in signatures and name not in candidates and \
+               _matchMagicBytes(header, signatures[name]):
+                candidates.append(name)
+    # all remaining formats in default order
+    candidates.extend([name for name in EPS if name not in candidates])
+    for name in candidates:
+        format_ep = EPS[name]
+        isFormat = _getPluginFunction(plugin_type, format_ep, 'isFormat')
+        if isFormat(filename):
+            break
+    else:
+        raise TypeError('Unknown format for file %s' % filename)
+    # remember winning format
+    if key is not None and cached != name:
+        if len(_FORMAT_CACHE) >= FORMAT_CACHE_MAX_SIZE:
+            _FORMAT_CACHE.clear()
+        _FORMAT_CACHE[key] = name
+    return format_ep
+
+
 def getMatplotlibVersion():
     """
     Get matplotlib version information.
@@ -382,17 +536,8 @@ def _readFromPlugin(plugin_type, filename, format=None, **kwargs):
     # get format entry point
     format_ep = None
     if not format:
-        # auto detect format - go through all known formats in given sort order
-        for format_ep in EPS.values():
-            # search isFormat for given entry point
-            isFormat = load_entry_point(format_ep.dist.key,
-                'obspy.plugin.%s.%s' % (plugin_type, format_ep.name),
-                'isFormat')
-            # check format
-            if isFormat(filename):
-                break
-        else:
-            raise TypeError('Unknown format for file %s' % filename)
+        # auto detect format
+        format_ep = _detectFormat(plugin_type, filename)
     else:
         # format given via argument
         format = format.upper()
@@ -404,8 +549,7 @@ def _readFromPlugin(plugin_type, filename, format=None, **kwargs):
     # file format should be known by now
     try:
         # search readFormat for given entry point
-        readFormat = load_entry_point(format_ep.dist.key,
-            'obspy.plugin.%s.%s' % (plugin_type, format_ep.name), 'readFormat')
+        readFormat = _getPluginFunction(plugin_type, format_ep, 'readFormat')
     except ImportError:
         msg = "Format \"%s\" is not supported. Supported types: %s"
         raise TypeError(msg % (format_ep.name, ', '.join(EPS)))
@@ -8,6 +8,7 @@ Various types used in ObsPy.
     GNU Lesser General Public License, Version 3
     (http://www.gnu.org/copyleft/lesser.html)
 """
+import threading
 
 # try native OrderDict implementations first (Python >= 2.7.x)
 try:
@@ -243,6 +244,118 @@ class Enum(object):
         return "Enum([%s])" % ", ".join(['"%s"' % _i for _i in keys])
 
 
+class LRUCache(object):
+    """
+    Bounded cache discarding the least recently used items.
+
+    :type maxsize: int, optional
+    :param maxsize: Maximal number of cached items. Defaults to ``128``.
+
+    Lookups via :meth:`get` are counted in the attributes ``hits`` and
+    ``misses``. All methods are thread-safe.
+
+    .. rubric:: Example
+
+    >>> from obspy.core.util import LRUCache
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache.get('a')
+    1
+    >>> cache['c'] = 3
+    >>> print(cache.get('b'))
+    None
+    >>> sorted(cache.keys())
+    ['a', 'c']
+    >>> cache.hits, cache.misses
+    (1, 1)
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__items = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for given key or default if not cached.
+        """
+        self.__lock.acquire()
+        try:
+            try:
+                value = self.__items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # re-insert to mark as most recently used
+            self.__items[key] = value
+            self.hits += 1
+            return value
+        finally:
+            self.__lock.release()
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.__lock.acquire()
+        try:
+            self.__items.pop(key, None)
+            self.__items[key] = value
+            while len(self.__items) > self.maxsize:
+                self.__items.popitem(last=False)
+        finally:
+            self.__lock.release()
+
+    def __delitem__(self, key):
+        self.__lock.acquire()
+        try:
+            del self.__items[key]
+        finally:
+            self.__lock.release()
+
+    def __contains__(self, key):
+        return key in self.__items
+
+    def __len__(self):
+        return len(self.__items)
+
+    def keys(self):
+        """
+        Returns the cached keys, least recently used first.
+        """
+        return self.__items.keys()
+
+    def clear(self):
+        """
+        Removes all cached items and resets the hit and miss counters.
+        """
+        self.__lock.acquire()
+        try:
+            self.__items.clear()
+            self.hits = 0
+            self.misses = 0
+        finally:
+            self.__lock.release()
+
+    def info(self):
+        """
+        Returns a dictionary with the hit and miss counters, the maximal and
+        the current number of cached items.
+
+        >>> from obspy.core.util import LRUCache
+        >>> info = LRUCache(maxsize=10).info()
+        >>> info['maxsize'], info['size']
+        (10, 0)
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'maxsize': self.maxsize, 'size': len(self.__items)}
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
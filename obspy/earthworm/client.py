@@ -12,8 +12,12 @@ Earthworm Wave Server client for ObsPy.
 """
 
 from fnmatch import fnmatch
+from multiprocessing.pool import ThreadPool
 from obspy import Stream, UTCDateTime
-from obspy.earthworm.waveserver import readWaveServerV, getMenu
+from obspy.earthworm.waveserver import readWaveServerVStream, getMenu, \
+    ConnectionPool
+import threading
+import time
 
 
 class Client(object):
@@ -30,8 +34,19 @@ class Client(object):
     :type debug: bool, optional
     :param debug: Enables verbose output of the connection handling (default is
         ``False``).
+    :type max_connections: int, optional
+    :param max_connections: Maximum number of concurrent requests and of
+        persistent connections kept open to the wave server (default is
+        ``4``).
+    :type menu_ttl: float, optional
+    :param menu_ttl: Seconds the menu of the wave server (used by
+        :meth:`availability`) is cached (default is ``0``, no caching).
+
+    Connections to the wave server are kept open and reused by following
+    requests until :meth:`close` is called.
     """
-    def __init__(self, host, port, timeout=None, debug=False):
+    def __init__(self, host, port, timeout=None, debug=False,
+                 max_connections=4, menu_ttl=0):
         """
         Initializes a Earthworm Wave Server client.
 
@@ -41,6 +56,66 @@ class Client(object):
         self.port = port
         self.timeout = timeout
         self.debug = debug
+        self.max_connections = max_connections
+        self.menu_ttl = menu_ttl
+        self._pool = ConnectionPool(host, port, timeout=timeout,
+                                    maxsize=max_connections)
+        self._executor = None
+        self._menu = None
+        self._lock = threading.Lock()
+
+    def close(self):
+        """
+        Closes all open connections and stops the worker threads.
+        """
+        self._lock.acquire()
+        try:
+            executor, self._executor = self._executor, None
+        finally:
+            self._lock.release()
+        if executor is not None:
+            executor.close()
+            executor.join()
+        self._pool.close()
+
+    def _request(self, func, *args):
+        """
+        Calls a wave server function with a connection of the pool.
+        """
+        sock = self._pool.acquire()
+        try:
+            result = func(self.host, self.port, *args, sock=sock)
+        except:
+            self._pool.discard(sock)
+            raise
+        self._pool.release(sock)
+        return result
+
+    def _map(self, func, args_list):
+        """
+        Applies func to all argument tuples using the worker threads.
+        """
+        if len(args_list) < 2 or self.max_connections < 2:
+            return [func(*args) for args in args_list]
+        self._lock.acquire()
+        try:
+            if self._executor is None:
+                self._executor = ThreadPool(processes=self.max_connections)
+            executor = self._executor
+        finally:
+            self._lock.release()
+        return executor.map(lambda args: func(*args), args_list)
+
+    def _getMenu(self):
+        """
+        Returns the menu of the wave server, cached for menu_ttl seconds.
+        """
+        menu = self._menu
+        if menu is not None and time.time() - menu[0] < self.menu_ttl:
+            return menu[1]
+        response = self._request(getMenu, None)
+        self._menu = (time.time(), response)
+        return response
 
     def getWaveform(self, network, station, location, channel, starttime,
                     endtime, cleanup=True):
@@ -94,27 +169,73 @@ class Client(object):
         """
         # replace wildcards in last char of channel and fetch all 3 components
         if channel[-1] in "?*":
-            st = Stream()
-            for comp in ("Z", "N", "E"):
-                channel_new = channel[:-1] + comp
-                st += self.getWaveform(network, station, location,
-                                       channel_new, starttime, endtime,
-                                       cleanup=cleanup)
-            return st
+            return self.getWaveformBulk([(network, station, location, channel,
+                                          starttime, endtime)],
+                                        cleanup=cleanup)
+        return self._getWaveform(network, station, location, channel,
+                                 starttime, endtime, cleanup)
+
+    def _getWaveform(self, network, station, location, channel, starttime,
+                     endtime, cleanup=True):
+        """
+        Retrieves waveform data of a single channel.
+        """
         if location == '':
             location = '--'
         scnl = (station, channel, network, location)
-        # fetch waveform
-        tbl = readWaveServerV(self.host, self.port, scnl, starttime, endtime)
-        # create new stream
-        st = Stream()
-        for tb in tbl:
-            st.append(tb.getObspyTrace())
+        # fetch waveform, adjacent packets are already merged with cleanup
+        st = self._request(readWaveServerVStream, scnl, starttime, endtime,
+                           cleanup)
         if cleanup:
             st._cleanup()
         st.trim(starttime, endtime)
         return st
 
+    def getWaveformBulk(self, bulk, cleanup=True):
+        """
+        Retrieves waveform data of multiple channels concurrently and returns
+        an ObsPy Stream object.
+
+        Up to ``max_connections`` requests are sent concurrently, each over a
+        persistent connection to the wave server.
+
+        :type bulk: list of tuples
+        :param bulk: List of requests, each a tuple of network, station,
+            location, channel, starttime and endtime, see
+            :meth:`getWaveform`. The last character of the channel code may
+            be a wildcard to fetch `Z`, `N` and `E` component.
+        :type cleanup: bool
+        :param cleanup: Specifies whether perfectly aligned traces should be
+            merged or not. See :meth:`obspy.core.stream.Stream.merge` for
+            ``method=-1``.
+        :return: ObsPy :class:`~obspy.core.stream.Stream` object with the
+            traces of all requests in the given order.
+
+        .. rubric:: Example
+
+        >>> from obspy.earthworm import Client
+        >>> from obspy import UTCDateTime
+        >>> client = Client("pele.ess.washington.edu", 16017)
+        >>> dt = UTCDateTime() - 2000  # now - 2000 seconds
+        >>> st = client.getWaveformBulk([
+        ...     ('UW', 'TUCA', '', 'BHZ', dt, dt + 10),
+        ...     ('UW', 'TUCA', '', 'BHN', dt, dt + 10)])  # doctest: +SKIP
+        """
+        args_list = []
+        for network, station, location, channel, starttime, endtime in bulk:
+            # replace wildcards in last char of channel by all 3 components
+            if channel[-1] in "?*":
+                channels = [channel[:-1] + comp for comp in ("Z", "N", "E")]
+            else:
+                channels = [channel]
+            for channel in channels:
+                args_list.append((network, station, location, channel,
+                                  starttime, endtime, cleanup))
+        st = Stream()
+        for result in self._map(self._getWaveform, args_list):
+            st += result
+        return st
+
     def saveWaveform(self, filename, network, station, location, channel,
                      starttime, endtime, format="MSEED", cleanup=True):
         """
@@ -215,7 +336,7 @@ class Client(object):
         pattern = ".".join((network, station, location, channel))
         # get overview of all available data, winston wave servers can not
         # restrict the query via network, station etc. so we do that manually
-        response = getMenu(self.host, self.port)
+        response = self._getMenu()
         # reorder items and convert time info to UTCDateTime
         response = [(x[3], x[1], x[4], x[2], UTCDateTime(x[5]),
                      UTCDateTime(x[6])) for x in response]
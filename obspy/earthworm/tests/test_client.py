@@ -7,11 +7,91 @@ from obspy.earthworm import Client
 from obspy import read
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile
+import SocketServer
+import numpy as np
 import os
+import struct
+import threading
+import time
 import unittest
 from numpy import array
 
 
+class MockWaveServerHandler(SocketServer.StreamRequestHandler):
+    """
+    Answers MENU and GETSCNLRAW requests of one connection.
+    """
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tokens = line.split()
+            if tokens[0] == 'MENU:':
+                server.menu_requests += 1
+                response = tokens[1]
+                for pin, (sta, chan, net, loc) in enumerate(server.tanks):
+                    response += ' %d %s %s %s %s %f %f i4' % (
+                        pin, sta, chan, net, loc, server.start, server.end)
+                self.wfile.write(response + '\n')
+            elif tokens[0] == 'GETSCNLRAW:':
+                rid, scnl = tokens[1], tuple(tokens[2:6])
+                if scnl not in server.tanks:
+                    self.wfile.write('%s 0 %s %s %s %s FN\n' % ((rid,) +
+                                                                scnl))
+                    continue
+                pin = server.tanks.index(scnl)
+                data = ''.join(server.getPacket(scnl, i)
+                               for i in range(server.packets))
+                self.wfile.write('%s %d %s %s %s %s F i4 %f %f %d\n' % (
+                    (rid, pin) + scnl + (server.start, server.end,
+                                         len(data))))
+                self.wfile.write(data)
+            self.wfile.flush()
+
+
+class MockWaveServer(SocketServer.ThreadingTCPServer):
+    """
+    Wave server providing TRACEBUF2 packets of 100 samples at 100 Hz for
+    given tanks.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, tanks, packets=3):
+        SocketServer.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0),
+                                                 MockWaveServerHandler)
+        self.tanks = tanks
+        self.packets = packets
+        self.start = 1300000000.0
+        self.end = self.start + packets
+        self.connections = 0
+        self.menu_requests = 0
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def getPacket(self, scnl, i):
+        sta, chan, net, loc = scnl
+        start = self.start + i
+        data = self.getSamples(scnl, i)
+        header = struct.pack('<2i3d7s9s4s3s2s3s2s2s', 1, len(data), start,
+                             start + 0.99, 100.0, sta, net, chan, loc, '20',
+                             'i4', '', '')
+        return header + data.astype('<i4').tostring()
+
+    def getSamples(self, scnl, i):
+        return np.arange(100 * i, 100 * (i + 1)) + 1000 * \
+            self.tanks.index(scnl)
+
+    def stop(self):
+        self.shutdown()
+        self.thread.join()
+        self.server_close()
+
+
 class ClientTestCase(unittest.TestCase):
     """
     Test cases for obspy.earthworm.client.Client.
@@ -105,6 +185,77 @@ class ClientTestCase(unittest.TestCase):
         finally:
             os.remove(testfile)
 
+    def test_persistentConnections(self):
+        """
+        Requests are sent concurrently over reused connections.
+        """
+        tanks = [('TUCA', 'BH' + comp, 'UW', '--') for comp in 'ZNE'] + \
+            [('S%02d' % i, 'BHZ', 'XX', '--') for i in range(20)]
+        server = MockWaveServer(tanks)
+        try:
+            client = Client(*server.server_address, max_connections=3)
+            start = UTCDateTime(server.start)
+            # wildcarded component
+            st = client.getWaveform('UW', 'TUCA', '', 'BH?', start,
+                                    start + 2.99)
+            self.assertEqual([tr.stats.channel for tr in st],
+                             ['BHZ', 'BHN', 'BHE'])
+            for tr in st:
+                self.assertEqual(tr.stats.location, '')
+                self.assertEqual(tr.stats.starttime, start)
+                np.testing.assert_array_equal(tr.data, np.concatenate(
+                    [server.getSamples(tanks[st.traces.index(tr)], i)
+                     for i in range(3)]))
+            # bulk request keeps the order of requests
+            bulk = [('XX', 'S%02d' % i, '', 'BHZ', start, start + 2.99)
+                    for i in range(19, -1, -1)]
+            for _i in range(3):
+                st = client.getWaveformBulk(bulk)
+                self.assertEqual([tr.stats.station for tr in st],
+                                 ['S%02d' % i for i in range(19, -1, -1)])
+                for tr in st:
+                    self.assertEqual(len(tr), 300)
+            # unknown channel
+            st = client.getWaveform('XX', 'S00', '', 'HHZ', start, start + 1)
+            self.assertEqual(len(st), 0)
+            self.assertTrue(server.connections <= 3)
+            self.assertEqual(client._pool.connections, server.connections)
+            client.close()
+            self.assertEqual(client._pool._idle, [])
+            # connections are re-established after close
+            st = client.getWaveform('UW', 'TUCA', '', 'BHZ', start, start + 1)
+            self.assertEqual(len(st), 1)
+            client.close()
+        finally:
+            server.stop()
+
+    def test_menuCache(self):
+        """
+        The menu of the wave server is cached for menu_ttl seconds.
+        """
+        tanks = [('TUCA', 'BH' + comp, 'UW', '--') for comp in 'ZNE']
+        server = MockWaveServer(tanks)
+        try:
+            client = Client(*server.server_address, menu_ttl=0.5)
+            for _i in range(3):
+                response = client.availability('UW', 'TUCA', channel='BH[ZN]')
+                self.assertEqual([x[3] for x in response], ['BHZ', 'BHN'])
+                self.assertEqual(response[0][4], UTCDateTime(server.start))
+            self.assertEqual(server.menu_requests, 1)
+            time.sleep(0.6)
+            client.availability()
+            self.assertEqual(server.menu_requests, 2)
+            self.assertEqual(server.connections, 1)
+            client.close()
+            # no caching by default
+            client = Client(*server.server_address)
+            client.availability()
+            client.availability()
+            self.assertEqual(server.menu_requests, 4)
+            client.close()
+        finally:
+            server.stop()
+
 
 def suite():
     return unittest.makeSuite(ClientTestCase, 'test')
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.earthworm.waveserver test suite.
+"""
+
+from obspy import Stream, UTCDateTime
+from obspy.earthworm.waveserver import parseTraceBuf2, scanTraceBuf2, \
+    tracebuf2
+import numpy as np
+import struct
+import time
+import unittest
+
+
+# some debug flags
+SHOW_BENCHMARK = False
+
+
+def _createPacket(sta, chan, net, loc, start, data, rate=100.0,
+                  datatype='i4'):
+    """
+    Returns a TRACEBUF2 packet with given samples.
+    """
+    endian = '>' if datatype[0] in 'ts' else '<'
+    data = np.require(data, endian + datatype[0].replace('t', 'f').replace(
+        's', 'i') + datatype[1])
+    header = struct.pack(endian + '2i3d7s9s4s3s2s3s2s2s', 1, len(data), start,
+                         start + (len(data) - 1) / rate, rate, sta, net, chan,
+                         loc, '20', datatype, '', '')
+    return header + data.tostring()
+
+
+def _parsePackets(dat, cleanup=True):
+    """
+    Parses TRACEBUF2 packets one by one as done before.
+    """
+    st = Stream()
+    p = 0
+    while p < len(dat):
+        tb = tracebuf2()
+        nbytes = tb.readTB2(dat[p:])
+        if not nbytes:
+            break
+        st.append(tb.getObspyTrace())
+        p += nbytes
+    if cleanup:
+        st._cleanup()
+    return st
+
+
+class WaveServerTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.earthworm.waveserver.
+    """
+    def setUp(self):
+        self.start = 1300000000.0
+        packets = []
+        for i in range(10):
+            start = self.start + i
+            data = np.arange(100 * i, 100 * (i + 1))
+            # interleaved channels with different data types
+            packets.append(_createPacket('TUCA', 'BHZ', 'UW', '--', start,
+                                         data))
+            packets.append(_createPacket('TUCA', 'BHN', 'UW', '--', start,
+                                         data, datatype='s2'))
+            # gap after 5th packet
+            if i != 5:
+                packets.append(_createPacket('TUCA', 'BHE', 'UW', '00',
+                                             start, data, datatype='t8'))
+        self.dat = ''.join(packets)
+
+    def test_scanTraceBuf2(self):
+        """
+        Tests scanning headers of packets in mixed byte order.
+        """
+        headers, offsets = scanTraceBuf2(self.dat)
+        self.assertEqual(len(headers), 29)
+        self.assertEqual(offsets[0], 0)
+        self.assertEqual(offsets[1], 64 + 400)
+        self.assertEqual(offsets[2], 2 * 64 + 400 + 200)
+        self.assertEqual(list(headers['chan'][:3]), ['BHZ', 'BHN', 'BHE'])
+        self.assertEqual(list(headers['datatype'][:3]), ['i4', 's2', 't8'])
+        np.testing.assert_array_equal(headers['nsamp'], 100)
+        np.testing.assert_array_equal(headers['samprate'], 100.0)
+        self.assertEqual(headers['starttime'][-1], self.start + 9)
+        # incomplete last packet is ignored
+        headers, offsets = scanTraceBuf2(self.dat[:-1])
+        self.assertEqual(len(headers), 28)
+        headers, offsets = scanTraceBuf2('')
+        self.assertEqual(len(headers), 0)
+
+    def test_parseTraceBuf2(self):
+        """
+        Parsed traces equal traces of single packets.
+        """
+        for cleanup in [True, False]:
+            st = parseTraceBuf2(self.dat, cleanup=cleanup)
+            expected = _parsePackets(self.dat, cleanup=cleanup)
+            if cleanup:
+                self.assertEqual([tr.id for tr in st],
+                                 ['UW.TUCA..BHZ', 'UW.TUCA..BHN',
+                                  'UW.TUCA.00.BHE', 'UW.TUCA.00.BHE'])
+                # nothing left to merge
+                st._cleanup()
+                self.assertEqual(len(st), 4)
+            else:
+                self.assertEqual(len(st), 29)
+            st.sort()
+            expected.sort()
+            self.assertEqual(len(st), len(expected))
+            for tr1, tr2 in zip(st, expected):
+                self.assertEqual(tr1.stats, tr2.stats)
+                np.testing.assert_array_equal(tr1.data, tr2.data)
+                self.assertTrue(tr1.data.dtype.isnative)
+        st = parseTraceBuf2(self.dat)
+        self.assertEqual(st[0].stats.starttime, UTCDateTime(self.start))
+        np.testing.assert_array_equal(st[0].data, np.arange(1000))
+        self.assertEqual(st[1].data.dtype, np.dtype('int16'))
+        self.assertEqual(st[2].stats.npts, 500)
+        self.assertEqual(st[3].stats.starttime, UTCDateTime(self.start + 6))
+        self.assertEqual(len(parseTraceBuf2('')), 0)
+
+    def test_benchmark(self):
+        """
+        Compares parsing a long response at once with parsing each packet.
+
+        Set SHOW_BENCHMARK to print the throughput.
+        """
+        dat = ''.join(_createPacket('TUCA', 'BHZ', 'UW', '--',
+                                    self.start + i, np.arange(100))
+                      for i in range(5000))
+        start = time.time()
+        st1 = parseTraceBuf2(dat)
+        vectorized = time.time() - start
+        start = time.time()
+        st2 = _parsePackets(dat)
+        single = time.time() - start
+        self.assertEqual(len(st1), 1)
+        self.assertEqual(st1[0].stats.npts, 500000)
+        self.assertEqual(st1[0].stats, st2[0].stats)
+        if SHOW_BENCHMARK:
+            print "vectorized: %.0f packets/s" % (5000 / vectorized)
+            print "single: %.0f packets/s" % (5000 / single)
+
+
+def suite():
+    return unittest.makeSuite(WaveServerTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -11,8 +11,10 @@ Low-level Earthworm Wave Server tools.
 
 from obspy import Trace, UTCDateTime, Stream
 from obspy.core import Stats
+import select
 import struct
 import socket
+import threading
 import numpy as np
 
 
@@ -35,6 +37,23 @@ DATATYPE_KEY = {
 }
 
 
+# fields of a TRACEBUF2 header, numeric fields are stored in the byte order
+# of the data samples
+TRACEBUF2_HEADER = [('pinno', 'i4'), ('nsamp', 'i4'), ('starttime', 'f8'),
+                    ('endtime', 'f8'), ('samprate', 'f8'), ('sta', 'S7'),
+                    ('net', 'S9'), ('chan', 'S4'), ('loc', 'S3'),
+                    ('version', 'S2'), ('datatype', 'S3'), ('quality', 'S2'),
+                    ('pad', 'S2')]
+TRACEBUF2_HEADER_SIZE = 64
+
+
+def _getHeaderType(endian):
+    """
+    Returns numpy.dtype of a TRACEBUF2 header with given byte order.
+    """
+    return np.dtype([(name, endian + tp) for name, tp in TRACEBUF2_HEADER])
+
+
 def getNumpyType(tpstr):
     """
     given a tracebuf2 type string from header,
@@ -121,18 +140,110 @@ class tracebuf2:
         return Trace(data=self.data, header=stat)
 
 
-def sendSockReq(server, port, reqStr):
+def sendSockReq(server, port, reqStr, sock=None):
     """
     Sets up socket to server and port, sends reqStr
-    to socket and returns open socket
+    to socket and returns open socket.
+    If an open socket is given, the request is sent through that socket.
     """
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.connect((server, port))
+    if sock is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.connect((server, port))
     if reqStr[-1] == '\n':
-        s.send(reqStr)
+        sock.sendall(reqStr)
     else:
-        s.send(reqStr + '\n')
-    return s
+        sock.sendall(reqStr + '\n')
+    return sock
+
+
+class ConnectionPool(object):
+    """
+    Pool of persistent socket connections to a single wave server.
+
+    A wave server handles any number of requests on one connection, so
+    sockets released after a complete request are kept open and reused by
+    following requests. All methods are thread-safe.
+
+    :type server: str
+    :param server: Host name of the wave server.
+    :type port: int
+    :param port: Port of the wave server.
+    :type timeout: float, optional
+    :param timeout: Socket timeout in seconds (default is ``None``).
+    :type maxsize: int, optional
+    :param maxsize: Maximum number of idle connections kept open (default is
+        ``4``).
+    """
+    def __init__(self, server, port, timeout=None, maxsize=4):
+        self.server = server
+        self.port = port
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self.connections = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Returns an idle or a new connected socket.
+        """
+        self._lock.acquire()
+        try:
+            if self._idle:
+                sock = self._idle.pop()
+                sock.settimeout(self.timeout)
+                return sock
+            self.connections += 1
+        finally:
+            self._lock.release()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect((self.server, self.port))
+        return sock
+
+    def release(self, sock):
+        """
+        Returns a socket after a complete request to the pool.
+
+        Sockets which were closed, closed by the server or have unread data
+        pending are discarded.
+        """
+        try:
+            # readable means pending data or end of file
+            if select.select([sock], [], [], 0)[0]:
+                raise socket.error("connection not reusable")
+        except (socket.error, select.error):
+            self.discard(sock)
+            return
+        self._lock.acquire()
+        try:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(sock)
+                return
+        finally:
+            self._lock.release()
+        sock.close()
+
+    def discard(self, sock):
+        """
+        Closes a socket which must not be reused, e.g. after an error.
+        """
+        try:
+            sock.close()
+        except socket.error:
+            pass
+
+    def close(self):
+        """
+        Closes all idle connections.
+        """
+        self._lock.acquire()
+        try:
+            idle, self._idle = self._idle, []
+        finally:
+            self._lock.release()
+        for sock in idle:
+            self.discard(sock)
 
 
 def getSockCharLine(sock, timeout=10.):
@@ -147,6 +258,9 @@ def getSockCharLine(sock, timeout=10.):
             # see http://obspy.org/ticket/383
             # indat = sock.recv(8192)
             indat = sock.recv(1)
+            if not indat:
+                print 'connection closed in getSockCharLine()'
+                return None
             chunks.append(indat)
     except socket.timeout:
         print 'socket timeout in getSockCharLine()'
@@ -170,6 +284,9 @@ def getSockBytes(sock, nbytes, timeout=None):
     try:
         while btoread:
             indat = sock.recv(min(btoread, 8192))
+            if not indat:
+                print 'connection closed in getSockBytes()'
+                return None
             btoread -= len(indat)
             chunks.append(indat)
     except socket.timeout:
@@ -182,9 +299,10 @@ def getSockBytes(sock, nbytes, timeout=None):
         return None
 
 
-def getMenu(server, port, scnl=None):
+def getMenu(server, port, scnl=None, sock=None):
     """
-    Return list of tanks on server
+    Return list of tanks on server.
+    An open socket can be given to send the request through, it is left open.
     """
     rid = 'getMenu'
     if scnl:
@@ -194,9 +312,15 @@ def getMenu(server, port, scnl=None):
     else:
         # added SCNL not documented but required
         getstr = 'MENU: %s SCNL\n' % rid
-    sock = sendSockReq(server, port, getstr)
-    r = getSockCharLine(sock, 2.)
-    sock.close()
+    if sock is None:
+        sock = sendSockReq(server, port, getstr)
+        r = getSockCharLine(sock, 2.)
+        sock.close()
+    else:
+        r = getSockCharLine(sendSockReq(server, port, getstr, sock), 2.)
+        if r is None:
+            # incomplete response, connection must not be reused
+            sock.close()
     if r:
         tokens = r.split()
         if tokens[0] == rid:
@@ -225,34 +349,53 @@ def getMenu(server, port, scnl=None):
     return []
 
 
-def readWaveServerV(server, port, scnl, start, end):
+def _getRawTraceBufs(server, port, scnl, start, end, sock=None):
     """
-    Reads data for specified time interval and scnl on specified waveserverV.
-
-    Returns list of tracebuf2 objects
+    Requests data for specified time interval and scnl on specified
+    waveserverV and returns the raw TRACEBUF2 packets as string or None.
     """
     rid = 'rwserv'
     scnlstr = '%s %s %s %s' % scnl
     reqstr = 'GETSCNLRAW: %s %s %f %f\n' % (rid, scnlstr, start, end)
-    sock = sendSockReq(server, port, reqstr)
+    keep_open = sock is not None
+    sock = sendSockReq(server, port, reqstr, sock)
     r = getSockCharLine(sock, 10.)
     if not r:
-        return []
+        sock.close()
+        return None
     tokens = r.split()
     flag = tokens[6]
     if flag != 'F':
         msg = 'readWaveServerV returned flag %s - %s'
         print  msg % (flag, RETURNFLAG_KEY[flag])
-        return []
+        if not keep_open:
+            sock.close()
+        return None
     nbytes = int(tokens[-1])
     dat = getSockBytes(sock, nbytes)
-    sock.close()
+    if not keep_open or dat is None:
+        sock.close()
+    return dat
+
+
+def readWaveServerV(server, port, scnl, start, end, sock=None):
+    """
+    Reads data for specified time interval and scnl on specified waveserverV.
+    An open socket can be given to send the request through, it is left open
+    unless the response is incomplete.
+
+    Returns list of tracebuf2 objects
+    """
+    dat = _getRawTraceBufs(server, port, scnl, start, end, sock=sock)
+    if not dat:
+        return []
     tbl = []
     new = tracebuf2()  # empty..filled below
     bytesread = 1
     p = 0
     while bytesread and p < len(dat):
-        bytesread = new.readTB2(dat[p:])
+        # buffer object avoids copying the remaining packets
+        bytesread = new.readTB2(buffer(dat, p))
         if bytesread:
             tbl.append(new)
             new = tracebuf2()  # empty..filled on next iteration
@@ -260,6 +403,129 @@ def readWaveServerV(server, port, scnl, start, end):
     return tbl
 
 
+def readWaveServerVStream(server, port, scnl, start, end, cleanup=True,
+                          sock=None):
+    """
+    Reads data for specified time interval and scnl on specified waveserverV.
+    An open socket can be given to send the request through, it is left open
+    unless the response is incomplete.
+
+    Returns obspy.Stream object, see parseTraceBuf2() for cleanup.
+    """
+    dat = _getRawTraceBufs(server, port, scnl, start, end, sock=sock)
+    if not dat:
+        return Stream()
+    return parseTraceBuf2(dat, cleanup=cleanup)
+
+
+def scanTraceBuf2(dat):
+    """
+    Scans string of consecutive TRACEBUF2 packets.
+
+    Returns structured array with the header fields of all complete packets
+    in native byte order and array of the offsets of the packets.
+    """
+    offsets = []
+    endians = []
+    p = 0
+    size = len(dat)
+    while p + TRACEBUF2_HEADER_SIZE <= size:
+        # only data type and number of samples are needed to find the next
+        # packet, all other header fields are converted at once below
+        tp = DATATYPE_KEY.get(dat[p + 57:p + 59])
+        if tp is None:
+            print 'unknown data type in tracebuf2 header'
+            break
+        nsamp = struct.unpack_from(tp[0] + 'i', dat, p + 4)[0]
+        nbytes = TRACEBUF2_HEADER_SIZE + nsamp * int(tp[-1])
+        if nsamp < 0 or p + nbytes > size:
+            break
+        offsets.append(p)
+        endians.append(tp[0])
+        p += nbytes
+    offsets = np.array(offsets, dtype='int64')
+    headers = np.empty(len(offsets), dtype=_getHeaderType('='))
+    if not len(offsets):
+        return headers, offsets
+    # gather all headers with one indexing operation
+    raw = np.frombuffer(dat, dtype='uint8')
+    raw = raw[offsets[:, None] + np.arange(TRACEBUF2_HEADER_SIZE)]
+    endians = np.array(endians)
+    for endian in '<>':
+        mask = endians == endian
+        if mask.any():
+            headers[mask] = raw[mask].view(_getHeaderType(endian)).ravel()
+    return headers, offsets
+
+
+def parseTraceBuf2(dat, cleanup=True):
+    """
+    Parses string of consecutive TRACEBUF2 packets into obspy.Stream object.
+
+    The buffer is scanned once and the samples of all packets of a channel
+    are copied into one array per trace. With cleanup, directly adjacent
+    packets of a channel are merged into a single trace (see
+    obspy.core.stream.Stream._cleanup()), otherwise each packet results in
+    one trace.
+    """
+    headers, offsets = scanTraceBuf2(dat)
+    traces = []
+    if not len(headers):
+        return Stream()
+    # group packets by SCNL and data type in order of first appearance
+    keys = np.empty(len(headers), dtype=[(name, 'S9') for name in
+                                         ('sta', 'net', 'chan', 'loc',
+                                          'datatype')])
+    for name in keys.dtype.names:
+        keys[name] = headers[name]
+    _, firsts, inverse = np.unique(keys.view('S45'), return_index=True,
+                                   return_inverse=True)
+    for group in np.argsort(firsts):
+        # packets of this channel sorted by start time
+        idx = np.nonzero(inverse == group)[0]
+        idx = idx[np.argsort(headers['starttime'][idx], kind='mergesort')]
+        head = headers[idx]
+        start = head['starttime']
+        rate = head['samprate']
+        nsamp = head['nsamp']
+        if cleanup:
+            # perfectly adjacent packets with same sampling rate, compared
+            # with the precision of UTCDateTime objects
+            precision = UTCDateTime.DEFAULT_PRECISION
+            expected = start[:-1] + nsamp[:-1] / rate[:-1]
+            adjacent = (np.round(start[1:], precision) ==
+                        np.round(expected, precision)) & \
+                (rate[1:] == rate[:-1])
+            breaks = np.nonzero(~adjacent)[0] + 1
+        else:
+            breaks = np.arange(1, len(idx))
+        first = head[0]
+        tp = getNumpyType(first['datatype'][:2])
+        stats = Stats()
+        stats.network = first['net'].split('\x00')[0]
+        stats.station = first['sta'].split('\x00')[0]
+        location = first['loc'].split('\x00')[0]
+        if location != '--':
+            stats.location = location
+        stats.channel = first['chan'].split('\x00')[0]
+        bounds = np.concatenate([[0], breaks, [len(idx)]])
+        for i, j in zip(bounds[:-1], bounds[1:]):
+            # copy samples of all packets of a trace into one array
+            data = np.empty(nsamp[i:j].sum(), dtype=tp.newbyteorder('='))
+            n = 0
+            for k in range(i, j):
+                data[n:n + nsamp[k]] = np.frombuffer(
+                    dat, dtype=tp, count=nsamp[k],
+                    offset=offsets[idx[k]] + TRACEBUF2_HEADER_SIZE)
+                n += nsamp[k]
+            header = stats.copy()
+            header.starttime = UTCDateTime(start[i])
+            header.sampling_rate = rate[i]
+            header.npts = len(data)
+            traces.append(Trace(data=data, header=header))
+    return Stream(traces)
+
+
 def tracebufs2obspyStream(tbuflist):
     """
     Returns obspy.Stream object from input list of tracebuf2 objects
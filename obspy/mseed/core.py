@@ -91,7 +91,7 @@ def isMSEED(filename):
 
 def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
               sourcename=None, reclen=None, recinfo=True, details=False,
-              **kwargs):
+              use_index=False, **kwargs):
     """
     Reads a Mini-SEED file and returns a Stream object.
 
@@ -134,6 +134,14 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
         information: 1 == Step Calibration, 2 == Sine Calibration, 3 ==
         Pseudo-random Calibration, 4 == Generic Calibration and -2 ==
         Calibration Abort.
+    :type use_index: bool, optional
+    :param use_index: If ``True`` and any of ``starttime``, ``endtime`` or
+        ``sourcename`` is given, only the matching records of the file are
+        passed to libmseed. The records are looked up in a record index
+        stored in a hidden sidecar file next to the Mini-SEED file, which is
+        created or rebuilt automatically if missing or outdated, see
+        :func:`~obspy.mseed.util.getRecordIndex`. Only applies to files given
+        by file name. Defaults to ``False``.
 
     .. rubric:: Example
 
@@ -184,13 +192,39 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
                 'byteorder': info['byteorder'],
                 'number_of_records': info['number_of_records']}
 
-    # If its a filename just read it.
-    if isinstance(mseed_object,  basestring):
-        # Read to NumPy array which is used as a buffer.
-        buffer = np.fromfile(mseed_object, dtype='b')
+    # If its a filename memory map it, so only those parts of the file are
+    # actually read from disk which are touched by the underlying C routine.
+    # The map is copy-on-write as libmseed swaps some bytes in place.
+    if isinstance(mseed_object, basestring):
+        if os.path.getsize(mseed_object) > 0:
+            buffer = np.memmap(mseed_object, dtype='b', mode='c')
+        else:
+            buffer = np.fromfile(mseed_object, dtype='b')
     elif hasattr(mseed_object, 'read'):
         buffer = np.fromstring(mseed_object.read(), dtype='b')
 
+    # Use the record index to pass only matching records to libmseed.
+    if use_index and isinstance(mseed_object, basestring) and \
+       (starttime is not None or endtime is not None or
+        sourcename is not None):
+        try:
+            index = util.getRecordIndex(mseed_object)
+        except Exception, e:
+            msg = "Could not index file %s (%s). Reading whole file." % \
+                (mseed_object, e)
+            warnings.warn(msg)
+        else:
+            ranges = util._selectRecordRanges(index, starttime, endtime,
+                                              sourcename)
+            if not ranges:
+                return Stream()
+            elif len(ranges) == 1:
+                offset, length = ranges[0]
+                buffer = buffer[offset:offset + length]
+            else:
+                buffer = np.concatenate([buffer[offset:offset + length]
+                                         for offset, length in ranges])
+
     # Get the record length
     try:
         record_length = pow(2, int(''.join([chr(_i) for _i in buffer[19:21]])))
@@ -332,6 +366,8 @@ def readMSEED(mseed_object, starttime=None, endtime=None, headonly=False,
 
     clibmseed.lil_free(lil)
     del lil
+    # release the memory map
+    del buffer
     return Stream(traces=traces)
 
 
@@ -345,6 +345,30 @@ class MSEEDReadingAndWritingTestCase(unittest.TestCase):
         st6 = readMSEED(testfile, sourcename='*.BLA')
         self.assertEqual(len(st6), 0)
 
+    def test_readViaMemoryMap(self):
+        """
+        Files given by name are memory mapped. Reading must neither alter the
+        file on disk nor change the results compared to reading from an open
+        file object.
+        """
+        for filename in ['test.mseed', 'two_channels.mseed',
+                         'BW.BGLD.__.EHE.D.2008.001.first_10_records']:
+            testfile = os.path.join(self.path, 'data', filename)
+            with open(testfile, 'rb') as fh:
+                org_bytes = fh.read()
+            st1 = readMSEED(testfile)
+            with open(testfile, 'rb') as fh:
+                st2 = readMSEED(fh)
+            self.assertEqual(st1, st2)
+            # time window selection
+            t = st1[0].stats.starttime
+            st1 = readMSEED(testfile, starttime=t + 5, endtime=t + 10)
+            with open(testfile, 'rb') as fh:
+                st2 = readMSEED(fh, starttime=t + 5, endtime=t + 10)
+            self.assertEqual(st1, st2)
+            with open(testfile, 'rb') as fh:
+                self.assertEqual(org_bytes, fh.read())
+
     def test_readFromStringIO(self):
         """
         Tests reading from a MiniSEED file in an StringIO object.
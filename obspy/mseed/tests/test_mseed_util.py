@@ -7,7 +7,9 @@ from obspy.core.util import NamedTemporaryFile
 import numpy as np
 import os
 import random
+import shutil
 import sys
+import tempfile
 import unittest
 import warnings
 
@@ -280,6 +282,71 @@ class MSEEDUtilTestCase(unittest.TestCase):
 
         os.remove(output_filename)
 
+    def test_recordIndex(self):
+        """
+        Tests building, storing and rebuilding the record index sidecar file.
+        """
+        tempdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tempdir, 'test.mseed')
+            shutil.copy(os.path.join(self.path, 'data',
+                "BW.BGLD.__.EHE.D.2008.001.first_10_records"), filename)
+            index = util.buildRecordIndex(filename)
+            self.assertEqual(len(index), 10)
+            for record in index:
+                info = util.getRecordInformation(filename,
+                                                 offset=record['offset'])
+                self.assertEqual(record['id'], 'BW.BGLD..EHE')
+                self.assertEqual(record['reclen'], info['record_length'])
+                self.assertEqual(record['npts'], info['npts'])
+                self.assertEqual(UTCDateTime(record['starttime']),
+                                 info['starttime'])
+                self.assertEqual(UTCDateTime(record['endtime']),
+                                 info['endtime'])
+            # sidecar file is written as hidden file
+            index_filename = os.path.join(tempdir, '.test.mseed.idx.npz')
+            np.testing.assert_array_equal(util.getRecordIndex(filename),
+                                          index)
+            self.assertTrue(os.path.exists(index_filename))
+            self.assertEqual(os.listdir(tempdir).count('.test.mseed.idx.npz'),
+                             1)
+            np.testing.assert_array_equal(util.getRecordIndex(filename),
+                                          index)
+            # a stale sidecar file is rebuilt
+            data = open(filename, 'rb').read()
+            open(filename, 'wb').write(data[:512 * 5])
+            new_index = util.getRecordIndex(filename)
+            self.assertEqual(len(new_index), 5)
+            np.testing.assert_array_equal(new_index, index[:5])
+            npz = np.load(index_filename)
+            self.assertEqual(len(npz['index']), 5)
+            npz.close()
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_readMSEEDUsingRecordIndex(self):
+        """
+        Reading with a record index returns the same data as without.
+        """
+        tempdir = tempfile.mkdtemp()
+        try:
+            for name in ['BW.BGLD.__.EHE.D.2008.001.first_10_records',
+                         'two_channels.mseed', 'test.mseed']:
+                filename = os.path.join(tempdir, name)
+                shutil.copy(os.path.join(self.path, 'data', name), filename)
+                st = readMSEED(filename)
+                t = st[0].stats.starttime
+                for kwargs in [{'starttime': t + 1, 'endtime': t + 1.5},
+                               {'starttime': t + 3},
+                               {'endtime': t + 2},
+                               {'sourcename': '*.EHZ'},
+                               {'starttime': t - 100, 'endtime': t - 50}]:
+                    st1 = readMSEED(filename, **kwargs)
+                    st2 = readMSEED(filename, use_index=True, **kwargs)
+                    self.assertEqual(st1, st2)
+        finally:
+            shutil.rmtree(tempdir)
+
 
 def suite():
     return unittest.makeSuite(MSEEDUtilTestCase, 'test')
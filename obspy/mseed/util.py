@@ -3,15 +3,26 @@
 Mini-SEED specific utilities.
 """
 from headers import HPTMODULUS, clibmseed, FRAME, SAMPLESIZES, ENDIAN
+from itertools import izip
 from obspy import UTCDateTime
 from obspy.core.util import scoreatpercentile
 from struct import unpack
 import sys
 import ctypes as C
+import fnmatch
 import numpy as np
+import os
 import warnings
 
 
+# Structure of a record index as returned by getRecordIndex().
+RECORD_INDEX_DTYPE = np.dtype([
+    ('offset', 'i8'), ('reclen', 'i4'), ('id', 'S15'),
+    ('starttime', 'f8'), ('endtime', 'f8'), ('npts', 'i4')])
+# Version of the record index sidecar file format.
+RECORD_INDEX_VERSION = 1
+
+
 def getStartAndEndTime(file_or_file_object):
     """
     Returns the start- and endtime of a Mini-SEED file or file-like object.
@@ -396,6 +407,152 @@ def _getRecordInformation(file_object, offset=0):
     return info
 
 
+def buildRecordIndex(filename):
+    """
+    Scans all records of a Mini-SEED file and returns a record index.
+
+    The record index is a NumPy structured array with one entry per record
+    holding its byte ``offset`` within the file, the record length
+    ``reclen``, the SEED identifier ``id``, the ``starttime`` and ``endtime``
+    as POSIX timestamps and the number of samples ``npts``.
+
+    :type filename: str
+    :param filename: Mini-SEED file name. The file must consist of Mini-SEED
+        data records only, each of them containing a blockette 1000.
+    :rtype: :class:`numpy.ndarray`
+
+    .. rubric:: Example
+
+    >>> from obspy.core.util import getExampleFile
+    >>> filename = getExampleFile("two_channels.mseed")
+    >>> index = buildRecordIndex(filename)
+    >>> print(index['id'])
+    ['BW.UH3..EHE' 'BW.UH3..EHZ']
+    >>> print(index['offset'])
+    [  0 512]
+    """
+    filesize = os.path.getsize(filename)
+    if filesize % 256 != 0:
+        msg = "File size of %s is not a multiple of 256 bytes" % filename
+        raise ValueError(msg)
+    records = []
+    with open(filename, 'rb') as f:
+        offset = 0
+        while offset < filesize:
+            f.seek(offset, 0)
+            header = f.read(20)
+            if header[6] not in ['D', 'R', 'Q', 'M']:
+                msg = "No Mini-SEED data record at offset %d of %s"
+                raise ValueError(msg % (offset, filename))
+            f.seek(0, 0)
+            info = _getRecordInformation(f, offset=offset)
+            if 'record_length' not in info:
+                msg = "Record at offset %d of %s has no blockette 1000"
+                raise ValueError(msg % (offset, filename))
+            id = ".".join([header[18:20].strip(), header[8:13].strip(),
+                           header[13:15].strip(), header[15:18].strip()])
+            records.append((offset, info['record_length'], id,
+                            info['starttime'].timestamp,
+                            info['endtime'].timestamp, info['npts']))
+            offset += info['record_length']
+    return np.array(records, dtype=RECORD_INDEX_DTYPE)
+
+
+def _getRecordIndexFilename(filename):
+    """
+    Returns the name of the record index sidecar file of given file.
+
+    The sidecar file is a hidden file in the same directory, so it is not
+    matched by wildcard patterns like ``*`` used to read a whole directory.
+    """
+    dirname, basename = os.path.split(filename)
+    return os.path.join(dirname, '.%s.idx.npz' % basename)
+
+
+def getRecordIndex(filename, write=True):
+    """
+    Returns the record index of a Mini-SEED file using a sidecar file.
+
+    The record index is read from the sidecar file if it has been created for
+    the current version of the Mini-SEED file, determined by its file size
+    and modification time. Otherwise it is built using
+    :func:`buildRecordIndex` and written to the sidecar file.
+
+    :type filename: str
+    :param filename: Mini-SEED file name.
+    :type write: bool, optional
+    :param write: Write a new or stale sidecar file. Failures writing the
+        sidecar file, e.g. within a read-only directory, are ignored.
+        Defaults to ``True``.
+    :rtype: :class:`numpy.ndarray`
+    :return: Record index, see :func:`buildRecordIndex`.
+    """
+    stat = os.stat(filename)
+    index_filename = _getRecordIndexFilename(filename)
+    try:
+        npz = np.load(index_filename)
+        try:
+            if int(npz['version']) == RECORD_INDEX_VERSION and \
+               int(npz['filesize']) == stat.st_size and \
+               float(npz['mtime']) == stat.st_mtime:
+                return npz['index']
+        finally:
+            npz.close()
+    except Exception:
+        pass
+    index = buildRecordIndex(filename)
+    if write:
+        try:
+            with open(index_filename, 'wb') as fh:
+                np.savez(fh, index=index, version=RECORD_INDEX_VERSION,
+                         filesize=stat.st_size, mtime=stat.st_mtime)
+        except (IOError, OSError):
+            pass
+    return index
+
+
+def _selectRecordRanges(index, starttime=None, endtime=None,
+                        sourcename=None):
+    """
+    Returns the byte ranges of all records of a record index matching the
+    given selection.
+
+    Adjacent records are merged into one range.
+
+    :return: List of (offset, length) tuples.
+
+    .. rubric:: Example
+
+    >>> index = np.array([(0, 512, 'BW.A..EHZ', 0.0, 9.0, 10),
+    ...                   (512, 512, 'BW.A..EHE', 0.0, 9.0, 10),
+    ...                   (1024, 512, 'BW.A..EHZ', 10.0, 19.0, 10),
+    ...                   (1536, 512, 'BW.A..EHZ', 20.0, 29.0, 10)],
+    ...                  dtype=RECORD_INDEX_DTYPE)
+    >>> _selectRecordRanges(index, sourcename='*.EHZ')
+    [(0, 512), (1024, 1024)]
+    >>> _selectRecordRanges(index, starttime=UTCDateTime(12))
+    [(1024, 1024)]
+    """
+    mask = np.ones(len(index), dtype='bool')
+    if starttime is not None:
+        mask &= index['endtime'] >= starttime.timestamp
+    if endtime is not None:
+        mask &= index['starttime'] <= endtime.timestamp
+    if sourcename is not None:
+        ids = index['id'][mask]
+        matches = [fnmatch.fnmatch(id, sourcename) for id in ids]
+        mask[mask] = np.array(matches, dtype='bool')
+    ranges = []
+    for offset, reclen in izip(index['offset'][mask], index['reclen'][mask]):
+        offset = int(offset)
+        reclen = int(reclen)
+        if ranges and sum(ranges[-1]) == offset:
+            ranges[-1] = (ranges[-1][0], ranges[-1][1] + reclen)
+        else:
+            ranges.append((offset, reclen))
+    return ranges
+
+
 def _ctypesArray2NumpyArray(buffer, buffer_elements, sampletype):
     """
     Takes a Ctypes array and its length and type and returns it as a
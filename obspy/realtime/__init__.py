@@ -21,6 +21,7 @@ mining".
 """
 from obspy.realtime.rtmemory import RtMemory
 from obspy.realtime.rttrace import RtTrace
+from obspy.realtime.rtstream import RtStream
 
 
 if __name__ == '__main__':
@@ -12,9 +12,17 @@ Module for handling ObsPy RtMemory objects.
 import numpy as np
 
 
-class RtMemory:
+class RtMemory(object):
     """
     Real time memory class.
+
+    The input and output memory arrays are windows into preallocated buffers
+    of twice their length. Updating a memory array writes the new values
+    behind the current window and moves the window forward, only after the
+    end of the buffer is reached the window is copied back to the start of
+    the buffer. Thus updates do not allocate new arrays. The arrays returned
+    by :attr:`input` and :attr:`output` are views, values can be changed in
+    place but the views are only valid until the next update.
     """
     def __init__(self):
         self.initialized = False
@@ -37,37 +45,70 @@ class RtMemory:
         :param output_inital_value: Initialization value for the output
             memory array (default is 1.0).
         """
-        self.input = np.empty(length_input, data_type)
-        self.input.fill(input_inital_value)
+        self._input_buffer = np.empty(2 * length_input, data_type)
+        self._input_buffer.fill(input_inital_value)
+        self._input_pos = 0
 
-        self.output = np.empty(length_output, data_type)
-        self.output.fill(output_inital_value)
+        self._output_buffer = np.empty(2 * length_output, data_type)
+        self._output_buffer.fill(output_inital_value)
+        self._output_pos = 0
 
         self.initialized = True
 
-    def _update(self, memory_array, data):
+    def _getInput(self):
+        length = len(self._input_buffer) // 2
+        return self._input_buffer[self._input_pos:self._input_pos + length]
+
+    def _setInput(self, value):
+        value = np.asarray(value)
+        self._input_buffer = np.concatenate((value, value))
+        self._input_pos = 0
+
+    input = property(_getInput, _setInput,
+                     doc="Input memory array (view into buffer)")
+
+    def _getOutput(self):
+        length = len(self._output_buffer) // 2
+        return self._output_buffer[self._output_pos:self._output_pos + length]
+
+    def _setOutput(self, value):
+        value = np.asarray(value)
+        self._output_buffer = np.concatenate((value, value))
+        self._output_pos = 0
+
+    output = property(_getOutput, _setOutput,
+                      doc="Output memory array (view into buffer)")
+
+    def _update(self, buffer, pos, data):
         """
-        Update specified memory array using specified number of points from
+        Update specified memory buffer using specified number of points from
         end of specified data array.
 
-        :type memory_array: numpy.ndarray
-        :param memory_array:  Memory array (input or output) in this
-            RtMemory object to update.
+        :type buffer: numpy.ndarray
+        :param buffer: Buffer (input or output) in this RtMemory object to
+            update in place.
+        :type pos: int
+        :param pos: Start of current memory window in buffer.
         :type data: numpy.ndarray
-        :param data:  Data array to use for update.
-        :return: NumPy :class:`np.ndarray` object containing updated
-            memory array (input or output).
+        :param data: Data array to use for update.
+        :return: Start of updated memory window in buffer.
         """
-        if data.size >= np.size(memory_array):
+        length = len(buffer) // 2
+        size = np.size(data)
+        if length == 0:
+            return pos
+        if size >= length:
             # data length greater than or equal to memory length
-            memory_array = data[np.size(data) - np.size(memory_array):]
-        else:
-            # data length less than memory length
-            # shift memory
-            memory_array = memory_array[data.size:]
-            # append data
-            memory_array = np.concatenate((memory_array, data))
-        return memory_array
+            buffer[:length] = data[size - length:]
+            return 0
+        if pos + length + size <= len(buffer):
+            # append data behind current window
+            buffer[pos + length:pos + length + size] = data
+            return pos + size
+        # end of buffer reached, shift memory to start of buffer and append
+        buffer[:length - size] = buffer[pos + size:pos + length]
+        buffer[length - size:length] = data
+        return 0
 
     def updateOutput(self, data):
         """
@@ -77,7 +118,8 @@ class RtMemory:
         :type data: numpy.ndarray
         :param data:  Data array to use for update.
         """
-        self.output = self._update(self.output, data)
+        self._output_pos = self._update(self._output_buffer, self._output_pos,
+                                        data)
 
     def updateInput(self, data):
         """
@@ -87,4 +129,5 @@ class RtMemory:
         :type data: numpy.ndarray
         :param data:  Data array to use for update.
         """
-        self.input = self._update(self.input, data)
+        self._input_pos = self._update(self._input_buffer, self._input_pos,
+                                       data)
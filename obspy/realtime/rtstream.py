@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Module for handling ObsPy RtStream objects.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org) & Anthony Lomax
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+
+from obspy import Stream, Trace
+from obspy.realtime.rttrace import RtTrace
+import copy
+import numpy as np
+
+
+def _scaleBatch(data, delta, rtmemory_lists, factor=1.0):  # @UnusedVariable
+    """
+    Scale rows of a 2-D array, see :func:`obspy.realtime.signal.scale`.
+    """
+    data *= factor
+    return data
+
+
+def _integrateBatch(data, delta, rtmemory_lists):
+    """
+    Integrate rows of a 2-D array, see
+    :func:`obspy.realtime.signal.integrate`.
+    """
+    sums = np.empty((data.shape[0], data.shape[1] + 1), np.float64)
+    for i, rtmemory_list in enumerate(rtmemory_lists):
+        rtmemory = rtmemory_list[0]
+        if not rtmemory.initialized:
+            rtmemory.initialize(data.dtype, 0, 1, 0, 0)
+        sums[i, 0] = rtmemory.output[0]
+    sums[:, 1:] = data
+    sums[:, 1:] *= delta
+    np.add.accumulate(sums, axis=1, out=sums)
+    for i, rtmemory_list in enumerate(rtmemory_lists):
+        rtmemory_list[0].output[0] = sums[i, -1]
+    data[:] = sums[:, 1:]
+    return data
+
+
+def _differentiateBatch(data, delta, rtmemory_lists):
+    """
+    Differentiate rows of a 2-D array, see
+    :func:`obspy.realtime.signal.differentiate`.
+    """
+    diff = np.empty_like(data)
+    for i, rtmemory_list in enumerate(rtmemory_lists):
+        rtmemory = rtmemory_list[0]
+        if not rtmemory.initialized:
+            rtmemory.initialize(data.dtype, 1, 0, 0, 0)
+            # avoid large diff value for first output sample
+            rtmemory.input[0] = data[i, 0]
+        diff[i, 0] = data[i, 0] - rtmemory.input[0]
+        rtmemory.input[0] = data[i, -1]
+    np.subtract(data[:, 1:], data[:, :-1], diff[:, 1:])
+    data[:] = diff.astype(np.float64) / delta
+    return data
+
+
+# dictionary to map predefined processing functions to implementations
+# working on 2-D arrays with one channel per row
+BATCH_PROCESS_FUNCTIONS = {
+    'scale': _scaleBatch,
+    'integrate': _integrateBatch,
+    'differentiate': _differentiateBatch,
+}
+
+
+class RtStream(Stream):
+    """
+    A Stream of RtTrace objects, one for each channel, fed by appending
+    streams of sequential data packets.
+
+    Appended traces are routed by their id to the RtTrace of the channel,
+    which is created on first use. All channels share the processing chain
+    registered with :meth:`registerRtProcess`. If the chain consists only of
+    NumPy ufuncs and the predefined processes listed in
+    ``BATCH_PROCESS_FUNCTIONS``, packets of different channels with the same
+    sampling rate, number of samples and data type appended at once are
+    stacked and processed as a single 2-D array. All other packets are
+    processed by the RtTrace of the channel.
+
+    :type max_length: int, optional
+    :param max_length: maximum trace length in seconds of each channel
+    :type ring_buffer: bool, optional
+    :param ring_buffer: Store samples of each channel in a ring buffer, see
+        :class:`~obspy.realtime.rttrace.RtTrace`.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> from obspy.realtime import RtStream
+    >>> rt_stream = RtStream(max_length=60)
+    >>> rt_stream.registerRtProcess('integrate')
+    1
+    >>> rt_stream.registerRtProcess('scale', factor=2.0)
+    2
+    >>> st = read()
+    >>> for i in range(3):
+    ...     processed = rt_stream.append(st.slice(
+    ...         st[0].stats.starttime + 10 * i,
+    ...         st[0].stats.starttime + 10 * i + 9.995))
+    >>> print(rt_stream)  # doctest: +ELLIPSIS
+    3 Trace(s) in Stream:
+    BW.RJOB..EHZ | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
+    BW.RJOB..EHN | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
+    BW.RJOB..EHE | 2009-08-24T00:20:03.000000Z ... | 100.0 Hz, 3000 samples
+
+    Within a :class:`~obspy.seedlink.slclient.SLClient` the stream of each
+    received packet may be appended directly, e.g.
+    ``rt_stream.append(Stream([slpack.getTrace()]))``.
+    """
+    def __init__(self, max_length=None, ring_buffer=False):
+        """
+        Initializes an RtStream.
+        """
+        if max_length is not None and max_length <= 0:
+            raise ValueError("Input max_length out of bounds: %s" % max_length)
+        if ring_buffer and max_length is None:
+            raise ValueError("ring_buffer requires max_length")
+        self.max_length = max_length
+        self.ring_buffer = ring_buffer
+        # processing chain shared by all channels
+        self.processing = []
+        # RtTrace objects by trace id
+        self._channels = {}
+        super(RtStream, self).__init__()
+
+    def __add__(self, other):  # @UnusedVariable
+        """
+        Too ambiguous, throw an Error.
+
+        .. seealso:: :meth:`obspy.realtime.RtStream.append`.
+        """
+        msg = "Too ambiguous for realtime stream data. Try: RtStream.append()"
+        raise NotImplementedError(msg)
+
+    def registerRtProcess(self, process, **options):
+        """
+        Adds real-time processing algorithm to processing list of all channels.
+
+        See :meth:`obspy.realtime.rttrace.RtTrace.registerRtProcess` for all
+        parameters.
+
+        :rtype: int
+        :return: Length of processing list after registering new processing
+            function.
+        """
+        # resolve process name and check if process is known
+        rttrace = RtTrace()
+        rttrace.registerRtProcess(process, **options)
+        process = rttrace.processing[0][0]
+        self.processing.append((process, options))
+        for rttrace in self.traces:
+            rttrace.registerRtProcess(process, **options)
+        return len(self.processing)
+
+    def _getChannel(self, trace_id):
+        """
+        Returns RtTrace of given channel, which is created if necessary.
+        """
+        try:
+            return self._channels[trace_id]
+        except KeyError:
+            pass
+        rttrace = RtTrace(max_length=self.max_length,
+                          ring_buffer=self.ring_buffer)
+        for process, options in self.processing:
+            rttrace.registerRtProcess(process, **options)
+        self._channels[trace_id] = rttrace
+        self.traces.append(rttrace)
+        return rttrace
+
+    def _isBatchable(self):
+        """
+        Checks if the processing chain can be applied to 2-D arrays.
+        """
+        for process, _options in self.processing:
+            if isinstance(process, np.ufunc):
+                continue
+            if process not in BATCH_PROCESS_FUNCTIONS:
+                return False
+        return True
+
+    def append(self, stream, gap_overlap_check=False, verbose=False):
+        """
+        Appends all traces of a Stream object to the channels of this RtStream.
+
+        Registered real-time processing will be applied to a copy of each
+        appended Trace object before it is appended to the RtTrace with the
+        same id. Multiple packets of the same channel are appended in the
+        given order.
+
+        :type stream: :class:`~obspy.core.stream.Stream` or
+            :class:`~obspy.core.trace.Trace`
+        :param stream: Stream of data packets to append.
+        :type gap_overlap_check: bool, optional
+        :param gap_overlap_check: See
+            :meth:`obspy.realtime.rttrace.RtTrace.append`.
+        :type verbose: bool, optional
+        :param verbose: Print additional information to stdout
+        :rtype: :class:`~obspy.core.stream.Stream`
+        :return: Processed traces in order of the appended traces.
+        """
+        if isinstance(stream, Trace):
+            stream = Stream([stream])
+        if not isinstance(stream, Stream):
+            msg = "Only obspy.core.stream.Stream objects are allowed"
+            raise TypeError(msg)
+        results = [None] * len(stream)
+        pending = []
+        pending_ids = set()
+        for i, trace in enumerate(stream):
+            if not isinstance(trace, Trace):
+                msg = "Only obspy.core.trace.Trace objects are allowed"
+                raise TypeError(msg)
+            trace_id = trace.getId()
+            # process earlier packets of same channel first
+            if trace_id in pending_ids:
+                self._flush(pending, results)
+                pending = []
+                pending_ids = set()
+            rttrace = self._getChannel(trace_id)
+            gap_or_overlap = rttrace._checkAppend(trace, gap_overlap_check,
+                                                  verbose)
+            pending.append((i, rttrace, trace, gap_or_overlap))
+            pending_ids.add(trace_id)
+        self._flush(pending, results)
+        return Stream(results)
+
+    def _flush(self, pending, results):
+        """
+        Processes and stores pending packets, grouped into batches if
+        possible.
+        """
+        groups = {}
+        single = []
+        batchable = self.processing and self._isBatchable()
+        for item in pending:
+            _i, _rttrace, trace, gap_or_overlap = item
+            if not batchable or gap_or_overlap or not trace.stats.npts or \
+               isinstance(trace.data, np.ma.MaskedArray):
+                single.append(item)
+                continue
+            key = (trace.stats.sampling_rate, trace.stats.npts,
+                   trace.data.dtype.str)
+            groups.setdefault(key, []).append(item)
+        for items in groups.values():
+            if len(items) < 2:
+                single.extend(items)
+                continue
+            data = self._processBatch(items)
+            for (i, rttrace, trace, _gap_or_overlap), row in zip(items, data):
+                trace = Trace(data=row, header=copy.deepcopy(trace.stats))
+                rttrace._store(trace)
+                results[i] = trace
+        for i, rttrace, trace, gap_or_overlap in single:
+            trace = rttrace._process(trace, gap_or_overlap)
+            rttrace._store(trace, gap_or_overlap)
+            results[i] = trace
+
+    def _processBatch(self, items):
+        """
+        Applies the processing chain to stacked data of multiple channels.
+        """
+        traces = [item[2] for item in items]
+        rttraces = [item[1] for item in items]
+        data = np.array([trace.data for trace in traces])
+        delta = traces[0].stats.delta
+        for n, (process, options) in enumerate(self.processing):
+            dtype = data.dtype
+            if isinstance(process, np.ufunc):
+                data = process(data, **options)
+            else:
+                func = BATCH_PROCESS_FUNCTIONS[process]
+                rtmemory_lists = [rttrace.processing[n][2]
+                                  for rttrace in rttraces]
+                data = func(data, delta, rtmemory_lists, **options)
+            # assure dtype is not changed
+            data = np.require(data, dtype=dtype)
+        return data
+
+    def extend(self, trace_list):
+        """
+        Appends a list of Trace objects, see :meth:`append`.
+        """
+        if isinstance(trace_list, list):
+            trace_list = Stream(trace_list)
+        self.append(trace_list)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -41,6 +41,12 @@ class RtTrace(Trace):
 
     :type max_length: int, optional
     :param max_length: maximum trace length in seconds
+    :type ring_buffer: bool, optional
+    :param ring_buffer: If ``True``, samples are stored in a preallocated
+        circular buffer sized from ``max_length``, so appending a packet costs
+        only the copy of the packet itself and :attr:`data` is a view into
+        that buffer (see :meth:`append`). Requires ``max_length``. Defaults
+        to ``False``.
 
     .. rubric:: Example
 
@@ -123,7 +129,8 @@ class RtTrace(Trace):
             string += str(REALTIME_PROCESS_FUNCTIONS[key][0].__doc__)
         return(string)
 
-    def __init__(self, max_length=None, *args, **kwargs):  # @UnusedVariable
+    def __init__(self, max_length=None, ring_buffer=False, *args,
+                 **kwargs):  # @UnusedVariable
         """
         Initializes an RtTrace.
 
@@ -132,7 +139,13 @@ class RtTrace(Trace):
         # set window length attribute
         if max_length is not None and max_length <= 0:
             raise ValueError("Input max_length out of bounds: %s" % max_length)
+        if ring_buffer and max_length is None:
+            raise ValueError("ring_buffer requires max_length")
         self.max_length = max_length
+        self.ring_buffer = ring_buffer
+        # circular buffer holding every sample twice (see _writeRingBuffer)
+        self._buffer = None
+        self._buffer_pos = 0
 
         # initialize processing list
         self.processing = []
@@ -170,6 +183,12 @@ class RtTrace(Trace):
         from the beginning to RtTrace.max_length, if specified.
         Sampling rate, data type and trace.id of both traces must match.
 
+        If this RtTrace uses a ring buffer, contiguous packets are written
+        into the buffer without reallocating the data of this RtTrace and
+        :attr:`data` is replaced by a view of the latest samples. Views
+        obtained earlier are overwritten by later packets, so use
+        ``data.copy()`` to keep a snapshot.
+
         :type trace: :class:`~obspy.core.trace.Trace`
         :param trace:  :class:`~obspy.core.trace.Trace` object to append to
             this RtTrace
@@ -185,6 +204,22 @@ class RtTrace(Trace):
         :return: NumPy :class:`np.ndarray` object containing processed trace
             data from appended Trace object.
         """
+        gap_or_overlap = self._checkAppend(trace, gap_overlap_check, verbose)
+        trace = self._process(trace, gap_or_overlap)
+        self._store(trace, gap_or_overlap)
+        return trace
+
+    def _checkAppend(self, trace, gap_overlap_check=False, verbose=False):
+        """
+        Checks if given Trace object may be appended to this RtTrace.
+
+        The start time of this RtTrace is pinned to the start of the appended
+        trace if both are contiguous. See :meth:`append` for all parameters.
+
+        :rtype: bool
+        :return: ``True`` if there is a gap or overlap between the end of this
+            RtTrace and the start of the appended Trace.
+        """
         if not isinstance(trace, Trace):
             # only add Trace objects
             raise TypeError("Only obspy.core.trace.Trace objects are allowed")
@@ -252,7 +287,22 @@ class RtTrace(Trace):
                 if verbose:
                     print "%s: self.stats.starttime adjusted by: %gs" \
                         % (self.__class__.__name__, diff - self.stats.delta)
-        # first apply all registered processing to Trace
+        return gap_or_overlap
+
+    def _process(self, trace, gap_or_overlap=False):
+        """
+        Applies all registered processing to a copy of given Trace object.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: Trace object to process.
+        :type gap_or_overlap: bool, optional
+        :param gap_or_overlap: Re-initialize processing memory first.
+        :rtype: :class:`~obspy.core.trace.Trace`
+        :return: Processed Trace object.
+        """
+        # first apply all registered processing to a copy of the Trace
+        if self.processing:
+            trace = trace.copy()
         for proc in self.processing:
             process_name, options, rtmemory_list = proc
             # if gap or overlap, clear memory
@@ -260,7 +310,6 @@ class RtTrace(Trace):
                 for n in range(len(rtmemory_list)):
                     rtmemory_list[n] = RtMemory()
             # apply processing
-            trace = trace.copy()
             dtype = trace.data.dtype
             if hasattr(process_name, '__call__'):
                 # check if direct function call
@@ -272,12 +321,30 @@ class RtTrace(Trace):
                 trace.data = func(trace, **options)
             # assure dtype is not changed
             trace.data = np.require(trace.data, dtype=dtype)
+        return trace
+
+    def _store(self, trace, gap_or_overlap=False):
+        """
+        Appends data of an already processed Trace object to this RtTrace.
+
+        :type trace: :class:`~obspy.core.trace.Trace`
+        :param trace: Processed Trace object.
+        :type gap_or_overlap: bool, optional
+        :param gap_or_overlap: There is a gap or overlap between the end of
+            this RtTrace and the start of the given Trace object.
+        """
         # if first data, set stats
         if not self.have_appended_data:
-            self.data = np.array(trace.data)
             self.stats = Stats(header=trace.stats)
+            if self.ring_buffer:
+                self._writeRingBuffer(trace.data, reset=True)
+            else:
+                self.data = np.array(trace.data)
             self.have_appended_data = True
-            return trace
+            return
+        if self.ring_buffer and not gap_or_overlap:
+            self._writeRingBuffer(trace.data)
+            return
         # handle all following data sets
         # fix Trace.__add__ parameters
         # TODO: IMPORTANT? Should check for gaps and overlaps and handle
@@ -294,7 +361,54 @@ class RtTrace(Trace):
                     max_samples) / self.stats.sampling_rate
                 self._ltrim(starttime, pad=False, nearest_sample=True,
                             fill_value=None)
-        return trace
+        if self.ring_buffer:
+            # gaps and overlaps are merged as above, refill the buffer
+            self._writeRingBuffer(self.data, reset=True)
+
+    def _writeRingBuffer(self, data, reset=False):
+        """
+        Appends data to the circular buffer of this RtTrace.
+
+        The buffer holds ``2 * capacity`` samples and every sample is written
+        at its ring position and once more ``capacity`` samples behind. Thus
+        the latest samples are always available as contiguous view without
+        copying, which is assigned to :attr:`data`. The start time is shifted
+        by the number of discarded samples.
+
+        :type data: numpy.ndarray
+        :param data: Data to append.
+        :type reset: bool, optional
+        :param reset: Discard all samples in buffer before appending data.
+        """
+        capacity = int(self.max_length * self.stats.sampling_rate + 0.5)
+        if reset or self._buffer is None or \
+           len(self._buffer) != 2 * capacity or \
+           self._buffer.dtype != data.dtype:
+            self._buffer = np.empty(2 * capacity, dtype=data.dtype)
+            self._buffer_pos = 0
+            npts = 0
+        else:
+            npts = len(self.data)
+        # only the latest capacity samples are kept
+        new = data[-capacity:] if capacity else data[:0]
+        pos = self._buffer_pos
+        count = len(new)
+        first = min(count, capacity - pos)
+        for start, end, offset in [(pos, pos + first, 0),
+                                   (0, count - first, first)]:
+            if end > start:
+                chunk = new[offset:offset + end - start]
+                self._buffer[start:end] = chunk
+                self._buffer[start + capacity:end + capacity] = chunk
+        if capacity:
+            self._buffer_pos = (pos + count) % capacity
+        # shift start time by number of discarded samples
+        dropped = max(npts + len(data) - capacity, 0)
+        if dropped:
+            self.stats.starttime += dropped * self.stats.delta
+        npts = min(npts + len(data), capacity)
+        end = self._buffer_pos + capacity
+        self.data = self._buffer[end - npts:end]
 
     def registerRtProcess(self, process, **options):
         """
@@ -91,13 +91,16 @@ def integrate(trace, rtmemory_list=None):
         rtmemory.initialize(sample.dtype, memory_size_input,
                             memory_size_output, 0, 0)
 
-    sum = rtmemory.output[0]
+    # running sum with the sum of the previous packet as first value, the
+    # samples are added one after another just like in a loop
+    sums = np.empty(np.size(sample) + 1, np.float64)
+    sums[0] = rtmemory.output[0]
+    sums[1:] = sample
+    sums[1:] *= delta_time
+    np.add.accumulate(sums, out=sums)
+    sample[:] = sums[1:]
 
-    for i in range(np.size(sample)):
-        sum += sample[i] * delta_time
-        sample[i] = sum
-
-    rtmemory.output[0] = sum
+    rtmemory.output[0] = sums[-1]
 
     return sample
 
@@ -140,12 +143,12 @@ def differentiate(trace, rtmemory_list=None):
         # avoid large diff value for first output sample
         rtmemory.input[0] = sample[0]
 
-    previous_sample = rtmemory.input[0]
+    previous_sample = sample[-1]
 
-    for i in range(np.size(sample)):
-        diff = (sample[i] - previous_sample) / delta_time
-        previous_sample = sample[i]
-        sample[i] = diff
+    diff = np.empty(np.size(sample), sample.dtype)
+    diff[0] = sample[0] - rtmemory.input[0]
+    np.subtract(sample[1:], sample[:-1], diff[1:])
+    sample[:] = diff.astype(np.float64) / delta_time
 
     rtmemory.input[0] = previous_sample
 
@@ -191,40 +194,20 @@ def boxcar(trace, width, rtmemory_list=None):
                             memory_size_output, 0, 0)
 
     # initialize array for time-series results
-    new_sample = np.zeros(np.size(sample), sample.dtype)
-
-    i = 0
-    i1 = i - width
-    i2 = i      # causal boxcar of width width
-    sum = 0.0
-    icount = 0
-    for i in range(np.size(sample)):
-        value = 0.0
-        if (icount == 0):    # first pass, accumulate sum
-            for n in range(i1, i2 + 1):
-                if (n < 0):
-                    value = rtmemory.input[width + n]
-                else:
-                    value = sample[n]
-                sum += value
-                icount = icount + 1
-        else:                # later passes, update sum
-            if ((i1 - 1) < 0):
-                value = rtmemory.input[width + (i1 - 1)]
-            else:
-                value = sample[(i1 - 1)]
-            sum -= value
-            if (i2 < 0):
-                value = rtmemory.input[width + i2]
-            else:
-                value = sample[i2]
-            sum += value
-        if (icount > 0):
-            new_sample[i] = (float)(sum / float(icount))
-        else:
-            new_sample[i] = 0.0
-        i1 = i1 + 1
-        i2 = i2 + 1
+    npts = np.size(sample)
+    new_sample = np.zeros(npts, sample.dtype)
+
+    if npts:
+        # causal boxcar of width + 1 samples: the first sum is accumulated
+        # from memory, afterwards the oldest sample is subtracted and the
+        # newest one is added in turn
+        values = np.concatenate((rtmemory.input, sample)).astype(np.float64)
+        steps = np.empty(2 * npts + width - 1, np.float64)
+        steps[:width + 1] = values[:width + 1]
+        steps[width + 1::2] = -values[:npts - 1]
+        steps[width + 2::2] = values[width + 1:]
+        np.add.accumulate(steps, out=steps)
+        new_sample[:] = steps[width::2] / float(width + 1)
 
     rtmemory.updateInput(sample)
 
@@ -288,39 +271,40 @@ def tauc(trace, width, rtmemory_list=None):
         rtmemory_dval.initialize(sample.dtype, memory_size_input,
                                  memory_size_output, 0, 0)
 
-    new_sample = np.zeros(np.size(sample), sample.dtype)
-    deriv = np.zeros(np.size(sample), sample.dtype)
+    npts = np.size(sample)
+    new_sample = np.zeros(npts, sample.dtype)
+    deriv = np.zeros(npts, sample.dtype)
 
-    #sample_last = rtmemory.input[width - 1]
-    sample_d = 0.0
-    deriv_d = 0.0
     xval = rtmemory.output[0]
     dval = rtmemory_dval.output[0]
 
-    for i in range(np.size(sample)):
-
-        sample_d = sample[i]
-        deriv_d = (sample_d - sample_last) / delta_time
-        indexBegin = i - width
-        if (indexBegin >= 0):
-            xval = xval - (sample[indexBegin]) * (sample[indexBegin]) \
-                + sample_d * sample_d
-            dval = dval - deriv[indexBegin] * deriv[indexBegin] \
-                + deriv_d * deriv_d
-        else:
-            index = i
-            xval = xval - rtmemory.input[index] * rtmemory.input[index] \
-                + sample_d * sample_d
-            dval = dval \
-                - rtmemory_dval.input[index] * rtmemory_dval.input[index] \
-                + deriv_d * deriv_d
-        deriv[i] = deriv_d
-        sample_last = sample_d
+    if npts:
+        diff = np.empty(npts, sample.dtype)
+        diff[0] = sample[0] - sample_last
+        np.subtract(sample[1:], sample[:-1], diff[1:])
+        deriv_d = diff.astype(np.float64) / delta_time
+        deriv[:] = deriv_d
+        # sums of squares within window: the square of the oldest value is
+        # subtracted and the one of the newest value is added in turn
+        values = np.concatenate((rtmemory.input, sample))
+        squares = values * values
+        steps = np.empty(2 * npts + 1, squares.dtype)
+        steps[0] = xval
+        steps[1::2] = -squares[:npts]
+        steps[2::2] = squares[width:]
+        xvals = np.add.accumulate(steps)[2::2]
+        values = np.concatenate((rtmemory_dval.input, deriv))
+        squares = values * values
+        steps = np.empty(2 * npts, np.float64)
+        steps[0] = dval - squares[0]
+        steps[1::2] = deriv_d * deriv_d
+        steps[2::2] = -squares[1:npts]
+        dvals = np.add.accumulate(steps)[1::2]
         # if (xval > _MIN_FLOAT_VAL &  & dval > _MIN_FLOAT_VAL) {
-        if (dval > _MIN_FLOAT_VAL):
-            new_sample[i] = _TWO_PI * math.sqrt(xval / dval)
-        else:
-            new_sample[i] = 0.0
+        valid = dvals > _MIN_FLOAT_VAL
+        new_sample[valid] = _TWO_PI * np.sqrt(xvals[valid] / dvals[valid])
+        xval = xvals[-1]
+        dval = dvals[-1]
 
     # update memory
     rtmemory.output[0] = xval
@@ -430,35 +414,30 @@ def mwpIntegral(trace, max_time, ref_time, mem_time=1.0, gain=1.0,
     mwp_amp_at_pick = rtmemory.output[_AMP_AT_PICK]
     mwp_int_int_sum = rtmemory.output[_INT_INT_SUM]
     polarity = rtmemory.output[_POLARITY]
-    amplitude = 0.0
-    for n in range(ioffset_mwp_min, ioffset_mwp_max):
-        if n >= 0:
-            amplitude = trace.data[n]
-        elif n >= -(np.size(rtmemory.input)):
-            # value in memory array
-            index = n + np.size(rtmemory.input)
-            amplitude = rtmemory.input[index]
-        else:
-            msg = "Error: Mwp: attempt to access rtmemory.input array of " + \
-                "size=%d at invalid index=%d: this should not happen!" % \
-                (np.size(rtmemory.input), n + np.size(rtmemory.input))
-            print msg
-            continue  # should never reach here
+    if ioffset_mwp_max > ioffset_mwp_min:
+        index = np.arange(ioffset_mwp_min, ioffset_mwp_max)
+        # negative indices refer to values in memory array
+        amplitude = np.concatenate((rtmemory.input, trace.data))
+        amplitude = amplitude[index + np.size(rtmemory.input)]
         disp_amp = amplitude - mwp_amp_at_pick
-        # check displacement polarity
-        if disp_amp >= 0.0:  # pos
-            # check if past extremum
-            if  polarity < 0:  # passed from neg to pos displacement
-                mwp_int_int_sum *= -1.0
-                mwp_int_int_sum = 0
-            polarity = 1
-        elif disp_amp < 0.0:  # neg
-            # check if past extremum
-            if polarity > 0:  # passed from pos to neg displacement
-                mwp_int_int_sum = 0
-            polarity = -1
-        mwp_int_int_sum += (amplitude - mwp_amp_at_pick) * delta_time / gain
-        new_sample[n] = mwp_int_int_sum
+        # check displacement polarity, NaN keeps the previous polarity
+        sign = np.where(disp_amp >= 0.0, 1, np.where(disp_amp < 0.0, -1, 0))
+        last = np.where(sign != 0, np.arange(len(sign)), -1)
+        last = np.maximum.accumulate(last)
+        current = np.where(last >= 0, sign[last], polarity)
+        previous = np.concatenate(([polarity], current[:-1]))
+        # integration restarts after each extremum
+        restart = ((sign > 0) & (previous < 0)) | ((sign < 0) & (previous > 0))
+        integral = np.asarray(disp_amp, np.float64) * delta_time / gain
+        starts = np.nonzero(restart)[0]
+        if not len(starts) or starts[0] > 0:
+            integral[0] += mwp_int_int_sum
+        for start, end in zip(np.append(0, starts),
+                              np.append(starts, len(index))):
+            np.add.accumulate(integral[start:end], out=integral[start:end])
+        new_sample[index] = integral
+        mwp_int_int_sum = integral[-1]
+        polarity = current[-1]
 
     rtmemory.output[_INT_INT_SUM] = mwp_int_int_sum
     rtmemory.output[_POLARITY] = polarity
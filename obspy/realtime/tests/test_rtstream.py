@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.realtime.rtstream test suite.
+"""
+from obspy import Stream, Trace, read
+from obspy.realtime import RtStream, RtTrace
+from obspy.seedlink.slmulticlient import SLMultiClient
+from obspy.seedlink.slserver import SLServer
+import numpy as np
+import time
+import unittest
+import warnings
+
+
+# some debug flags
+SHOW_BENCHMARK = False
+
+
+class RtStreamTestCase(unittest.TestCase):
+
+    def _packets(self):
+        """
+        Returns a list of streams of consecutive packets of six channels.
+        """
+        st = read() + read()
+        for i, tr in enumerate(st[3:]):
+            tr.stats.station = 'X%d' % i
+        st[5].stats.sampling_rate = 50.0
+        packets = []
+        for i in range(6):
+            t = st[0].stats.starttime + 5 * i
+            packets.append(st.slice(t, t + 4.99))
+        return packets
+
+    def _compare(self, process_list, ring_buffer=False):
+        """
+        Appends packets to a RtStream and to one RtTrace per channel and
+        compares the results.
+        """
+        rt_stream = RtStream(max_length=12, ring_buffer=ring_buffer)
+        for process, options in process_list:
+            rt_stream.registerRtProcess(process, **options)
+        rt_traces = {}
+        packets = self._packets()
+        # the first stream contains two packets of each channel
+        streams = [packets[0] + packets[1]] + packets[2:]
+        for st in streams:
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter('ignore', UserWarning)
+                result = rt_stream.append(st)
+                expected = []
+                for tr in st:
+                    if tr.id not in rt_traces:
+                        rt_traces[tr.id] = RtTrace(max_length=12,
+                                                   ring_buffer=ring_buffer)
+                        for process, options in process_list:
+                            rt_traces[tr.id].registerRtProcess(process,
+                                                               **options)
+                    expected.append(rt_traces[tr.id].append(tr))
+            self.assertEqual(len(result), len(st))
+            for tr1, tr2 in zip(result, expected):
+                self.assertEqual(tr1.id, tr2.id)
+                np.testing.assert_array_equal(tr1.data, tr2.data)
+        self.assertEqual(len(rt_stream), 6)
+        for rt_trace in rt_stream:
+            self.assertTrue(isinstance(rt_trace, RtTrace))
+            other = rt_traces[rt_trace.id]
+            np.testing.assert_array_equal(rt_trace.data, other.data)
+            self.assertEqual(rt_trace.stats, other.stats)
+        return result
+
+    def test_appendBatched(self):
+        """
+        Channels with same sampling rate and packet length are processed in
+        one go, which must give the same results as separate RtTraces.
+        """
+        for ring_buffer in [False, True]:
+            result = self._compare([('integrate', {}),
+                                    ('scale', {'factor': 3.0}),
+                                    (np.abs, {}),
+                                    ('diff', {})], ring_buffer)
+            # first five traces share a common 2-D array
+            self.assertTrue(result[0].data.base is not None)
+            self.assertTrue(result[0].data.base is result[4].data.base)
+            self.assertTrue(result[5].data.base is not result[0].data.base)
+
+    def test_appendNotBatched(self):
+        """
+        Processes without support of 2-D arrays are applied per channel.
+        """
+        self._compare([('integrate', {}), ('boxcar', {'width': 20})])
+        self._compare([])
+
+    def test_append(self):
+        """
+        Tests routing of traces and sanity checks.
+        """
+        rt_stream = RtStream()
+        self.assertRaises(TypeError, rt_stream.append, "abc")
+        self.assertRaises(TypeError, rt_stream.append, Stream(["abc"]))
+        self.assertRaises(NotImplementedError, rt_stream.__add__, rt_stream)
+        self.assertRaises(NotImplementedError, rt_stream.registerRtProcess,
+                          'xyz')
+        self.assertRaises(ValueError, RtStream, ring_buffer=True)
+        tr = Trace(data=np.arange(10, dtype='f8'))
+        rt_stream.append(tr)
+        tr = tr.copy()
+        tr.stats.starttime += 10
+        rt_stream += Stream([tr])
+        self.assertEqual(len(rt_stream), 1)
+        self.assertEqual(len(rt_stream[0]), 20)
+        # process registered later is used for all channels
+        rt_stream.registerRtProcess('scale', factor=2.0)
+        tr2 = tr.copy()
+        tr2.stats.station = 'X'
+        tr2.stats.starttime += 100
+        result = rt_stream.append(Stream([tr2]))
+        np.testing.assert_array_equal(result[0].data, tr.data * 2)
+        self.assertEqual(len(rt_stream), 2)
+        self.assertEqual(len(rt_stream[0].processing), 1)
+        self.assertEqual(len(rt_stream[1].processing), 1)
+
+    def test_seedLinkBenchmark(self):
+        """
+        Processes packets received from a local SeedLink server.
+
+        Set SHOW_BENCHMARK to print the throughput and latency of receiving,
+        decoding and processing packets.
+        """
+        stations = ['XX_S%03d' % i for i in range(20)]
+        streams = ','.join(s + ':HHZ' for s in stations)
+        for rate in [None, 10]:
+            server = SLServer(stations=stations, packets=20, rate=rate)
+            server.start()
+            try:
+                rt_stream = RtStream(max_length=60)
+                rt_stream.registerRtProcess('integrate')
+                rt_stream.registerRtProcess('scale', factor=2.0)
+                client = SLMultiClient(netto=10, netdly=1)
+                client.addConnection(server.getAddress(), streams)
+                latencies = []
+                start = time.time()
+                for trace in client:
+                    trace.data = trace.data.astype(np.float64)
+                    rt_stream.append(trace)
+                    latencies.append(time.time() -
+                                     trace.stats.endtime.timestamp)
+                seconds = time.time() - start
+            finally:
+                server.stop()
+            self.assertEqual(len(rt_stream), 20)
+            for rt_trace in rt_stream:
+                self.assertEqual(len(rt_trace), 20 * 112)
+            if SHOW_BENCHMARK:
+                if rate is None:
+                    print "throughput: %.0f packets/s" % (
+                        len(latencies) / seconds)
+                else:
+                    print "latency: median %.4f s, max %.4f s" % (
+                        np.median(latencies), max(latencies))
+
+
+def suite():
+    return unittest.makeSuite(RtStreamTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -77,6 +77,43 @@ class RtTraceTestCase(unittest.TestCase):
         # check kwargs
         self.assertTrue("maeh" in tr.stats.processing[1])
 
+    def test_rtMemoryUpdate(self):
+        """
+        Updating a RtMemory object must keep the latest values of all updates
+        without reallocating its buffers.
+        """
+        np.random.seed(815)
+        for length in [0, 1, 3, 20]:
+            rtmemory = RtMemory()
+            rtmemory.initialize(np.float64, length, 2, 1.0, 0.0)
+            buffer = rtmemory._input_buffer
+            expected = np.ones(length)
+            for _i in range(50):
+                data = np.random.randn(np.random.randint(0, 2 * length + 2))
+                rtmemory.updateInput(data)
+                expected = np.concatenate((expected, data))[len(data):]
+                np.testing.assert_array_equal(rtmemory.input, expected)
+                self.assertTrue(rtmemory._input_buffer is buffer)
+                # values set in place survive updates of other values
+                rtmemory.output[1] = 5.0
+                rtmemory.updateOutput(np.array([3.0]))
+                np.testing.assert_array_equal(rtmemory.output, [5.0, 3.0])
+
+    def test_rtMemoryAssign(self):
+        """
+        Memory arrays assigned to a RtMemory object must be updated as well.
+        """
+        rtmemory = RtMemory()
+        rtmemory.initialize(np.float64, 3, 2)
+        rtmemory.input = np.array([1.0, 2.0, 3.0])
+        rtmemory.output = np.array([4.0, 5.0])
+        rtmemory.updateInput(np.array([9.0]))
+        rtmemory.updateOutput(np.array([6.0]))
+        np.testing.assert_array_equal(rtmemory.input, [2.0, 3.0, 9.0])
+        np.testing.assert_array_equal(rtmemory.output, [5.0, 6.0])
+        self.assertFalse('input' in rtmemory.__dict__)
+        self.assertFalse('output' in rtmemory.__dict__)
+
     def test_appendSanityChecks(self):
         """
         Testing sanity checks of append method.
@@ -166,6 +203,35 @@ class RtTraceTestCase(unittest.TestCase):
         for trace in traces:
             rtr.append(trace)
 
+    def test_ringBuffer(self):
+        """
+        Appending to a RtTrace with ring buffer must give the same results as
+        appending to a RtTrace without one.
+        """
+        self.assertRaises(ValueError, RtTrace, ring_buffer=True)
+        tr = read()[0]
+        traces = tr / 37
+        for max_length in [5, 7.3, 40]:
+            rtr1 = RtTrace(max_length=max_length)
+            rtr2 = RtTrace(max_length=max_length, ring_buffer=True)
+            for rtr in [rtr1, rtr2]:
+                rtr.registerRtProcess('integrate')
+                rtr.registerRtProcess('boxcar', width=20)
+            for i, trace in enumerate(traces):
+                # skip a packet to get a gap
+                if i == 20:
+                    continue
+                with warnings.catch_warnings(record=True):
+                    warnings.simplefilter('ignore', UserWarning)
+                    out1 = rtr1.append(trace.copy())
+                    out2 = rtr2.append(trace.copy())
+                np.testing.assert_array_equal(out1.data, out2.data)
+                np.testing.assert_array_equal(rtr1.data, rtr2.data)
+                self.assertEqual(rtr1.stats, rtr2.stats)
+            # data is a view into the buffer
+            self.assertTrue(rtr2.data.base is rtr2._buffer)
+            self.assertTrue(rtr2.stats.npts <= max_length * 100 + 1)
+
     def test_missingOrWrongArgumentInRtProcess(self):
         """
         Tests handling of missing/wrong arguments.
@@ -5,16 +5,90 @@ The obspy.realtime.signal test suite.
 from obspy import read
 from obspy.core.stream import Stream
 from obspy.realtime import RtTrace, signal
+import math
 import numpy as np
 import os
+import time
 import unittest
 
 
 # some debug flags
 PLOT_TRACES = False
+SHOW_BENCHMARK = False
 NUM_PACKETS = 3
 
 
+def _integrateLoop(data, delta):
+    """
+    Reference implementation of signal.integrate looping over all samples.
+    """
+    data = data.copy()
+    sum = 0.0
+    for i in range(len(data)):
+        sum += data[i] * delta
+        data[i] = sum
+    return data
+
+
+def _boxcarLoop(data, width):
+    """
+    Reference implementation of signal.boxcar looping over all samples.
+    """
+    values = np.concatenate((np.zeros(width), data))
+    result = np.zeros(len(data))
+    sum = 0.0
+    for i in range(width + 1):
+        sum += values[i]
+    result[0] = sum / float(width + 1)
+    for i in range(1, len(data)):
+        sum -= values[i - 1]
+        sum += values[i + width]
+        result[i] = sum / float(width + 1)
+    return result
+
+
+def _taucLoop(data, width, delta):
+    """
+    Reference implementation of signal.tauc looping over all samples.
+    """
+    values = np.concatenate((np.zeros(width), data))
+    deriv = np.zeros(len(values))
+    result = np.zeros(len(data))
+    xval = dval = 0.0
+    last = data[0]
+    for i in range(len(data)):
+        deriv[i + width] = (data[i] - last) / delta
+        last = data[i]
+        xval = xval - values[i] * values[i] + data[i] * data[i]
+        dval = dval - deriv[i] * deriv[i] + \
+            deriv[i + width] * deriv[i + width]
+        if dval > signal._MIN_FLOAT_VAL:
+            result[i] = 2.0 * math.pi * math.sqrt(xval / dval)
+    return result
+
+
+def _mwpIntegralLoop(data, start, end, delta, gain):
+    """
+    Reference implementation of signal.mwpIntegral looping over all samples.
+    """
+    result = np.zeros(len(data))
+    sum = 0.0
+    polarity = 0
+    for i in range(start, end):
+        disp_amp = data[i] - data[start]
+        if disp_amp >= 0.0:
+            if polarity < 0:
+                sum = 0
+            polarity = 1
+        elif disp_amp < 0.0:
+            if polarity > 0:
+                sum = 0
+            polarity = -1
+        sum += disp_amp * delta / gain
+        result[i] = sum
+    return result
+
+
 class RealTimeSignalTestCase(unittest.TestCase):
     """
     The obspy.realtime.signal test suite.
@@ -210,6 +284,42 @@ class RealTimeSignalTestCase(unittest.TestCase):
         np.testing.assert_almost_equal(trace.data[1:],
                                        self.filt_trace_data[1:])
 
+    def test_vectorizedKernels(self):
+        """
+        The processing functions must give exactly the same results as the
+        reference implementations looping over all samples. Set SHOW_BENCHMARK
+        to compare the throughput of both.
+        """
+        trace = self.orig_trace
+        delta = trace.stats.delta
+        start = int(round(301.506 * trace.stats.sampling_rate))
+        end = start + int(round(120 / delta))
+        options = {'mem_time': 240,
+                   'ref_time': trace.stats.starttime + 301.506,
+                   'max_time': 120, 'gain': 1.610210e+09}
+        kernels = [
+            ('integrate', lambda tr: signal.integrate(tr),
+             lambda data: _integrateLoop(data, delta)),
+            ('boxcar', lambda tr: signal.boxcar(tr, 500),
+             lambda data: _boxcarLoop(data, 500)),
+            ('tauc', lambda tr: signal.tauc(tr, 60),
+             lambda data: _taucLoop(data, 60, delta)),
+            ('mwpIntegral', lambda tr: signal.mwpIntegral(tr, **options),
+             lambda data: _mwpIntegralLoop(data, start, end, delta,
+                                           options['gain']))]
+        for name, func, reference in kernels:
+            t = time.time()
+            expected = reference(trace.data)
+            t_loop = time.time() - t
+            t = time.time()
+            data = func(trace.copy())
+            t_vectorized = time.time() - t
+            np.testing.assert_array_equal(data, expected)
+            if SHOW_BENCHMARK:
+                print "%s: %.0f samples/s per channel (loop: %.0f)" % \
+                    (name, trace.stats.npts / max(t_vectorized, 1e-9),
+                     trace.stats.npts / max(t_loop, 1e-9))
+
     def _runRtProcess(self, process_list, max_length=None):
         """
         Helper function to create a RtTrace, register all given process
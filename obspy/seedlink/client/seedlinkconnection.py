@@ -939,10 +939,9 @@ class SeedLinkConnection(object):
                     pass
 
                 # Check for more available data from the socket
-                bytesread = None
+                nbytesread = None
                 try:
-                    bytesread = self.receiveData(self.state.bytesRemaining(),
-                                                 self.sladdr)
+                    nbytesread = self.receiveDataInto(self.sladdr)
                 except IOError as ioe:
                     msg = "socket read error: %s, reconnecting in %sss"
                     logger.error(msg % (ioe, self.netdly))
@@ -950,9 +949,8 @@ class SeedLinkConnection(object):
                     self.state.state = SLState.SL_DOWN
                     self.state.netto_trig = -1
                     self.state.netdly_trig = -1
-                if bytesread is not None and len(bytesread) > 0:
-                    # Data is here, process it
-                    self.state.appendBytes(bytesread)
+                if nbytesread:
+                    # Data is here and already in the receive buffer
                     # Reset the timeout and keepalive timers
                     self.state.netto_trig = -1
                     self.state.keepalive_trig = -1
@@ -1198,6 +1196,20 @@ class SeedLinkConnection(object):
 
         return bytesread
 
+    def receiveDataInto(self, code):  # @UnusedVariable
+        """
+        Read bytes from the server directly into the free part of the
+        receive buffer of the connection state.
+
+        :param code: a string to include in error messages for identification.
+        :return: the number of bytes read (zero if no available data).
+
+        :raise: IOException if an I/O error occurs.
+        """
+        nbytesread = self.socket.recv_into(self.state.getReceiveBuffer())
+        self.state.advanceReceivePointer(nbytesread)
+        return nbytesread
+
     def sayHello(self):
         """
         Send the HELLO command and attempt to parse the server version
@@ -1361,9 +1373,9 @@ class SeedLinkConnection(object):
                     raise SeedLinkException(msg % (readStr))
 
         # Fail if none of the given selectors were accepted
-        if acceptsel < 1:
+        if selectors and acceptsel < 1:
             msg = "response: no data stream selector(s) accepted"
-            raise SeedLinkException()
+            raise SeedLinkException(msg)
 
         msg = "response: %s selector(s) accepted"
         logger.debug(msg % (acceptsel))
@@ -1531,6 +1543,7 @@ class SeedLinkConnection(object):
         Update the appropriate stream chain entry given a Mini-SEED record.
 
         :param: slpacket the packet conaining a Mini-SEED record.
+        :return: the decoded trace of the packet.
 
         :raise: SeedLinkException on error.
         """
@@ -1568,7 +1581,7 @@ class SeedLinkConnection(object):
                 raise SeedLinkException(msg)
             curstream.seqnum = seqnum
             curstream.btime = btime
-            return
+            return trace
 
         # For multi-station mode, search the stream chain
         # Search for a matching net/station in the stream chain
@@ -1594,3 +1607,4 @@ class SeedLinkConnection(object):
             stream.btime = btime
         elif not wildcarded:
             logger.error("unexpected data received: %s %s" % (net, station))
+        return trace
@@ -38,7 +38,8 @@ class SLState(object):
     :type query_mode: int
     :var BUFSIZE: Size of receiving buffer (default is 8192).
     :type BUFSIZE: int
-    :var databuf: Data buffer for received packets.
+    :var databuf: Data buffer for received packets (own buffer of each
+        instance).
     :type databuf: bytearray
     :var recptr: Receive pointer for databuf.
     :type recptr: int
@@ -85,7 +86,8 @@ class SLState(object):
     keepalive_time = 0.0
 
     def __init__(self):
-        pass
+        # each connection needs its own receive buffer
+        self.databuf = bytearray(self.BUFSIZE)
 
     def getPacket(self):
         """
@@ -176,32 +178,59 @@ class SLState(object):
         """
         self.sendptr += SLPacket.SLHEADSIZE + SLPacket.SLRECSIZE
 
-    #AJL packed_buf = [str() for __idx0 in range(BUFSIZE)]
-    packed_buf = bytearray(BUFSIZE)
-
     def packDataBuffer(self):
         """
         Packs the buffer by removing all sent packets and shifting remaining
         bytes to beginning of buffer.
-        """
-        #AJL System.arraycopy(self.databuf, self.sendptr, self.packed_buf, 0,
-        #                     self.recptr - self.sendptr)
-        self.packed_buf[0:self.recptr - self.sendptr] = \
-            self.databuf[self.sendptr: self.recptr]
-        temp_buf = self.databuf
-        self.databuf = self.packed_buf
-        self.packed_buf = temp_buf
-        self.recptr -= self.sendptr
+
+        Remaining bytes are only moved once the send pointer passed the
+        middle of the buffer, so the bytes of each packet are moved at most
+        once and never overlap with their new position.
+        """
+        if self.sendptr == 0:
+            return
+        if self.sendptr == self.recptr:
+            self.recptr = 0
+            self.sendptr = 0
+            return
+        if self.sendptr < self.BUFSIZE // 2:
+            return
+        remaining = self.recptr - self.sendptr
+        self.databuf[0:remaining] = \
+            memoryview(self.databuf)[self.sendptr:self.recptr]
+        self.recptr = remaining
         self.sendptr = 0
 
     def appendBytes(self, bytes):
         """
         Appends bytes to the receive buffer after the last received data.
         """
-        if self.bytesRemaining() < len(bytes):
+        nbytes = len(bytes)
+        if self.bytesRemaining() < nbytes:
+            msg = "not enough bytes remaining in buffer to append new bytes"
+            raise SeedLinkException(msg)
+        self.databuf[self.recptr:self.recptr + nbytes] = bytes
+        self.recptr += nbytes
+
+    def getReceiveBuffer(self):
+        """
+        Returns the free part of the receive buffer after the last received
+        data.
+
+        Bytes can be read directly into the returned memoryview, e.g. with
+        :meth:`socket.socket.recv_into`, followed by a call of
+        :meth:`advanceReceivePointer` with the number of bytes read.
+
+        :rtype: memoryview
+        """
+        return memoryview(self.databuf)[self.recptr:]
+
+    def advanceReceivePointer(self, nbytes):
+        """
+        Increments the receive pointer by number of bytes written into the
+        buffer returned by :meth:`getReceiveBuffer`.
+        """
+        if self.bytesRemaining() < nbytes:
             msg = "not enough bytes remaining in buffer to append new bytes"
             raise SeedLinkException(msg)
-        ## for-while
-        for i in range(len(bytes)):
-            self.databuf[self.recptr] = bytes[i]
-            self.recptr += 1
+        self.recptr += nbytes
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Module to decode SeedLink packets in batches and merge them into traces.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org) & Anthony Lomax
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+
+from StringIO import StringIO
+from obspy.core.stream import Stream
+from obspy.core.trace import Trace
+from obspy.mseed.core import readMSEED
+from obspy.seedlink.slpacket import SLPacket
+import copy
+import numpy as np
+import time
+import warnings
+
+
+class _ChannelBuffer(object):
+    """
+    Growable buffer of contiguous samples of one channel.
+    """
+    def __init__(self, stats, data, created):
+        self.stats = stats
+        self.data = np.empty(max(len(data), 1024), dtype=data.dtype)
+        self.data[:len(data)] = data
+        self.npts = len(data)
+        # time the first samples were queued
+        self.created = created
+
+    def isContiguous(self, stats, data):
+        """
+        Checks if given samples continue the buffered samples.
+        """
+        if stats.sampling_rate != self.stats.sampling_rate or \
+           data.dtype != self.data.dtype:
+            return False
+        delta = self.stats.delta
+        diff = stats.starttime - (self.stats.starttime + self.npts * delta)
+        return abs(diff) < 0.5 * delta
+
+    def append(self, data):
+        """
+        Appends samples, the buffer size is doubled if necessary.
+        """
+        npts = self.npts + len(data)
+        if npts > len(self.data):
+            buf = np.empty(max(2 * len(self.data), npts),
+                           dtype=self.data.dtype)
+            buf[:self.npts] = self.data[:self.npts]
+            self.data = buf
+        self.data[self.npts:npts] = data
+        self.npts = npts
+
+    def getTrace(self):
+        """
+        Returns buffered samples as Trace object.
+        """
+        self.stats.npts = self.npts
+        return Trace(data=self.data[:self.npts], header=self.stats)
+
+
+class SLPacketAggregator(object):
+    """
+    Decodes batches of SeedLink packets and merges the samples of each channel
+    into contiguous traces.
+
+    Added packets are queued and the Mini-SEED records of all queued packets
+    are decoded in a single call to libmseed, which already merges
+    consecutive records of a channel. The decoded samples are appended to a
+    growable buffer of each channel. The buffered samples of a channel are
+    returned as one trace if the buffer holds ``max_samples`` samples, if the
+    first samples were added more than ``max_latency`` seconds ago, if the
+    next samples of the channel are not contiguous (gap, overlap or changed
+    sampling rate) or if :meth:`flush` is called. If a batch can not be
+    decoded, its records are decoded one by one and only undecodable records
+    are dropped with a warning.
+
+    :type batch_size: int, optional
+    :param batch_size: Number of queued packets decoded at once (default is
+        ``100``).
+    :type max_samples: int, optional
+    :param max_samples: Return buffered samples of a channel as soon as at
+        least this number of samples is buffered (default is ``None``, no
+        size limit).
+    :type max_latency: float, optional
+    :param max_latency: Maximum time in seconds a packet is queued or its
+        samples are buffered before being returned (default is ``None``, no
+        time limit).
+
+    .. rubric:: Example
+
+    >>> from obspy.seedlink.slclient import SLClient
+    >>> class MyClient(SLClient):
+    ...     aggregator = SLPacketAggregator(max_samples=6000, max_latency=10)
+    ...     def packetHandler(self, count, slpack):
+    ...         if isinstance(slpack, SLPacket) and slpack.getType() not in \\
+    ...            (SLPacket.TYPE_SLINF, SLPacket.TYPE_SLINFT):
+    ...             for trace in self.aggregator.add(slpack):
+    ...                 print(trace)
+    ...         return False
+    """
+    def __init__(self, batch_size=100, max_samples=None, max_latency=None):
+        self.batch_size = batch_size
+        self.max_samples = max_samples
+        self.max_latency = max_latency
+        # Mini-SEED records of queued packets
+        self._queue = []
+        self._queued = None
+        # _ChannelBuffer objects by trace id
+        self._channels = {}
+
+    def __len__(self):
+        """
+        Returns the number of queued packets.
+        """
+        return len(self._queue)
+
+    def add(self, slpacket):
+        """
+        Queues a SeedLink data packet.
+
+        :type slpacket: :class:`~obspy.seedlink.slpacket.SLPacket` or str
+        :param slpacket: SeedLink data packet or Mini-SEED record.
+        :rtype: :class:`~obspy.core.stream.Stream`
+        :return: Traces which are due according to the flush policy.
+        """
+        if isinstance(slpacket, SLPacket):
+            slpacket = slpacket.msrecord
+        now = time.time()
+        if not self._queue:
+            self._queued = now
+        self._queue.append(str(slpacket))
+        if len(self._queue) >= self.batch_size or \
+           (self.max_latency is not None and
+                now - self._queued >= self.max_latency):
+            return self._decode(now)
+        return self.poll(now)
+
+    def poll(self, now=None):
+        """
+        Returns buffered traces which are due according to the flush policy.
+
+        Should be called regularly if the flow of packets may stop.
+
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        if now is None:
+            now = time.time()
+        if self._queue and self.max_latency is not None and \
+           now - self._queued >= self.max_latency:
+            return self._decode(now)
+        traces = []
+        if self.max_latency is not None:
+            for trace_id, channel in self._channels.items():
+                if now - channel.created >= self.max_latency:
+                    traces.append(channel.getTrace())
+                    del self._channels[trace_id]
+        return Stream(traces)
+
+    def flush(self):
+        """
+        Decodes all queued packets and returns all buffered samples.
+
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        traces = self._decode(time.time())
+        for trace_id in sorted(self._channels):
+            traces.append(self._channels.pop(trace_id).getTrace())
+        return traces
+
+    def _decode(self, now):
+        """
+        Decodes all queued packets and appends the samples to the channel
+        buffers.
+        """
+        traces = []
+        if self._queue:
+            st = self._read(self._queue)
+            self._queue = []
+            for segment in st:
+                trace_id = segment.id
+                channel = self._channels.get(trace_id)
+                if channel is not None and \
+                   not channel.isContiguous(segment.stats, segment.data):
+                    traces.append(channel.getTrace())
+                    channel = None
+                if channel is None:
+                    stats = copy.deepcopy(segment.stats)
+                    self._channels[trace_id] = _ChannelBuffer(stats,
+                                                              segment.data,
+                                                              self._queued)
+                else:
+                    channel.append(segment.data)
+        for trace_id, channel in self._channels.items():
+            if (self.max_samples is not None and
+                    channel.npts >= self.max_samples) or \
+               (self.max_latency is not None and
+                    now - channel.created >= self.max_latency):
+                traces.append(channel.getTrace())
+                del self._channels[trace_id]
+        return Stream(traces)
+
+    def _read(self, records):
+        """
+        Decodes given Mini-SEED records, falls back to decoding the records
+        one by one if decoding all of them at once fails.
+        """
+        try:
+            return readMSEED(StringIO(''.join(records)), recinfo=False)
+        except Exception:
+            pass
+        st = Stream()
+        for record in records:
+            try:
+                st += readMSEED(StringIO(record), recinfo=False)
+            except Exception as e:
+                msg = "Dropping undecodable Mini-SEED record: %s" % (e)
+                warnings.warn(msg)
+        return st
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Module to collect data from many SeedLink servers and stations at once.
+
+All connections are handled within a single thread by multiplexing their
+sockets with :func:`select.select`. Only connecting to a server and
+negotiating the data streams is done in a separate thread per connection.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org) & Anthony Lomax
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+
+from obspy.seedlink.client.seedlinkconnection import SeedLinkConnection
+from obspy.seedlink.client.slstate import SLState
+from obspy.seedlink.seedlinkexception import SeedLinkException
+from obspy.seedlink.slpacket import SLPacket
+import logging
+import select
+import socket
+import threading
+import time
+
+
+# default logger
+logger = logging.getLogger('obspy.seedlink')
+
+
+class _Connection(object):
+    """
+    A SeedLinkConnection together with the timing state of the multiplexer.
+    """
+    def __init__(self, slconn):
+        self.slconn = slconn
+        self.finished = False
+        self.next_connect = 0.0
+        self.last_received = 0.0
+        self.last_keepalive = 0.0
+        self.last_saved = 0.0
+        self.unsaved = False
+        # thread connecting and negotiating with the server
+        self.negotiation = None
+        self.negotiated = False
+        self.negotiation_done = False
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+
+class SLMultiClient(object):
+    """
+    Collects data from many SeedLink servers and stations in a single thread.
+
+    Each server is handled by its own
+    :class:`~obspy.seedlink.client.seedlinkconnection.SeedLinkConnection`
+    object, which is used to negotiate the connection, to keep track of the
+    sequence numbers of all stations and to read and write the state file.
+    While receiving data, the sockets of all connections are multiplexed with
+    :func:`select.select` and complete packets are decoded as soon as they
+    are received. Connecting to a server and negotiating the data streams
+    blocks and is therefore done in a separate thread, so a slow or
+    unreachable server does not delay the other connections.
+
+    :type netto: float, optional
+    :param netto: Network timeout in seconds, a connection is re-established
+        if no data or keepalive packets are received in this time (default
+        is ``120``, ``0`` to disable).
+    :type netdly: float, optional
+    :param netdly: Network re-connect delay in seconds (default is ``30``).
+    :type keepalive: float, optional
+    :param keepalive: Interval in seconds to send keepalive (heartbeat)
+        requests if no data is received (default is ``0``, disabled).
+    :type state_interval: float, optional
+    :param state_interval: Minimum interval in seconds between writes of the
+        state file of a connection (default is ``1``). The state file is
+        written in any case when a connection is closed.
+
+    .. rubric:: Example
+
+    >>> client = SLMultiClient(netto=60, netdly=10)  # doctest: +SKIP
+    >>> client.addConnection("geofon.gfz-potsdam.de:18000",
+    ...                      streams="GE_STU:BHZ,GE_APE:BHZ",
+    ...                      statefile="geofon.state")  # doctest: +SKIP
+    >>> client.addConnection("rtserve.iris.washington.edu:18000",
+    ...                      streams="IU_ANMO:BHZ")  # doctest: +SKIP
+    >>> for trace in client:  # doctest: +SKIP
+    ...     print(trace)
+    """
+    def __init__(self, netto=120, netdly=30, keepalive=0, state_interval=1.0):
+        self.netto = netto
+        self.netdly = netdly
+        self.keepalive = keepalive
+        self.state_interval = state_interval
+        # maximum time to wait for data before checking timers
+        self.poll_interval = 0.25
+        self.terminate_flag = False
+        self._connections = []
+
+    def addConnection(self, sladdr, streams=None, selectors=None,
+                      begin_time=None, end_time=None, statefile=None):
+        """
+        Adds a SeedLink server to collect data from.
+
+        :type sladdr: str
+        :param sladdr: Address of the SeedLink server in host:port format.
+        :type streams: str, optional
+        :param streams: Streams for multi-station mode in the format
+            ``"stream1[:selectors1],stream2[:selectors2],..."`` with each
+            stream in NET_STA format, e.g. ``"GE_STU:BHZ,IU_KONO:BHE BHN"``.
+            If not given, a uni-station connection is configured.
+        :type selectors: str, optional
+        :param selectors: Selectors for uni-station mode or default selectors
+            for multi-station mode.
+        :type begin_time: str, optional
+        :param begin_time: Beginning of time window in SeedLink string format
+            "year,month,day,hour,minute,second".
+        :type end_time: str, optional
+        :param end_time: End of time window in SeedLink string format.
+        :type statefile: str, optional
+        :param statefile: File name for storing the state of the connection.
+            If the file exists, transmission is resumed after the last
+            received packet of each station.
+        :rtype: :class:`~obspy.seedlink.client.seedlinkconnection.\
+SeedLinkConnection`
+        :return: The SeedLinkConnection object of the server.
+        """
+        slconn = SeedLinkConnection()
+        slconn.setSLAddress(sladdr)
+        slconn.setNetTimout(self.netto)
+        slconn.setNetDelay(self.netdly)
+        slconn.setKeepAlive(self.keepalive)
+        if streams is not None:
+            slconn.parseStreamlist(streams, selectors)
+        else:
+            slconn.setUniParams(selectors, -1, None)
+        slconn.setBeginTime(begin_time)
+        slconn.setEndTime(end_time)
+        if not slconn.checkslcd():
+            msg = "problems with the connection description"
+            raise SeedLinkException(msg)
+        if statefile is not None:
+            slconn.setStateFile(statefile)
+        self._connections.append(_Connection(slconn))
+        return slconn
+
+    def getConnections(self):
+        """
+        Returns the SeedLinkConnection objects of all servers.
+        """
+        return [conn.slconn for conn in self._connections]
+
+    def terminate(self):
+        """
+        Stops collecting data, all connections are closed.
+        """
+        self.terminate_flag = True
+
+    def __iter__(self):
+        return self.iterTraces()
+
+    def iterTraces(self):
+        """
+        Generator yielding the decoded traces of the packets of all
+        connections in order of arrival.
+
+        The generator stops when all connections are finished (e.g. after the
+        end of a requested time window), or after :meth:`terminate` was
+        called. All connections are closed and state files are written when
+        the generator stops or is closed.
+
+        :rtype: generator of :class:`~obspy.core.trace.Trace`
+        """
+        self.terminate_flag = False
+        for conn in self._connections:
+            conn.cancelled = False
+        try:
+            while not self.terminate_flag:
+                active = [conn for conn in self._connections
+                          if not conn.finished]
+                if not active:
+                    break
+                now = time.time()
+                for conn in active:
+                    self._checkTimers(conn, now)
+                sockets = dict((conn.slconn.socket, conn) for conn in active
+                               if conn.negotiation is None and
+                               conn.slconn.socket is not None)
+                if not sockets:
+                    time.sleep(self.poll_interval)
+                    continue
+                try:
+                    readable = select.select(sockets.keys(), [], [],
+                                             self.poll_interval)[0]
+                except (select.error, socket.error) as e:
+                    logger.error("select failed: %s" % (e))
+                    continue
+                for sock in readable:
+                    for trace in self._receive(sockets[sock]):
+                        yield trace
+                        if self.terminate_flag:
+                            return
+        finally:
+            for conn in self._connections:
+                conn.lock.acquire()
+                try:
+                    if conn.negotiation is not None and \
+                       not conn.negotiation_done:
+                        # the negotiating thread closes the connection itself
+                        conn.cancelled = True
+                    else:
+                        conn.slconn.close()
+                    conn.negotiation = None
+                finally:
+                    conn.lock.release()
+
+    def _connect(self, conn, now):
+        """
+        Starts a thread connecting to the server and negotiating the data
+        streams.
+        """
+        conn.negotiated = False
+        conn.negotiation_done = False
+        conn.negotiation = threading.Thread(target=self._negotiate,
+                                            args=(conn,))
+        conn.negotiation.daemon = True
+        conn.negotiation.start()
+
+    def _negotiate(self, conn):
+        """
+        Connects to the server and negotiates the data streams. Runs in the
+        thread started by :meth:`_connect`.
+        """
+        slconn = conn.slconn
+        try:
+            slconn.connect()
+            slconn.configLink()
+        except (SeedLinkException, IOError) as e:
+            if not conn.cancelled:
+                msg = "[%s] negotiation with remote SeedLink failed: %s, " + \
+                    "reconnecting in %ss"
+                logger.error(msg % (slconn.sladdr, e, self.netdly))
+            slconn.disconnect()
+        else:
+            conn.negotiated = True
+        conn.lock.acquire()
+        try:
+            conn.negotiation_done = True
+            if conn.cancelled:
+                slconn.close()
+        finally:
+            conn.lock.release()
+
+    def _finishNegotiation(self, conn, now):
+        """
+        Starts receiving data of a connection after a successful negotiation
+        or schedules re-connection otherwise.
+        """
+        conn.negotiation = None
+        slconn = conn.slconn
+        if not conn.negotiated:
+            conn.next_connect = now + self.netdly
+            return
+        slconn.state.recptr = 0
+        slconn.state.sendptr = 0
+        slconn.state.state = SLState.SL_DATA
+        conn.last_received = time.time()
+        conn.last_keepalive = conn.last_received
+
+    def _disconnect(self, conn, now):
+        """
+        Closes the socket of a connection and schedules re-connection.
+        """
+        conn.slconn.disconnect()
+        conn.next_connect = now + self.netdly
+
+    def _checkTimers(self, conn, now):
+        """
+        Handles (re-)connection, network timeout, keepalive and state file.
+        """
+        slconn = conn.slconn
+        if conn.negotiation is not None:
+            if conn.negotiation_done:
+                self._finishNegotiation(conn, now)
+            return
+        if slconn.socket is None:
+            if now >= conn.next_connect:
+                self._connect(conn, now)
+            return
+        if self.netto > 0 and now - conn.last_received > self.netto:
+            msg = "[%s] network timeout (%ss), reconnecting in %ss"
+            logger.warn(msg % (slconn.sladdr, self.netto, self.netdly))
+            self._disconnect(conn, now)
+            return
+        if self.keepalive > 0 and not slconn.state.expect_info and \
+           now - max(conn.last_received, conn.last_keepalive) > \
+           self.keepalive:
+            try:
+                slconn.sendInfoRequest("ID", 3)
+            except (SeedLinkException, IOError) as e:
+                msg = "[%s] sending keepalive failed: %s, reconnecting in %ss"
+                logger.error(msg % (slconn.sladdr, e, self.netdly))
+                self._disconnect(conn, now)
+                return
+            slconn.state.query_mode = SLState.KEEP_ALIVE_QUERY
+            slconn.state.expect_info = True
+            conn.last_keepalive = now
+        if conn.unsaved and slconn.statefile is not None and \
+           now - conn.last_saved >= self.state_interval:
+            slconn.saveState(slconn.statefile)
+            conn.last_saved = now
+            conn.unsaved = False
+
+    def _receive(self, conn):
+        """
+        Reads available data of a connection and yields decoded traces of
+        all complete packets.
+        """
+        slconn = conn.slconn
+        state = slconn.state
+        now = time.time()
+        try:
+            nbytes = slconn.receiveDataInto(slconn.sladdr)
+        except (SeedLinkException, IOError) as e:
+            msg = "[%s] socket read error: %s, reconnecting in %ss"
+            logger.error(msg % (slconn.sladdr, e, self.netdly))
+            self._disconnect(conn, now)
+            return
+        if not nbytes:
+            msg = "[%s] connection closed by server, reconnecting in %ss"
+            logger.warn(msg % (slconn.sladdr, self.netdly))
+            self._disconnect(conn, now)
+            return
+        conn.last_received = now
+        while state.packetAvailable():
+            if state.packetIsInfo():
+                # keepalive responses are not returned
+                temp = state.sendptr + SLPacket.SLHEADSIZE - 1
+                if chr(state.databuf[temp]) != '*':
+                    state.expect_info = False
+                    state.query_mode = SLState.NO_QUERY
+                trace = None
+            else:
+                try:
+                    slpacket = state.getPacket()
+                    trace = slconn.updateStream(slpacket)
+                except SeedLinkException as e:
+                    logger.error("[%s] bad packet: %s" % (slconn.sladdr, e))
+                    trace = None
+                else:
+                    conn.unsaved = True
+            state.incrementSendPointer()
+            state.packDataBuffer()
+            if trace is not None:
+                yield trace
+            if slconn.socket is None or self.terminate_flag:
+                return
+        try:
+            if state.isEnd():
+                msg = "[%s] end of buffer or selected time window"
+                logger.info(msg % (slconn.sladdr))
+                conn.finished = True
+                slconn.close()
+            elif state.isError():
+                msg = "[%s] SeedLink reported an error with the last command"
+                logger.error(msg % (slconn.sladdr))
+                conn.finished = True
+                slconn.close()
+        except SeedLinkException:
+            # not enough bytes to determine packet type
+            pass
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+Module providing a lightweight SeedLink server.
+
+The server is meant as a local stand-in for a production SeedLink server to
+test clients and to benchmark their throughput and latency. It serves
+Mini-SEED records read from local files or created by a synthetic signal
+generator and implements the commands HELLO, STATION, SELECT, DATA, END,
+INFO and BYE of the SeedLink protocol.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org) & Anthony Lomax
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+
+from obspy.core.utcdatetime import UTCDateTime
+from obspy.seedlink.slpacket import SLPacket
+import SocketServer
+import fnmatch
+import numpy as np
+import select
+import socket
+import struct
+import threading
+import time
+
+
+# offset of data in created Mini-SEED records
+DATA_OFFSET = 64
+# number of samples of created data records (INT32 encoding)
+RECORD_SAMPLES = (SLPacket.SLRECSIZE - DATA_OFFSET) // 4
+
+
+def _createRecord(network, station, location, channel, starttime,
+                  sampling_rate, data, encoding=3, seqnum=1):
+    """
+    Creates a 512 byte Mini-SEED record with a blockette 1000.
+
+    :type data: :class:`numpy.ndarray` or str
+    :param data: Samples of the record, at most 112 samples for INT32
+        encoding (``3``) or 448 characters for ASCII encoding (``0``).
+    """
+    if encoding == 3:
+        payload = np.require(data, '>i4').tostring()
+    else:
+        payload = data
+    if len(payload) > SLPacket.SLRECSIZE - DATA_OFFSET:
+        raise ValueError("too many samples for one record")
+    if sampling_rate >= 1:
+        factor, multiplier = int(round(sampling_rate)), 1
+    elif sampling_rate > 0:
+        factor, multiplier = -int(round(1.0 / sampling_rate)), 1
+    else:
+        factor, multiplier = 0, 0
+    dt = starttime.datetime
+    header = struct.pack('>6scx5s2s3s2sHHBBBxHHhhBBBBiHH',
+                         '%06d' % (seqnum % 1000000), 'D',
+                         station.ljust(5), location.ljust(2),
+                         channel.ljust(3), network.ljust(2),
+                         dt.year, dt.timetuple().tm_yday, dt.hour, dt.minute,
+                         dt.second, dt.microsecond // 100, len(data),
+                         factor, multiplier, 0, 0, 0, 1, 0, DATA_OFFSET, 48)
+    # blockette 1000: encoding, big endian word order, record length 2^9
+    header += struct.pack('>HHBBBx', 1000, 0, encoding, 1, 9)
+    header = header.ljust(DATA_OFFSET, '\x00')
+    return (header + payload).ljust(SLPacket.SLRECSIZE, '\x00')
+
+
+class SLRequestHandler(SocketServer.BaseRequestHandler):
+    """
+    Handles a single client connection of a :class:`SLServer`.
+    """
+    def setup(self):
+        self.server.connections += 1
+        self.buffer = ''
+        # station indices and next sequence numbers in multi-station mode
+        self.selected = []
+        self.streams = {}
+        self.current = None
+        self.streaming = False
+        self.end_sent = False
+
+    def handle(self):
+        sock = self.request
+        while True:
+            timeout = None
+            if self.streaming:
+                timeout = self.sendPackets()
+            try:
+                readable = select.select([sock], [], [], timeout)[0]
+            except (select.error, socket.error):
+                return
+            if not readable:
+                continue
+            try:
+                data = sock.recv(4096)
+            except socket.error:
+                return
+            if not data:
+                return
+            self.buffer += data.replace('\n', '\r')
+            while '\r' in self.buffer:
+                line, self.buffer = self.buffer.split('\r', 1)
+                if line.strip() and not self.handleCommand(line.split()):
+                    return
+
+    def handleCommand(self, args):
+        """
+        Handles one command, returns False if the connection should be
+        closed.
+        """
+        server = self.server
+        command = args[0].upper()
+        if command == 'HELLO':
+            self.send("SeedLink v3.1 (%s) :: SLPROTO:3.1\r\n%s\r\n" %
+                      (server.software, server.organization))
+        elif command == 'BYE':
+            return False
+        elif command == 'INFO':
+            server.info_requests += 1
+            level = args[1].upper() if len(args) > 1 else 'ID'
+            self.sendInfo(level)
+        elif self.streaming:
+            # no further commands during data transfer
+            self.send("ERROR\r\n")
+        elif command == 'STATION' and len(args) > 1:
+            network = args[2] if len(args) > 2 else server.network
+            self.current = [i for i, (net, sta) in enumerate(server.stations)
+                            if fnmatch.fnmatch(sta, args[1]) and
+                            fnmatch.fnmatch(net, network)]
+            self.send("OK\r\n" if self.current else "ERROR\r\n")
+        elif command == 'SELECT':
+            # all channels of a station are served
+            self.send("OK\r\n")
+        elif command == 'DATA':
+            if len(args) > 1:
+                try:
+                    seqnum = int(args[1], 16)
+                except ValueError:
+                    self.send("ERROR\r\n")
+                    return True
+            else:
+                seqnum = server.getStartSequenceNumber()
+            if self.current is None:
+                # uni-station mode
+                self.current = range(len(server.stations))
+                self.selectStations(seqnum)
+                self.send("OK\r\n")
+                self.streaming = True
+            else:
+                self.selectStations(seqnum)
+                self.send("OK\r\n")
+        elif command == 'END':
+            if self.current:
+                self.selectStations(server.getStartSequenceNumber())
+            self.streaming = True
+        else:
+            self.send("ERROR\r\n")
+        return True
+
+    def selectStations(self, seqnum):
+        """
+        Starts transfer of current stations at given sequence number.
+        """
+        for i in self.current:
+            if i not in self.streams:
+                self.selected.append(i)
+            self.streams[i] = max(seqnum, 1)
+        self.current = []
+
+    def sendPackets(self):
+        """
+        Sends packets which are due, returns time in seconds until the next
+        packet is due or None.
+        """
+        server = self.server
+        available = server.getNextSequenceNumber() - 1
+        packets = []
+        # limit packets per call to be able to handle INFO requests
+        while self.selected and len(packets) < 256:
+            seqnum = min(self.streams.values())
+            if seqnum > available:
+                break
+            for i in self.selected:
+                if self.streams[i] == seqnum:
+                    packets.append(server.getPacket(i, seqnum))
+                    self.streams[i] = seqnum + 1
+        if packets:
+            self.send(''.join(packets))
+        if not self.selected:
+            return None
+        seqnum = min(self.streams.values())
+        if server.packets is not None and seqnum > server.packets:
+            if server.end and not self.end_sent:
+                self.send("END")
+                self.end_sent = True
+            return None
+        if seqnum <= available:
+            return 0
+        return max(server.getPacketTime(seqnum) - time.time(), 0)
+
+    def sendInfo(self, level):
+        """
+        Sends INFO packets of given level.
+        """
+        server = self.server
+        xml = '<?xml version="1.0"?>\n<seedlink software="SeedLink v3.1 ' + \
+            '(%s)" organization="%s" started="%s">' % (
+                server.software, server.organization,
+                server.started.strftime("%Y/%m/%d %H:%M:%S.%f")[:-2])
+        if level in ('STATIONS', 'STREAMS'):
+            last = server.getNextSequenceNumber() - 1
+            for i, (net, sta) in enumerate(server.stations):
+                xml += '<station name="%s" network="%s" description="" ' \
+                    'begin_seq="%06X" end_seq="%06X"' % (
+                        sta, net, min(last, 1), last)
+                if level == 'STREAMS':
+                    xml += '><stream location="%s" seedname="%s" type="D" ' \
+                        'begin_time="%s" end_time="%s"/></station>' % (
+                            server.location, server.channel,
+                            server.started.strftime("%Y/%m/%d %H:%M:%S"),
+                            UTCDateTime().strftime("%Y/%m/%d %H:%M:%S"))
+                else:
+                    xml += '/>'
+        xml += '</seedlink>'
+        size = SLPacket.SLRECSIZE - DATA_OFFSET
+        chunks = [xml[i:i + size] for i in range(0, len(xml), size)]
+        packets = []
+        for i, chunk in enumerate(chunks):
+            record = _createRecord('', 'INFO', '', 'LOG', UTCDateTime(), 0,
+                                   chunk.ljust(size), encoding=0)
+            head = 'SLINFO  ' if i == len(chunks) - 1 else 'SLINFO *'
+            packets.append(head + record)
+        self.send(''.join(packets))
+
+    def send(self, data):
+        try:
+            self.request.sendall(data)
+        except socket.error:
+            pass
+
+
+class SLServer(SocketServer.ThreadingTCPServer):
+    """
+    Lightweight SeedLink server serving Mini-SEED records of local files or
+    of a synthetic signal generator.
+
+    Each station provides a sequence of packets numbered from 1 to
+    ``packets``. Without ``rate`` all packets are available at once, which
+    allows to measure the throughput of a client. With ``rate`` packets
+    become available in real time, i.e. packet ``n`` is released ``n / rate``
+    seconds after start of the server, so the latency of a client is given
+    by the time a trace is received minus its end time.
+
+    :type address: tuple, optional
+    :param address: Host and port to listen on, defaults to an arbitrary free
+        port on localhost. Use :meth:`getAddress` to get the actual address.
+    :type stations: int or list of str, optional
+    :param stations: Number of stations or list of station codes in
+        ``"NET_STA"`` format (default is ``1``). Stations are named
+        ``S0000``, ``S0001``, ... if only their number is given.
+    :type network: str, optional
+    :param network: Network code of stations given by number.
+    :type packets: int, optional
+    :param packets: Number of packets per station, ``None`` for an unlimited
+        number of packets (default is ``100``).
+    :type rate: float, optional
+    :param rate: Number of packets per second and station, ``None`` to
+        release all packets at once (default).
+    :type files: list of str, optional
+    :param files: Mini-SEED files with 512 byte records. If given, the
+        records of all files are served in a loop for every station, with
+        station and network codes replaced. Otherwise records of 112 samples
+        of a synthetic signal are created.
+    :type sampling_rate: float, optional
+    :param sampling_rate: Sampling rate of synthetic data, defaults to
+        ``112 * rate`` (i.e. real time) or ``100`` Hz.
+    :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`, optional
+    :param starttime: Start time of synthetic data, defaults to the start
+        time of the server.
+    :type end: bool, optional
+    :param end: Send ``END`` after the last packet (default is ``True``),
+        e.g. to finish a client after all packets are received.
+
+    .. rubric:: Example
+
+    >>> from obspy.seedlink.slmulticlient import SLMultiClient
+    >>> server = SLServer(stations=2, packets=10)
+    >>> server.start()
+    >>> client = SLMultiClient()
+    >>> slconn = client.addConnection(server.getAddress(),
+    ...                               "XX_S0000:HHZ,XX_S0001:HHZ")
+    >>> traces = list(client)
+    >>> print(len(traces))
+    20
+    >>> print(traces[0])  # doctest: +ELLIPSIS
+    XX.S0000..HHZ | ... | 100.0 Hz, 112 samples
+    >>> server.stop()
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    software = "obspy.seedlink.slserver"
+    organization = "ObsPy"
+
+    def __init__(self, address=('127.0.0.1', 0), stations=1, network='XX',
+                 packets=100, rate=None, files=None, sampling_rate=None,
+                 starttime=None, end=True):
+        SocketServer.ThreadingTCPServer.__init__(self, address,
+                                                 SLRequestHandler)
+        if isinstance(stations, (int, long)):
+            self.stations = [(network, 'S%04d' % i) for i in range(stations)]
+        else:
+            self.stations = [tuple(s.split('_', 1)) for s in stations]
+        self.network = network
+        self.location = ''
+        self.channel = 'HHZ'
+        self.packets = packets
+        self.rate = rate
+        self.end = end
+        self.started = UTCDateTime()
+        self._start = time.time()
+        self.records = None
+        if files is not None:
+            self.records = []
+            for filename in files:
+                data = open(filename, 'rb').read()
+                if len(data) % SLPacket.SLRECSIZE or not data[:6].isdigit():
+                    msg = "%s does not consist of 512 byte records"
+                    raise ValueError(msg % filename)
+                self.records.extend(data[i:i + SLPacket.SLRECSIZE] for i in
+                                    range(0, len(data), SLPacket.SLRECSIZE))
+            if not self.records:
+                raise ValueError("no records found")
+        if sampling_rate is None:
+            sampling_rate = RECORD_SAMPLES * rate if rate else 100.0
+        self.sampling_rate = sampling_rate
+        if starttime is None:
+            starttime = self.started
+        self.starttime = starttime
+        # statistics
+        self.connections = 0
+        self.info_requests = 0
+        self.thread = None
+
+    def getAddress(self):
+        """
+        Returns server address in host:port format.
+        """
+        return "%s:%d" % self.server_address[:2]
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+        """
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread and closes the server socket.
+        """
+        if self.thread is not None:
+            self.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.server_close()
+
+    def getPacketTime(self, seqnum):
+        """
+        Returns time in seconds since the epoch at which a packet is released.
+        """
+        if self.rate is None:
+            return self._start
+        return self._start + seqnum / float(self.rate)
+
+    def getNextSequenceNumber(self, now=None):
+        """
+        Returns the sequence number of the next packet to be released.
+        """
+        if self.rate is None:
+            available = self.packets
+        else:
+            if now is None:
+                now = time.time()
+            available = int((now - self._start) * self.rate)
+            if self.packets is not None:
+                available = min(available, self.packets)
+        if available is None:
+            # unlimited packets without rate, all are available
+            return 1 << 24
+        return available + 1
+
+    def getStartSequenceNumber(self):
+        """
+        Returns the sequence number of the first packet sent to a new client,
+        i.e. the first packet or the next packet to be released in real time.
+        """
+        if self.rate is None:
+            return 1
+        return self.getNextSequenceNumber()
+
+    def getPacket(self, station, seqnum):
+        """
+        Returns SeedLink packet with given sequence number of a station.
+
+        :type station: int
+        :param station: Index of station.
+        """
+        net, sta = self.stations[station]
+        if self.records is not None:
+            record = self.records[(seqnum - 1) % len(self.records)]
+            record = '%06d' % (seqnum % 1000000) + record[6:8] + \
+                sta.ljust(5) + record[13:18] + net.ljust(2) + record[20:]
+        else:
+            record = _createRecord(net, sta, self.location, self.channel,
+                                   self.getRecordTime(seqnum),
+                                   self.sampling_rate,
+                                   self.getSamples(station, seqnum),
+                                   seqnum=seqnum)
+        return 'SL%06X' % (seqnum & 0xFFFFFF) + record
+
+    def getRecordTime(self, seqnum):
+        """
+        Returns start time of synthetic record with given sequence number.
+        """
+        return self.starttime + \
+            (seqnum - 1) * RECORD_SAMPLES / float(self.sampling_rate)
+
+    def getSamples(self, station, seqnum):
+        """
+        Returns samples of synthetic record with given sequence number, a sine
+        wave with a different period for each station.
+        """
+        n = np.arange((seqnum - 1) * RECORD_SAMPLES, seqnum * RECORD_SAMPLES)
+        period = self.sampling_rate * (1 + station % 10)
+        return (1000 * np.sin(2 * np.pi * n / period)).astype('int32')
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
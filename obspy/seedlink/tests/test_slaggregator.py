@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.seedlink.slaggregator test suite.
+"""
+from obspy import Stream, read
+from obspy.seedlink.slaggregator import SLPacketAggregator
+from obspy.seedlink.slpacket import SLPacket
+import numpy as np
+import os
+import time
+import unittest
+import warnings
+
+
+# some debug flags
+SHOW_BENCHMARK = False
+
+
+class SLPacketAggregatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # directory where the test files are located
+        self.path = os.path.join(os.path.dirname(__file__), 'data')
+        self.file = os.path.join(self.path,
+                                 'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        data = open(self.file, 'rb').read()
+        self.records = [data[i:i + SLPacket.SLRECSIZE]
+                        for i in range(0, len(data), SLPacket.SLRECSIZE)]
+        self.trace = read(self.file)[0]
+
+    def _packets(self, stations=['BGLD']):
+        """
+        Returns interleaved SeedLink packets of the test records for given
+        stations.
+        """
+        packets = []
+        for i, record in enumerate(self.records):
+            for sta in stations:
+                record = record[:8] + sta.ljust(5) + record[13:]
+                packets.append(SLPacket(bytearray('SL%06X' % (i + 1) + record),
+                                        0))
+        return packets
+
+    def test_flush(self):
+        """
+        All packets of a channel are merged into one trace.
+        """
+        for batch_size in [1, 3, 100]:
+            aggregator = SLPacketAggregator(batch_size=batch_size)
+            st = Stream()
+            for packet in self._packets(['A', 'B']):
+                st += aggregator.add(packet)
+            self.assertEqual(len(st), 0)
+            self.assertEqual(len(aggregator), 20 % batch_size)
+            st = aggregator.flush()
+            self.assertEqual(len(aggregator), 0)
+            self.assertEqual([tr.stats.station for tr in st], ['A', 'B'])
+            for tr in st:
+                self.assertEqual(tr.stats.starttime,
+                                 self.trace.stats.starttime)
+                self.assertEqual(tr.stats.sampling_rate, 200.0)
+                np.testing.assert_array_equal(tr.data, self.trace.data)
+            self.assertEqual(len(aggregator.flush()), 0)
+
+    def test_corruptRecord(self):
+        """
+        An undecodable record does not discard the other queued packets.
+        """
+        aggregator = SLPacketAggregator()
+        aggregator.add('X' * SLPacket.SLRECSIZE)
+        for packet in self._packets():
+            aggregator.add(packet)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            st = aggregator.flush()
+        self.assertEqual(len(w), 1)
+        self.assertEqual(len(st), 1)
+        np.testing.assert_array_equal(st[0].data, self.trace.data)
+
+    def test_flushPolicy(self):
+        """
+        Tests returning traces on size limit, time limit and gaps.
+        """
+        # size limit
+        aggregator = SLPacketAggregator(batch_size=2, max_samples=1000)
+        traces = []
+        for packet in self._packets():
+            traces.extend(aggregator.add(packet))
+        traces.extend(aggregator.flush())
+        self.assertTrue(len(traces) > 2)
+        for tr in traces[:-1]:
+            self.assertTrue(tr.stats.npts >= 1000)
+            self.assertEqual(tr.stats.endtime + tr.stats.delta,
+                             traces[traces.index(tr) + 1].stats.starttime)
+        np.testing.assert_array_equal(np.concatenate([tr.data
+                                                      for tr in traces]),
+                                      self.trace.data)
+        # time limit
+        aggregator = SLPacketAggregator(max_latency=0.1)
+        packets = self._packets()
+        self.assertEqual(len(aggregator.add(packets[0])), 0)
+        self.assertEqual(len(aggregator.add(packets[1])), 0)
+        time.sleep(0.1)
+        st = aggregator.poll()
+        self.assertEqual(len(st), 1)
+        self.assertEqual(st[0].stats.npts, 2 * 412)
+        self.assertEqual(len(aggregator), 0)
+        # gap
+        aggregator = SLPacketAggregator()
+        for packet in packets[:4] + packets[5:]:
+            aggregator.add(packet)
+        st = aggregator.flush()
+        self.assertEqual(len(st), 2)
+        self.assertEqual(st[0].stats.npts, 4 * 412)
+        self.assertEqual(st[1].stats.npts, 5 * 412)
+        self.assertEqual(st[1].stats.starttime,
+                         self.trace.stats.starttime + 5 * 412 * 0.005)
+
+    def test_benchmark(self):
+        """
+        Compares decoding packets in batches with decoding each packet and
+        merging the resulting traces.
+
+        Set SHOW_BENCHMARK to print the throughput.
+        """
+        packets = self._packets(['S%d' % i for i in range(100)])
+        start = time.time()
+        aggregator = SLPacketAggregator()
+        for packet in packets:
+            aggregator.add(packet)
+        st1 = aggregator.flush()
+        batched = time.time() - start
+        start = time.time()
+        st2 = Stream([SLPacket(packet.slhead + packet.msrecord,
+                               0).getTrace() for packet in packets])
+        st2.merge(-1)
+        single = time.time() - start
+        self.assertEqual(len(st1), 100)
+        self.assertEqual(len(st2), 100)
+        if SHOW_BENCHMARK:
+            print "batched: %.0f packets/s" % (len(packets) / batched)
+            print "single: %.0f packets/s" % (len(packets) / single)
+
+
+def suite():
+    return unittest.makeSuite(SLPacketAggregatorTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
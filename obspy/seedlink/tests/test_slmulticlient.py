@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.seedlink.slmulticlient test suite.
+"""
+from obspy.core.util import NamedTemporaryFile
+from obspy.seedlink.slmulticlient import SLMultiClient
+from obspy.seedlink.slserver import SLServer
+import os
+import socket
+import threading
+import time
+import unittest
+
+
+# some debug flags
+SHOW_BENCHMARK = False
+
+
+class SLMultiClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+
+    def _startServer(self, **kwargs):
+        server = SLServer(**kwargs)
+        server.start()
+        self.servers.append(server)
+        return server
+
+    def test_multipleServers(self):
+        """
+        Collects all packets of two stations from each of two servers.
+        """
+        client = SLMultiClient(netto=10, netdly=1)
+        for i in range(2):
+            server = self._startServer(stations=['XX_S%d1' % i,
+                                                 'XX_S%d2' % i],
+                                       packets=25)
+            client.addConnection(server.getAddress(),
+                                 "XX_S%d1:EHE,XX_S%d2:EHE" % (i, i))
+        received = {}
+        for trace in client:
+            received.setdefault(trace.id, []).append(trace)
+        self.assertEqual(sorted(received.keys()),
+                         ['XX.S01..HHZ', 'XX.S02..HHZ', 'XX.S11..HHZ',
+                          'XX.S12..HHZ'])
+        for traces in received.values():
+            self.assertEqual(len(traces), 25)
+        for slconn in client.getConnections():
+            self.assertEqual([stream.seqnum for stream in slconn.streams],
+                             [25, 25])
+            self.assertTrue(slconn.socket is None)
+
+    def test_unresponsiveServer(self):
+        """
+        A server not answering the handshake does not delay the data of the
+        other connections.
+        """
+        silent = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        silent.bind(('127.0.0.1', 0))
+        silent.listen(1)
+        try:
+            server = self._startServer(stations=['XX_A'], packets=10)
+            client = SLMultiClient(netto=30, netdly=1)
+            client.addConnection("127.0.0.1:%d" % silent.getsockname()[1],
+                                 "XX_B:HHZ")
+            client.addConnection(server.getAddress(), "XX_A:HHZ")
+            start = time.time()
+            traces = client.iterTraces()
+            for _i in range(10):
+                self.assertEqual(traces.next().stats.station, 'A')
+            self.assertTrue(time.time() - start < 5)
+            traces.close()
+        finally:
+            silent.close()
+
+    def test_stateFile(self):
+        """
+        Resumes transmission after the last received packet of each station
+        using a state file.
+        """
+        server = self._startServer(stations=['XX_A', 'XX_B'], packets=20)
+        statefile = NamedTemporaryFile().name
+        try:
+            client = SLMultiClient(netto=10, netdly=1)
+            client.addConnection(server.getAddress(), "XX_A:EHE,XX_B:EHE",
+                                 statefile=statefile)
+            traces = client.iterTraces()
+            for _i in range(15):
+                traces.next()
+            # state file is written when the generator is closed
+            traces.close()
+            lines = sorted(open(statefile).read().splitlines())
+            self.assertEqual([line.split()[:3] for line in lines],
+                             [['XX', 'A', '8'], ['XX', 'B', '7']])
+            # second run with same state file
+            client = SLMultiClient(netto=10, netdly=1)
+            client.addConnection(server.getAddress(), "XX_A:EHE,XX_B:EHE",
+                                 statefile=statefile)
+            traces = list(client)
+            self.assertEqual(len([tr for tr in traces
+                                  if tr.stats.station == 'A']), 12)
+            self.assertEqual(len([tr for tr in traces
+                                  if tr.stats.station == 'B']), 13)
+            self.assertEqual(server.connections, 2)
+        finally:
+            os.remove(statefile)
+
+    def test_keepaliveAndTimeout(self):
+        """
+        Keepalive requests are sent on idle connections, connections without
+        any data are re-established after the network timeout.
+        """
+        server = self._startServer(stations=['XX_A'], packets=1, end=False)
+        # answered keepalive requests keep the connection alive
+        client = SLMultiClient(netto=0.8, netdly=0.1, keepalive=0.2)
+        client.poll_interval = 0.05
+        client.addConnection(server.getAddress(), "XX_A:HHZ")
+        threading.Timer(1.5, client.terminate).start()
+        traces = list(client)
+        self.assertEqual(len(traces), 1)
+        self.assertEqual(server.connections, 1)
+        self.assertTrue(server.info_requests > 3)
+        # reconnect after network timeout without keepalive
+        client = SLMultiClient(netto=0.3, netdly=0.1)
+        client.poll_interval = 0.05
+        client.addConnection(server.getAddress(), "XX_A:HHZ")
+        threading.Timer(1.5, client.terminate).start()
+        traces = list(client)
+        # no duplicate packets after resume
+        self.assertEqual(len(traces), 1)
+        self.assertTrue(server.connections > 2)
+
+    def test_benchmark(self):
+        """
+        Throughput of receiving and decoding packets of many stations.
+
+        Set SHOW_BENCHMARK to print the throughput.
+        """
+        stations = ['XX_S%03d' % i for i in range(50)]
+        server = self._startServer(stations=stations, packets=40)
+        client = SLMultiClient(netto=10, netdly=1)
+        client.addConnection(server.getAddress(),
+                             ','.join(s + ':HHZ' for s in stations))
+        start = time.time()
+        count = len(list(client))
+        seconds = time.time() - start
+        self.assertEqual(count, 50 * 40)
+        if SHOW_BENCHMARK:
+            print "SLMultiClient: %.0f packets/s" % (count / seconds)
+
+
+def suite():
+    return unittest.makeSuite(SLMultiClientTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
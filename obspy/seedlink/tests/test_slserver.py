@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.seedlink.slserver test suite.
+"""
+from obspy import Stream, read
+from obspy.seedlink.client.seedlinkconnection import SeedLinkConnection
+from obspy.seedlink.slmulticlient import SLMultiClient
+from obspy.seedlink.slpacket import SLPacket
+from obspy.seedlink.slserver import SLServer
+import numpy as np
+import os
+import socket
+import time
+import unittest
+
+
+# some debug flags
+SHOW_BENCHMARK = False
+
+
+class SLServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # directory where the test files are located
+        self.path = os.path.join(os.path.dirname(__file__), 'data')
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+
+    def _startServer(self, **kwargs):
+        server = SLServer(**kwargs)
+        server.start()
+        self.servers.append(server)
+        return server
+
+    def _command(self, sock, command):
+        sock.sendall(command + "\r")
+        return sock.recv(4096)
+
+    def test_protocol(self):
+        """
+        Tests responses to commands and INFO requests.
+        """
+        server = self._startServer(stations=['XX_A', 'YY_B'], packets=2)
+        host, port = server.getAddress().split(':')
+        sock = socket.create_connection((host, int(port)))
+        try:
+            response = self._command(sock, "HELLO")
+            self.assertTrue(response.startswith("SeedLink v3.1 ("))
+            self.assertEqual(self._command(sock, "STATION C XX"), "ERROR\r\n")
+            self.assertEqual(self._command(sock, "STATION B YY"), "OK\r\n")
+            self.assertEqual(self._command(sock, "SELECT ??HZ"), "OK\r\n")
+            self.assertEqual(self._command(sock, "DATA 2"), "OK\r\n")
+            self.assertEqual(self._command(sock, "FOO"), "ERROR\r\n")
+            sock.sendall("END\r")
+            data = ''
+            while not data.endswith("END"):
+                data += sock.recv(4096)
+            self.assertEqual(len(data), 520 + 3)
+            trace = SLPacket(bytearray(data), 0).getTrace()
+            self.assertEqual(trace.id, 'YY.B..HHZ')
+            # start time is stored with a precision of 0.1 ms
+            self.assertTrue(abs(trace.stats.starttime -
+                                server.getRecordTime(2)) < 1e-4)
+            np.testing.assert_array_equal(trace.data,
+                                          server.getSamples(1, 2))
+            self.assertEqual(data[:8], 'SL000002')
+        finally:
+            sock.close()
+        # INFO request
+        slconn = SeedLinkConnection()
+        slconn.setSLAddress(server.getAddress())
+        slconn.connect()
+        self.assertEqual(slconn.server_version, 3.1)
+        slconn.sendInfoRequest("STATIONS", 3)
+        data = ''
+        while not data or data[-SLPacket.SLRECSIZE - 1] == '*':
+            data += slconn.socket.recv(4096)
+        slconn.disconnect()
+        packets = [SLPacket(bytearray(data), i)
+                   for i in range(0, len(data), 520)]
+        self.assertEqual(packets[-1].getType(), SLPacket.TYPE_SLINFT)
+        info = ''.join(str(packet.msrecord)[64:] for packet in packets)
+        self.assertTrue('<station name="A" network="XX"' in info)
+        self.assertTrue('<station name="B" network="YY"' in info)
+        self.assertEqual(server.info_requests, 1)
+
+    def test_files(self):
+        """
+        Serves records of Mini-SEED files in uni-station mode.
+        """
+        filename = os.path.join(self.path,
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        server = self._startServer(stations=['XX_A'], files=[filename],
+                                   packets=10)
+        client = SLMultiClient()
+        client.addConnection(server.getAddress())
+        st = Stream(list(client))
+        self.assertEqual(len(st), 10)
+        st.merge(-1)
+        expected = read(filename)[0]
+        self.assertEqual(st[0].id, 'XX.A..EHE')
+        self.assertEqual(st[0].stats.starttime, expected.stats.starttime)
+        np.testing.assert_array_equal(st[0].data, expected.data)
+        self.assertRaises(ValueError, SLServer, files=[__file__])
+
+    def test_latency(self):
+        """
+        Packets are released in real time with given packet rate.
+
+        Set SHOW_BENCHMARK to print the latency.
+        """
+        server = self._startServer(stations=3, packets=None, rate=20)
+        self.assertEqual(server.sampling_rate, 20 * 112)
+        client = SLMultiClient(netto=10, netdly=1)
+        client.addConnection(server.getAddress(),
+                             "XX_S0000:HHZ,XX_S0001:HHZ,XX_S0002:HHZ")
+        latencies = []
+        for trace in client:
+            latencies.append(time.time() - trace.stats.endtime.timestamp)
+            if len(latencies) == 30:
+                client.terminate()
+        # starts with next packet released
+        self.assertTrue(min(latencies) > 0)
+        self.assertTrue(np.median(latencies) < 0.5)
+        if SHOW_BENCHMARK:
+            print "latency: median %.4f s, max %.4f s" % (
+                np.median(latencies), max(latencies))
+
+
+def suite():
+    return unittest.makeSuite(SLServerTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
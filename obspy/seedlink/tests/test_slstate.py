@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.seedlink.client.slstate test suite.
+"""
+from obspy.seedlink.client.slstate import SLState
+from obspy.seedlink.seedlinkexception import SeedLinkException
+from obspy.seedlink.slpacket import SLPacket
+import os
+import socket
+import threading
+import time
+import unittest
+
+
+# some debug flags
+SHOW_BENCHMARK = False
+
+
+def _createPackets(count):
+    """
+    Returns given number of SeedLink data packets with consecutive sequence
+    numbers built from Mini-SEED records of the test data.
+    """
+    filename = os.path.join(os.path.dirname(__file__), 'data',
+                            'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+    data = open(filename, 'rb').read()
+    records = [data[i:i + SLPacket.SLRECSIZE]
+               for i in range(0, len(data), SLPacket.SLRECSIZE)]
+    return ['SL%06X' % (i + 1) + records[i % len(records)]
+            for i in range(count)]
+
+
+def _appendBytesLoop(state, bytes):
+    """
+    Reference implementation of SLState.appendBytes copying byte by byte.
+    """
+    for i in range(len(bytes)):
+        state.databuf[state.recptr] = bytes[i]
+        state.recptr += 1
+
+
+class SLStateTestCase(unittest.TestCase):
+
+    def _collect(self, state):
+        """
+        Returns all complete packets in buffer, similar to
+        SeedLinkConnection.collect.
+        """
+        packets = []
+        while state.packetAvailable():
+            packets.append(state.getPacket())
+            state.incrementSendPointer()
+            state.packDataBuffer()
+        return packets
+
+    def test_appendBytes(self):
+        """
+        Tests appending chunks of received bytes and getting packets.
+        """
+        packets = _createPackets(100)
+        data = ''.join(packets)
+        state = SLState()
+        received = []
+        pos = 0
+        for size in [1, 7, 600, 1040, 519, 3000, 8000, 2]:
+            while pos < len(data):
+                chunk = data[pos:pos + min(size, state.bytesRemaining())]
+                state.appendBytes(chunk)
+                pos += len(chunk)
+                received.extend(self._collect(state))
+                self.assertTrue(state.recptr - state.sendptr < 520)
+            pos = 0
+        self.assertEqual(len(received), 8 * len(packets))
+        for i, packet in enumerate(received):
+            expected = packets[i % len(packets)]
+            self.assertEqual(packet.getSequenceNumber(), i % 100 + 1)
+            self.assertEqual(str(packet.slhead), expected[:8])
+            self.assertEqual(str(packet.msrecord), expected[8:])
+        # all sent bytes have been removed
+        self.assertEqual(state.recptr, 0)
+        self.assertEqual(state.sendptr, 0)
+        # buffer overflow
+        self.assertRaises(SeedLinkException, state.appendBytes,
+                          'x' * (SLState.BUFSIZE + 1))
+        # every instance has its own buffer
+        self.assertTrue(SLState().databuf is not SLState().databuf)
+
+    def test_receiveInto(self):
+        """
+        Receives packets from a local socket directly into the buffer.
+
+        Set SHOW_BENCHMARK to compare the throughput with copying received
+        bytes byte by byte.
+        """
+        count = 2000
+        packets = _createPackets(count)
+        data = ''.join(packets)
+
+        def serve(sock):
+            for i in range(0, len(data), 4096):
+                sock.sendall(data[i:i + 4096])
+            sock.close()
+
+        results = {}
+        for method in ['recv_into', 'loop']:
+            server, client = socket.socketpair()
+            thread = threading.Thread(target=serve, args=(server,))
+            state = SLState()
+            received = []
+            start = time.time()
+            thread.start()
+            while True:
+                if method == 'recv_into':
+                    nbytes = client.recv_into(state.getReceiveBuffer())
+                    state.advanceReceivePointer(nbytes)
+                else:
+                    bytes = client.recv(state.bytesRemaining())
+                    _appendBytesLoop(state, bytes)
+                    nbytes = len(bytes)
+                if not nbytes:
+                    break
+                received.extend(self._collect(state))
+            results[method] = time.time() - start
+            thread.join()
+            client.close()
+            self.assertEqual(len(received), count)
+            self.assertEqual([p.getSequenceNumber() for p in received],
+                             range(1, count + 1))
+        if SHOW_BENCHMARK:
+            for method, seconds in results.items():
+                print "%s: %.0f packets/s" % (method, count / seconds)
+
+
+def suite():
+    return unittest.makeSuite(SLStateTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -18,19 +18,50 @@ Various Seismogram Filtering Functions
 """
 
 import warnings
+import numpy as np
 from numpy import array, where, fft
+from obspy.core.util import LRUCache
+from obspy.signal.util import nextpow2
 from scipy.fftpack import hilbert
 from scipy.signal import iirfilter, lfilter, remez, convolve, get_window, \
     cheby2, cheb2ord
+try:
+    from scipy.signal import sosfilt
+except ImportError:
+    # second-order sections are available since SciPy 0.16
+    sosfilt = None
 
 
-def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
+#: Cache of designed filter coefficients shared by all filter functions.
+#: Inspect ``FILTER_CACHE.hits``, ``FILTER_CACHE.misses`` or
+#: ``FILTER_CACHE.info()`` for the cache statistics.
+FILTER_CACHE = LRUCache(maxsize=512)
+
+#: Infinite impulse responses are truncated for ``engine='fft'`` as soon as
+#: the absolute sum of all remaining samples drops below this fraction of the
+#: absolute sum of the whole impulse response.
+FFT_ENGINE_TOLERANCE = 1e-10
+#: Maximal number of samples of a truncated impulse response.
+FFT_ENGINE_MAX_TAPS = 2 ** 20
+
+
+def _readonly(*arrays):
+    """
+    Protects cached filter coefficients against modification.
+    """
+    for arr in arrays:
+        arr.setflags(write=False)
+
+
+def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False,
+             engine='direct'):
     """
     Butterworth-Bandpass Filter.
 
     Filter data from ``freqmin`` to ``freqmax`` using ``corners`` corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered along the last axis, e.g. one trace per row.
     :param freqmin: Pass band low corner frequency.
     :param freqmax: Pass band high corner frequency.
     :param df: Sampling rate in Hz.
@@ -39,6 +70,10 @@ def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
     :param zerophase: If True, apply filter once forwards and once backwards.
         This results in twice the number of corners but zero phase shift in
         the resulting filtered trace.
+    :param engine: ``'direct'`` applies the recursive filter, ``'fft'``
+        convolves the data with the truncated impulse response of the filter
+        using the overlap-save method (see :func:`_applyIIR`). Defaults to
+        ``'direct'``.
     :return: Filtered data.
     """
     fe = 0.5 * df
@@ -53,23 +88,20 @@ def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
     if low > 1:
         msg = "Selected low corner frequency is above Nyquist."
         raise ValueError(msg)
-    [b, a] = iirfilter(corners, [low, high], btype='band',
-                       ftype='butter', output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    coefficients = _butterworth(corners, [low, high], 'band')
+    return _applyIIR(coefficients, data, zerophase, engine)
 
 
-def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
+def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False,
+             engine='direct'):
     """
     Butterworth-Bandstop Filter.
 
     Filter data removing data between frequencies ``freqmin`` and ``freqmax``
     using ``corners`` corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered along the last axis, e.g. one trace per row.
     :param freqmin: Stop band low corner frequency.
     :param freqmax: Stop band high corner frequency.
     :param df: Sampling rate in Hz.
@@ -78,6 +110,10 @@ def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
     :param zerophase: If True, apply filter once forwards and once backwards.
         This results in twice the number of corners but zero phase shift in
         the resulting filtered trace.
+    :param engine: ``'direct'`` applies the recursive filter, ``'fft'``
+        convolves the data with the truncated impulse response of the filter
+        using the overlap-save method (see :func:`_applyIIR`). Defaults to
+        ``'direct'``.
     :return: Filtered data.
     """
     fe = 0.5 * df
@@ -92,23 +128,19 @@ def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
     if low > 1:
         msg = "Selected low corner frequency is above Nyquist."
         raise ValueError(msg)
-    [b, a] = iirfilter(corners, [low, high],
-                       btype='bandstop', ftype='butter', output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    coefficients = _butterworth(corners, [low, high], 'bandstop')
+    return _applyIIR(coefficients, data, zerophase, engine)
 
 
-def lowpass(data, freq, df, corners=4, zerophase=False):
+def lowpass(data, freq, df, corners=4, zerophase=False, engine='direct'):
     """
     Butterworth-Lowpass Filter.
 
     Filter data removing data over certain frequency ``freq`` using ``corners``
     corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered along the last axis, e.g. one trace per row.
     :param freq: Filter corner frequency.
     :param df: Sampling rate in Hz.
     :param corners: Filter corners. Note: This is twice the value of PITSA's
@@ -116,6 +148,10 @@ def lowpass(data, freq, df, corners=4, zerophase=False):
     :param zerophase: If True, apply filter once forwards and once backwards.
         This results in twice the number of corners but zero phase shift in
         the resulting filtered trace.
+    :param engine: ``'direct'`` applies the recursive filter, ``'fft'``
+        convolves the data with the truncated impulse response of the filter
+        using the overlap-save method (see :func:`_applyIIR`). Defaults to
+        ``'direct'``.
     :return: Filtered data.
     """
     fe = 0.5 * df
@@ -126,23 +162,19 @@ def lowpass(data, freq, df, corners=4, zerophase=False):
         msg = "Selected corner frequency is above Nyquist. " + \
               "Setting Nyquist as high corner."
         warnings.warn(msg)
-    [b, a] = iirfilter(corners, f, btype='lowpass', ftype='butter',
-                       output='ba')
-    if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
-    else:
-        return lfilter(b, a, data)
+    coefficients = _butterworth(corners, f, 'lowpass')
+    return _applyIIR(coefficients, data, zerophase, engine)
 
 
-def highpass(data, freq, df, corners=4, zerophase=False):
+def highpass(data, freq, df, corners=4, zerophase=False, engine='direct'):
     """
     Butterworth-Highpass Filter.
 
     Filter data removing data below certain frequency ``freq`` using
     ``corners`` corners.
 
-    :param data: Data to filter, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray. Two-dimensional arrays
+        are filtered along the last axis, e.g. one trace per row.
     :param freq: Filter corner frequency.
     :param df: Sampling rate in Hz.
     :param corners: Filter corners. Note: This is twice the value of PITSA's
@@ -150,6 +182,10 @@ def highpass(data, freq, df, corners=4, zerophase=False):
     :param zerophase: If True, apply filter once forwards and once backwards.
         This results in twice the number of corners but zero phase shift in
         the resulting filtered trace.
+    :param engine: ``'direct'`` applies the recursive filter, ``'fft'``
+        convolves the data with the truncated impulse response of the filter
+        using the overlap-save method (see :func:`_applyIIR`). Defaults to
+        ``'direct'``.
     :return: Filtered data.
     """
     fe = 0.5 * df
@@ -158,13 +194,167 @@ def highpass(data, freq, df, corners=4, zerophase=False):
     if f > 1:
         msg = "Selected corner frequency is above Nyquist."
         raise ValueError(msg)
-    [b, a] = iirfilter(corners, f, btype='highpass', ftype='butter',
-                       output='ba')
+    coefficients = _butterworth(corners, f, 'highpass')
+    return _applyIIR(coefficients, data, zerophase, engine)
+
+
+def _butterworth(corners, wn, btype):
+    """
+    Designs a Butterworth filter.
+
+    The filter is returned as second-order sections if supported by the
+    installed SciPy version (numerically stable also for many corners),
+    otherwise as numerator and denominator polynomials.
+
+    :param corners: Filter corners.
+    :param wn: Corner frequency or list of corner frequencies normalized to
+        the Nyquist frequency.
+    :param btype: Type of filter, e.g. ``'band'`` or ``'lowpass'``.
+    :return: Tuple of form (``'sos'`` or ``'ba'``) and filter coefficients.
+
+    Designed filters are kept in :data:`FILTER_CACHE`.
+    """
+    if isinstance(wn, list):
+        wn = tuple(wn)
+    key = ('butter', corners, wn, btype)
+    coefficients = FILTER_CACHE.get(key)
+    if coefficients is not None:
+        return coefficients
+    if sosfilt is not None:
+        sos = iirfilter(corners, wn, btype=btype, ftype='butter',
+                        output='sos')
+        _readonly(sos)
+        coefficients = ('sos', sos)
+    else:
+        b, a = iirfilter(corners, wn, btype=btype, ftype='butter',
+                         output='ba')
+        _readonly(b, a)
+        coefficients = ('ba', (b, a))
+    FILTER_CACHE[key] = coefficients
+    return coefficients
+
+
+def _applyIIR(coefficients, data, zerophase=False, engine='direct'):
+    """
+    Applies filter coefficients designed by :func:`_butterworth`.
+
+    The data is filtered along the last axis, so a 2-D array of traces with
+    one trace per row is filtered in one go.
+
+    :param coefficients: Tuple as returned by :func:`_butterworth`.
+    :param data: Data to filter, type numpy.ndarray.
+    :param zerophase: If True, apply filter once forwards and once backwards.
+    :param engine: ``'direct'`` or ``'fft'``.
+    :return: Filtered data.
+
+    With ``engine='fft'`` the data is convolved with the impulse response of
+    the filter truncated according to :data:`FFT_ENGINE_TOLERANCE` (see
+    :func:`_impulseResponse`). The result differs from ``engine='direct'``
+    by at most ``FFT_ENGINE_TOLERANCE * sum(abs(h)) * max(abs(data))`` per
+    pass (apart from rounding errors), with ``h`` being the impulse response.
+    """
+    form, coeffs = coefficients
+    if engine not in ('direct', 'fft'):
+        msg = "engine must be either 'direct' or 'fft'"
+        raise ValueError(msg)
+    if engine == 'fft':
+        h = _impulseResponse(coefficients)
+
+        def func(x):
+            return _overlapSave(h, x)
+    elif form == 'sos':
+        def func(x):
+            return sosfilt(coeffs, x)
+    else:
+        def func(x):
+            return lfilter(coeffs[0], coeffs[1], x)
     if zerophase:
-        firstpass = lfilter(b, a, data)
-        return lfilter(b, a, firstpass[::-1])[::-1]
+        firstpass = func(data)
+        return func(firstpass[..., ::-1])[..., ::-1]
+    return func(data)
+
+
+def _impulseResponse(coefficients):
+    """
+    Returns the truncated impulse response of given filter coefficients.
+
+    The impulse response is truncated as soon as the absolute sum of all
+    remaining samples drops below :data:`FFT_ENGINE_TOLERANCE` times the
+    absolute sum of the whole impulse response, but it never exceeds
+    :data:`FFT_ENGINE_MAX_TAPS` samples. Impulse responses are kept in
+    :data:`FILTER_CACHE`.
+
+    :param coefficients: Tuple as returned by :func:`_butterworth`.
+    :return: Impulse response, type numpy.ndarray.
+    """
+    form, coeffs = coefficients
+    if form == 'sos':
+        key = ('impulse', form, coeffs.tostring())
     else:
-        return lfilter(b, a, data)
+        key = ('impulse', form, coeffs[0].tostring(), coeffs[1].tostring())
+    h = FILTER_CACHE.get(key)
+    if h is not None:
+        return h
+    npts = 1024
+    while True:
+        impulse = np.zeros(npts)
+        impulse[0] = 1.0
+        h = _applyIIR(coefficients, impulse)
+        # tail[i] is the absolute sum of all samples starting at index i
+        tail = np.cumsum(np.abs(h)[::-1])[::-1]
+        limit = FFT_ENGINE_TOLERANCE * tail[0]
+        if tail[npts * 3 // 4] <= limit:
+            break
+        if npts >= FFT_ENGINE_MAX_TAPS:
+            msg = "Impulse response of filter truncated at %d samples. " + \
+                  "Results of engine 'fft' may be inaccurate."
+            warnings.warn(msg % npts)
+            break
+        npts *= 2
+    h = h[:max(np.searchsorted(-tail, -limit), 1)].copy()
+    _readonly(h)
+    FILTER_CACHE[key] = h
+    return h
+
+
+def _overlapSave(h, data, npts=None):
+    """
+    Convolves data with a finite impulse response via overlap-save.
+
+    The data is processed along the last axis in blocks of fixed size, so
+    the memory needed besides input and output is bounded by the length of
+    the impulse response.
+
+    :param h: Impulse response, type numpy.ndarray.
+    :param data: Data to filter, type numpy.ndarray.
+    :param npts: Number of output samples. Defaults to the number of input
+        samples, which equals filtering with zero initial conditions. Use
+        ``len(data) + len(h) - 1`` for the full convolution.
+    :return: Filtered data.
+    """
+    data = np.asarray(data, dtype='float64')
+    ntaps = len(h)
+    ndata = data.shape[-1]
+    if npts is None:
+        npts = ndata
+    nfft = min(nextpow2(max(8 * ntaps, 2 ** 15)), nextpow2(npts + ntaps - 1))
+    step = nfft - ntaps + 1
+    spectrum = fft.rfft(h, nfft)
+    out = np.empty(data.shape[:-1] + (npts,))
+    block = np.zeros(data.shape[:-1] + (nfft,))
+    for start in xrange(0, npts, step):
+        # block covers input samples start - ntaps + 1 to start + step - 1
+        first = start - ntaps + 1
+        left = max(first, 0)
+        right = min(start + step, ndata)
+        block[:] = 0
+        if right > left:
+            block[..., left - first:right - first] = data[..., left:right]
+        filtered = fft.irfft(fft.rfft(block) * spectrum, nfft)
+        count = min(step, npts - start)
+        out[..., start:start + count] = filtered[..., ntaps - 1:
+                                                 ntaps - 1 + count]
+    return out
 
 
 def envelope(data):
@@ -184,7 +374,7 @@ def envelope(data):
     return data
 
 
-def remezFIR(data, freqmin, freqmax, df):
+def remezFIR(data, freqmin, freqmax, df, engine='direct'):
     """
     The minimax optimal bandpass using Remez algorithm. (experimental)
 
@@ -194,6 +384,8 @@ def remezFIR(data, freqmin, freqmax, df):
     :param freqmin: Low corner frequency.
     :param freqmax: High corner frequency.
     :param df: Sampling rate in Hz.
+    :param engine: ``'direct'`` or ``'fft'`` for convolution in the time
+        domain or via the overlap-save method. Defaults to ``'direct'``.
     :return: Filtered data.
 
     Finite impulse response (FIR) filter whose transfer function minimizes
@@ -247,12 +439,22 @@ def remezFIR(data, freqmin, freqmax, df):
     # http://episteme.arstechnica.com/
     #         eve/forums/a/tpc/f/6330927813/m/175006289731
     #
+    if engine not in ('direct', 'fft'):
+        msg = "engine must be either 'direct' or 'fft'"
+        raise ValueError(msg)
     # take 10% of freqmin and freqmax as """corners"""
     flt = freqmin - 0.1 * freqmin
     fut = freqmax + 0.1 * freqmax
-    # bandpass between freqmin and freqmax
-    filt = remez(50, array([0, flt, freqmin, freqmax, fut, df / 2 - 1]),
-                 array([0, 1, 0]), Hz=df)
+    key = ('remez', freqmin, freqmax, df)
+    filt = FILTER_CACHE.get(key)
+    if filt is None:
+        # bandpass between freqmin and freqmax
+        filt = remez(50, array([0, flt, freqmin, freqmax, fut, df / 2 - 1]),
+                     array([0, 1, 0]), Hz=df)
+        _readonly(filt)
+        FILTER_CACHE[key] = filt
+    if engine == 'fft':
+        return _overlapSave(filt, data, len(data) + len(filt) - 1)
     return convolve(filt, data)
 
 
@@ -348,20 +550,27 @@ def lowpassCheby2(data, freq, df, maxorder=12, ba=False,
     rp, rs, order = 1, 96, 1e99
     ws = freq / nyquist  # stop band frequency
     wp = ws              # pass band frequency
+    key = ('cheby2', ws, maxorder)
     # raise for some bad scenarios
     if ws > 1:
         ws = 1.0
         msg = "Selected corner frequency is above Nyquist. " + \
               "Setting Nyquist as high corner."
         warnings.warn(msg)
-    while True:
-        if order <= maxorder:
-            break
-        wp = wp * 0.99
-        order, wn = cheb2ord(wp, ws, rp, rs, analog=0)
-    b, a = cheby2(order, rs, wn, btype='low', analog=0, output='ba')
+    coefficients = FILTER_CACHE.get(key)
+    if coefficients is None:
+        while True:
+            if order <= maxorder:
+                break
+            wp = wp * 0.99
+            order, wn = cheb2ord(wp, ws, rp, rs, analog=0)
+        b, a = cheby2(order, rs, wn, btype='low', analog=0, output='ba')
+        _readonly(b, a)
+        FILTER_CACHE[key] = (b, a, wp)
+    else:
+        b, a, wp = coefficients
     if ba:
-        return b, a
+        return b.copy(), a.copy()
     if freq_passband:
         return lfilter(b, a, data), wp * nyquist
     return lfilter(b, a, data)
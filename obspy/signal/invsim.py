@@ -19,15 +19,18 @@ to m/s.
     (http://www.gnu.org/copyleft/lesser.html)
 """
 
+from obspy.core.util import LRUCache
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.core.util.decorator import deprecated_keywords
 from obspy.signal.detrend import simple as simpleDetrend
 from obspy.signal.headers import clibevresp
 import ctypes as C
+import hashlib
 import math as M
 import numpy as np
 import os
 import scipy.signal
+import tempfile
 import util
 import warnings
 
@@ -39,6 +42,90 @@ import warnings
 WOODANDERSON = {'poles': [-6.283 + 4.7124j, -6.283 - 4.7124j],
                 'zeros': [0 + 0j], 'gain': 1.0, 'sensitivity': 2080}
 
+#: Cache of frequency responses shared by :func:`evalresp` and
+#: :func:`pazToFreqResp` and therefore by all instrument corrections done via
+#: :func:`seisSim`. Inspect ``RESPONSE_CACHE.hits``,
+#: ``RESPONSE_CACHE.misses`` or ``RESPONSE_CACHE.info()`` for the cache
+#: statistics. Only a few responses are kept as a single response of an hour
+#: of 100 Hz data (nfft = 2 ** 20) already takes about 12.6 MB. Set
+#: ``RESPONSE_CACHE.maxsize = 0`` to disable the cache.
+RESPONSE_CACHE = LRUCache(maxsize=4)
+
+#: Directory in which frequency responses evaluated by :func:`evalresp` are
+#: additionally stored as NumPy ``.npz`` files to be reused by later
+#: sessions. Disabled if set to ``None``.
+RESPONSE_CACHE_DIR = None
+
+
+def _loadResponse(filename):
+    """
+    Returns frequency response and frequencies stored in given file or None.
+    """
+    if not os.path.isfile(filename):
+        return None
+    try:
+        npz = np.load(filename)
+        try:
+            return npz['h'], npz['f']
+        finally:
+            npz.close()
+    except Exception:
+        # broken or incomplete file - just evaluate response again
+        return None
+
+
+def _saveResponse(filename, h, f):
+    """
+    Stores frequency response and frequencies in given file.
+
+    The file is written under a temporary name first, so concurrent
+    processes never read incomplete files.
+    """
+    path = os.path.dirname(filename)
+    try:
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        fd, tmpfile = tempfile.mkstemp(suffix='.tmp', dir=path)
+        fh = os.fdopen(fd, 'wb')
+        try:
+            np.savez(fh, h=h, f=f)
+        finally:
+            fh.close()
+        try:
+            os.rename(tmpfile, filename)
+        except OSError:
+            # target already exists on Windows
+            os.remove(tmpfile)
+    except (IOError, OSError), e:
+        msg = "Could not store response in cache directory: %s" % e
+        warnings.warn(msg)
+
+
+def _getResponse(key, func, persistent=False):
+    """
+    Returns copies of frequency response and frequencies for given key.
+
+    The response is looked up in :data:`RESPONSE_CACHE` and, if persistent is
+    set, in :data:`RESPONSE_CACHE_DIR` before calling func.
+    """
+    value = RESPONSE_CACHE.get(key)
+    if value is None:
+        filename = None
+        if persistent and RESPONSE_CACHE_DIR:
+            filename = os.path.join(RESPONSE_CACHE_DIR,
+                                    hashlib.md5(repr(key)).hexdigest() +
+                                    '.npz')
+            value = _loadResponse(filename)
+        if value is None:
+            value = func()
+            if filename:
+                _saveResponse(filename, *value)
+        for array in value:
+            array.flags.writeable = False
+        RESPONSE_CACHE[key] = value
+    # callers (e.g. specInv) are allowed to modify the returned arrays
+    return value[0].copy(), value[1].copy()
+
 
 def cosTaper(npts, p=0.1, freqs=None, flimit=None, halfcosine=True,
              sactaper=False):
@@ -185,9 +272,34 @@ def evalresp(t_samp, nfft, filename, date, station='*', channel='*',
     :param debug: Verbose output to stdout. Disabled by default.
     :rtype: numpy.ndarray complex128
     :return: Frequency response from SEED RESP-file of length nfft
+
+    Evaluated responses are kept in :data:`RESPONSE_CACHE` and, if set, in
+    :data:`RESPONSE_CACHE_DIR`, keyed by the content of the RESP file, the
+    requested channel, day, units, sampling interval and nfft.
     """
-    # evalresp needs files with correct line separators depending on OS
     data = open(filename, 'rb').read()
+    if debug:
+        h, f = _evalresp(t_samp, nfft, data, date, station, channel, network,
+                         locid, units, debug)
+    else:
+        key = ('evalresp', hashlib.md5(data).hexdigest(), date.year,
+               date.julday, station, channel, network, locid, units,
+               float(t_samp), int(nfft))
+        h, f = _getResponse(key, lambda: _evalresp(t_samp, nfft, data, date,
+                                                   station, channel, network,
+                                                   locid, units, debug),
+                            persistent=True)
+    if freq:
+        return h, f
+    return h
+
+
+def _evalresp(t_samp, nfft, data, date, station, channel, network, locid,
+              units, debug):
+    """
+    Evaluates response of given RESP file content, see :func:`evalresp`.
+    """
+    # evalresp needs files with correct line separators depending on OS
     fh = NamedTemporaryFile()
     tempfile = fh.name
     fh.write(os.linesep.join(data.splitlines()))
@@ -230,9 +342,7 @@ def evalresp(t_samp, nfft, filename, date, station='*', channel='*',
         os.remove(tempfile)
     except:
         pass
-    if freq:
-        return h, f
-    return h
+    return h, f
 
 
 def cornFreq2Paz(fc, damp=0.707):
@@ -268,6 +378,8 @@ def pazToFreqResp(poles, zeros, scale_fac, t_samp, nfft, freq=False):
     :rtype: numpy.ndarray complex128
     :return: Frequency response of PAZ of length nfft
 
+    Computed responses are kept in :data:`RESPONSE_CACHE`.
+
     .. note::
         In order to plot/calculate the phase you need to multiply the
         complex part by -1. This results from the different definition of
@@ -280,6 +392,25 @@ def pazToFreqResp(poles, zeros, scale_fac, t_samp, nfft, freq=False):
         negative values in order to get a plot from [0, 2pi]:
         where(phi<0,phi+2*pi,phi); plot(f,phi)
     """
+    try:
+        key = ('paz', tuple(complex(p) for p in poles),
+               tuple(complex(z) for z in zeros), float(scale_fac),
+               float(t_samp), int(nfft))
+    except TypeError:
+        h, f = _pazToFreqResp(poles, zeros, scale_fac, t_samp, nfft)
+    else:
+        h, f = _getResponse(key, lambda: _pazToFreqResp(poles, zeros,
+                                                        scale_fac, t_samp,
+                                                        nfft))
+    if freq:
+        return h, f
+    return h
+
+
+def _pazToFreqResp(poles, zeros, scale_fac, t_samp, nfft):
+    """
+    Computes frequency response of PAZ, see :func:`pazToFreqResp`.
+    """
     n = nfft // 2
     b, a = scipy.signal.ltisys.zpk2tf(zeros, poles, scale_fac)
     # a has to be a list for the scipy.signal.freqs() call later but zpk2tf()
@@ -290,9 +421,7 @@ def pazToFreqResp(poles, zeros, scale_fac, t_samp, nfft, freq=False):
     # start at zero to get zero for offset / DC of fft
     f = np.linspace(0, fy, n + 1)
     _w, h = scipy.signal.freqs(b, a, f * 2 * np.pi)
-    if freq:
-        return h, f
-    return h
+    return h, f
 
 
 def waterlevel(spec, wlev):
@@ -418,6 +547,8 @@ def seisSim(data, samp_rate, paz_remove=None, paz_simulate=None,
     thereby avoids artefacts due to amplification of frequencies outside of the
     instrument's passband (for a detailed discussion see
     *Of Poles and Zeros*, F. Scherbaum, Kluwer Academic Publishers).
+    Frequency responses are reused for traces of the same length and sampling
+    rate, see :data:`RESPONSE_CACHE` and :data:`RESPONSE_CACHE_DIR`.
 
     .. versionchanged:: 0.5.1
         The default for `remove_sensitivity` and `simulate_sensitivity` has
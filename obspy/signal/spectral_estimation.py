@@ -292,7 +292,8 @@ class PPSD():
         * Providing an `obspy.xseed` :class:`~obspy.xseed.parser.Parser`,
           e.g. containing metadata from a Dataless SEED file. This is the safer
           way but it might a bit slower because for every processed time
-          segment the response information is extracted from the parser.
+          segment the response information is extracted from the parser
+          (unless the parser was created with a ``cache_size``).
         * Providing a dictionary containing poles and zeros information. Be
           aware that this leads to wrong results if the instrument's response
           is changing with data added to the PPSD. Use with caution!
@@ -5,7 +5,9 @@ The Filter test suite.
 """
 
 from obspy.signal import bandpass, lowpass, highpass
-from obspy.signal.filter import envelope, lowpassCheby2
+from obspy.signal.filter import envelope, lowpassCheby2, remezFIR, \
+    FILTER_CACHE, FFT_ENGINE_TOLERANCE, _impulseResponse, _butterworth
+from obspy import read
 import os
 import unittest
 import gzip
@@ -248,6 +250,81 @@ class FilterTestCase(unittest.TestCase):
         # be 0 (1dB ripple) before filter ramp
         self.assertTrue(h_db[freq < 25].min() > -1)
 
+    def test_filterCache(self):
+        """
+        Designed filters are cached and reused.
+        """
+        data = np.random.randn(1000)
+        FILTER_CACHE.clear()
+        data1 = bandpass(data, 1.0, 10.0, df=100.0, zerophase=True)
+        self.assertEquals((FILTER_CACHE.hits, FILTER_CACHE.misses), (0, 1))
+        data2 = bandpass(data, 1.0, 10.0, df=100.0, zerophase=True)
+        self.assertEquals((FILTER_CACHE.hits, FILTER_CACHE.misses), (1, 1))
+        np.testing.assert_array_equal(data1, data2)
+        # other parameters result in a new design
+        lowpass(data, 10.0, df=100.0)
+        lowpass(data, 10.0, df=100.0, corners=2)
+        highpass(data, 10.0, df=100.0)
+        self.assertEquals((FILTER_CACHE.hits, FILTER_CACHE.misses), (1, 4))
+        # same normalized frequencies share a design
+        lowpass(data, 20.0, df=200.0)
+        self.assertEquals((FILTER_CACHE.hits, FILTER_CACHE.misses), (2, 4))
+        # other filter types
+        lowpassCheby2(data, 10.0, df=100.0)
+        lowpassCheby2(data, 10.0, df=100.0)
+        remezFIR(data, 1.0, 10.0, df=100.0)
+        remezFIR(data, 1.0, 10.0, df=100.0)
+        self.assertEquals((FILTER_CACHE.hits, FILTER_CACHE.misses), (4, 6))
+        # returned coefficients may be modified without harming the cache
+        b, a = lowpassCheby2(None, 10.0, df=100.0, ba=True)
+        b[:] = 0
+        b2, _ = lowpassCheby2(None, 10.0, df=100.0, ba=True)
+        self.assertTrue(np.any(b2 != 0))
+        # filter methods of Trace and Stream use the cache as well
+        FILTER_CACHE.clear()
+        st = read()
+        st.filter('bandpass', freqmin=1.0, freqmax=10.0)
+        st[0].filter('bandpass', freqmin=1.0, freqmax=10.0)
+        self.assertEquals((FILTER_CACHE.hits, FILTER_CACHE.misses), (1, 1))
+
+    def test_fftEngine(self):
+        """
+        Filtering via overlap-save must match the direct filter within the
+        documented tolerance.
+        """
+        np.random.seed(815)
+        data = np.random.randn(2, 100000)
+        for func, options in [(bandpass, {'freqmin': 0.5, 'freqmax': 10.0}),
+                              (lowpass, {'freq': 5.0, 'corners': 8}),
+                              (highpass, {'freq': 0.1})]:
+            for zerophase in [False, True]:
+                direct = func(data, df=100.0, zerophase=zerophase, **options)
+                fft = func(data, df=100.0, zerophase=zerophase, engine='fft',
+                           **options)
+                self.assertEquals(fft.shape, direct.shape)
+                np.testing.assert_allclose(fft, direct, rtol=0,
+                                           atol=1e-8 * abs(data).max())
+        # FIR filter returns the full convolution
+        direct = remezFIR(data[0], 1.0, 10.0, df=100.0)
+        fft = remezFIR(data[0], 1.0, 10.0, df=100.0, engine='fft')
+        self.assertEquals(len(fft), len(direct))
+        np.testing.assert_allclose(fft, direct, rtol=0, atol=1e-10)
+        # truncation of impulse response
+        h = _impulseResponse(_butterworth(4, [0.01, 0.1], 'band'))
+        self.assertTrue(abs(h).sum() * FFT_ENGINE_TOLERANCE > abs(h[-1]))
+        # via Trace.filter
+        tr = read()[0]
+        tr2 = tr.copy()
+        tr.filter('bandpass', freqmin=1.0, freqmax=10.0, zerophase=True)
+        tr2.filter('bandpass', freqmin=1.0, freqmax=10.0, zerophase=True,
+                   engine='fft')
+        np.testing.assert_allclose(tr2.data, tr.data, rtol=0,
+                                   atol=1e-8 * abs(tr.data).max())
+        self.assertRaises(ValueError, bandpass, data, 1.0, 10.0, 100.0,
+                          engine='xxx')
+        self.assertRaises(ValueError, remezFIR, data[0], 1.0, 10.0, 100.0,
+                          engine='xxx')
+
 
 def suite():
     return unittest.makeSuite(FilterTestCase, 'test')
@@ -7,11 +7,14 @@ The InvSim test suite.
 from obspy import Trace, UTCDateTime, read
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.sac import attach_paz
+from obspy.signal import invsim
 from obspy.signal.invsim import seisSim, estimateMagnitude, evalresp
-from obspy.signal.invsim import cosTaper
+from obspy.signal.invsim import cosTaper, pazToFreqResp, RESPONSE_CACHE
 import gzip
 import numpy as np
 import os
+import shutil
+import tempfile
 import unittest
 
 # Seismometers defined as in Pitsa with one zero less. The corrected
@@ -343,6 +346,108 @@ class InvSimTestCase(unittest.TestCase):
         self.assertEquals(len(f), nfft // 2 + 1)
         os.unlink(tmpfile)
 
+    def test_responseCache(self):
+        """
+        Frequency responses are evaluated once per channel, day, units,
+        sampling interval and nfft and may be modified by the caller.
+        """
+        respf = os.path.join(self.path, 'RESP.NZ.CRLZ.10.HHZ')
+        dt = UTCDateTime(2003, 11, 1, 0, 0, 0)
+        RESPONSE_CACHE.clear()
+        h1, f1 = evalresp(0.01, 256, respf, dt, freq=True)
+        misses = RESPONSE_CACHE.misses
+        hits = RESPONSE_CACHE.hits
+        h2, f2 = evalresp(0.01, 256, respf, dt + 3600, freq=True)
+        self.assertEqual(RESPONSE_CACHE.misses, misses)
+        self.assertEqual(RESPONSE_CACHE.hits, hits + 1)
+        np.testing.assert_array_equal(h1, h2)
+        np.testing.assert_array_equal(f1, f2)
+        # returned arrays are copies
+        self.assertTrue(h1.flags.writeable)
+        h1[:] = 0
+        np.testing.assert_array_equal(evalresp(0.01, 256, respf, dt), h2)
+        # different parameters are evaluated separately
+        h3 = evalresp(0.01, 256, respf, dt, units='DIS')
+        h4 = evalresp(0.01, 128, respf, dt)
+        self.assertEqual(RESPONSE_CACHE.misses, misses + 2)
+        self.assertFalse(np.allclose(h3, h2))
+        self.assertEqual(len(h4), 65)
+        # poles and zeros
+        paz = PAZ_WOOD_ANDERSON
+        h1, f1 = pazToFreqResp(paz['poles'], paz['zeros'], paz['gain'], 0.01,
+                               256, freq=True)
+        hits = RESPONSE_CACHE.hits
+        h2 = pazToFreqResp(paz['poles'], paz['zeros'], paz['gain'], 0.01, 256)
+        self.assertEqual(RESPONSE_CACHE.hits, hits + 1)
+        np.testing.assert_array_equal(h1, h2)
+        self.assertEqual(len(f1), 129)
+        # simulation gives same results with and without cached responses
+        data = np.random.RandomState(815).randn(1000)
+        RESPONSE_CACHE.clear()
+        expected = seisSim(data, 200.0, paz_remove=PAZ_WWSSN_SP,
+                           paz_simulate=paz)
+        seedresp = {'filename': respf, 'date': dt, 'units': 'VEL'}
+        expected2 = seisSim(data, 200.0, seedresp=seedresp)
+        hits = RESPONSE_CACHE.hits
+        np.testing.assert_array_equal(
+            seisSim(data, 200.0, paz_remove=PAZ_WWSSN_SP, paz_simulate=paz),
+            expected)
+        np.testing.assert_array_equal(seisSim(data, 200.0, seedresp=seedresp),
+                                      expected2)
+        self.assertEqual(RESPONSE_CACHE.hits, hits + 3)
+        # a maxsize of zero disables the cache
+        maxsize = RESPONSE_CACHE.maxsize
+        try:
+            RESPONSE_CACHE.maxsize = 0
+            RESPONSE_CACHE.clear()
+            evalresp(0.01, 256, respf, dt)
+            self.assertEqual(len(RESPONSE_CACHE), 0)
+        finally:
+            RESPONSE_CACHE.maxsize = maxsize
+
+    def test_responseCacheDir(self):
+        """
+        Responses of evalresp are stored in and loaded from a directory.
+        """
+        respf = os.path.join(self.path, 'RESP.NZ.CRLZ.10.HHZ')
+        dt = UTCDateTime(2003, 11, 1, 0, 0, 0)
+        tempdir = tempfile.mkdtemp()
+        cache_dir = os.path.join(tempdir, 'responses')
+        try:
+            invsim.RESPONSE_CACHE_DIR = cache_dir
+            RESPONSE_CACHE.clear()
+            h1, f1 = evalresp(0.01, 256, respf, dt, freq=True)
+            files = os.listdir(cache_dir)
+            self.assertEqual(len(files), 1)
+            self.assertTrue(files[0].endswith('.npz'))
+            # read from file if not in memory
+            RESPONSE_CACHE.clear()
+            filename = os.path.join(cache_dir, files[0])
+            npz = np.load(filename)
+            h, f = npz['h'], npz['f']
+            npz.close()
+            h[:] = 1.0
+            np.savez(filename, h=h, f=f)
+            h2, f2 = evalresp(0.01, 256, respf, dt, freq=True)
+            np.testing.assert_array_equal(h2, 1.0)
+            np.testing.assert_array_equal(f1, f2)
+            # broken files are replaced
+            RESPONSE_CACHE.clear()
+            open(filename, 'wb').write('xyz')
+            h3 = evalresp(0.01, 256, respf, dt)
+            np.testing.assert_array_equal(h1, h3)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            RESPONSE_CACHE.clear()
+            np.testing.assert_array_equal(evalresp(0.01, 256, respf, dt), h1)
+            # poles and zeros are kept in memory only
+            paz = PAZ_WOOD_ANDERSON
+            pazToFreqResp(paz['poles'], paz['zeros'], paz['gain'], 0.01, 256)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+        finally:
+            invsim.RESPONSE_CACHE_DIR = None
+            RESPONSE_CACHE.clear()
+            shutil.rmtree(tempdir)
+
 
 def suite():
     return unittest.makeSuite(InvSimTestCase, 'test')
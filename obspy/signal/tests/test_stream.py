@@ -114,6 +114,35 @@ class StreamTestCase(unittest.TestCase):
             np.testing.assert_array_equal(tr.data, st_bkp[i].data)
             self.assertEqual(tr.stats, st_bkp[i].stats)
 
+    def test_filterBatched(self):
+        """
+        Traces sharing sampling rate and length are filtered in one go, which
+        must give the same results as filtering each trace separately.
+        """
+        st = read() + read()
+        st[1].data = st[1].data.astype('int32')
+        st[4].data = st[4].data[:-10]
+        st[5].stats.sampling_rate = 50.0
+        st += read()[:1]
+        st[6].data = np.ma.masked_array(st[6].data)
+        st[6].data.mask = np.zeros(len(st[6].data), dtype='bool')
+        for filt_type, filt_ops in [['bandpass', {'freqmin': 1.,
+                                                  'freqmax': 20.}],
+                                    ['lowpass', {'freq': 10.,
+                                                 'zerophase': True}]]:
+            st1 = st.copy()
+            st1.filter(filt_type, **filt_ops)
+            st2 = st.copy()
+            for tr in st2:
+                tr.filter(filt_type, **filt_ops)
+            for tr1, tr2 in zip(st1, st2):
+                np.testing.assert_array_equal(tr1.data, tr2.data)
+                self.assertEqual(tr1.data.dtype, tr2.data.dtype)
+                self.assertEqual(tr1.stats, tr2.stats)
+            # traces 0, 1, 2 and 3 are filtered within one block
+            self.assertTrue(st1[0].data.base is not None)
+            self.assertTrue(st1[0].data.base is st1[3].data.base)
+
     def test_simulate(self):
         """
         Tests if calling simulate of stream gives the same result as calling
@@ -32,6 +32,8 @@ class Blockette(object):
         Integer(1, "Blockette type", 3),
         Integer(2, "Length of blockette", 4, optional=True)
     ]
+    # fields may be parsed on first access, see parseSEEDLazy()
+    lazy_parsing = True
 
     def __init__(self, **kwargs):
         self.debug = kwargs.get('debug', False)
@@ -49,10 +51,22 @@ class Blockette(object):
         self.xseed_version = kwargs.get('xseed_version', DEFAULT_XSEED_VERSION)
         self.seed_version = kwargs.get('version', 2.4)
 
+    def __getattr__(self, name):
+        """
+        Parses the fields of a lazily read blockette on first access of a
+        missing attribute.
+        """
+        if name.startswith('__') or '_lazy_seed' not in self.__dict__:
+            raise AttributeError("'%s' object has no attribute '%s'" %
+                                 (self.__class__.__name__, name))
+        self._parseLazySEED()
+        return getattr(self, name)
+
     def __str__(self):
         """
         Pretty prints the informations stored in the blockette.
         """
+        self._parseLazySEED()
         temp = 'Blockette %s: %s Blockette' % (self.blockette_id,
                     utils.toString(self.blockette_name)) + os.linesep
         keys = self.__dict__.keys()
@@ -127,6 +141,40 @@ class Blockette(object):
         else:
             warnings.warn(msg, category=Warning)
 
+    def parseSEEDLazy(self, data, offset, expected_length):
+        """
+        Defers parsing of the blockette fields until the first field is
+        accessed.
+
+        Only the position of the blockette within the SEED string is stored.
+        Blockettes with lazy_parsing disabled are parsed immediately.
+
+        :type data: str
+        :param data: SEED string containing the blockette.
+        :type offset: int
+        :param offset: Position of the blockette within data.
+        :type expected_length: int
+        :param expected_length: Length of the blockette.
+        """
+        if not self.lazy_parsing:
+            fh = StringIO(data)
+            fh.seek(offset)
+            self.parseSEED(fh, expected_length)
+            return
+        self._lazy_seed = (data, offset, expected_length)
+
+    def _parseLazySEED(self):
+        """
+        Parses the fields of a lazily read blockette, if not done yet.
+        """
+        lazy_seed = self.__dict__.pop('_lazy_seed', None)
+        if lazy_seed is None:
+            return
+        data, offset, expected_length = lazy_seed
+        fh = StringIO(data)
+        fh.seek(offset)
+        self.parseSEED(fh, expected_length)
+
     def getSEED(self):
         """
         Converts the blockette to a valid SEED string and returns it.
@@ -62,6 +62,9 @@ class Blockette060(Blockette):
         ]),
     ]
 
+    # stages are initialized on creation and can not be parsed on access
+    lazy_parsing = False
+
     def parseSEED(self, data, length=0, *args, **kwargs):
         """
         Read Blockette 60.
@@ -13,7 +13,9 @@ from StringIO import StringIO
 from lxml.etree import Element, SubElement, tostring, parse as xmlparse
 from obspy.xseed import DEFAULT_XSEED_VERSION, utils, blockette
 from obspy.xseed.utils import SEEDParserException
-from obspy.core.util import getExampleFile, deprecated_keywords
+from obspy.core.util import getExampleFile, deprecated_keywords, LRUCache
+from obspy.core.utcdatetime import UTCDateTime
+import bisect
 import math
 import os
 import warnings
@@ -63,7 +65,7 @@ class Parser(object):
     """
 
     def __init__(self, data=None, debug=False, strict=False,
-                 compact=False):
+                 compact=False, cache_size=0, lazy=False):
         """
         Initializes the SEED parser.
 
@@ -77,6 +79,17 @@ class Parser(object):
         :param compact: SEED volume will contain compact data strings. Missing
             time strings will be filled with 00:00:00.0000 if this option is
             disabled.
+        :type cache_size: int
+        :param cache_size: Maximal number of responses extracted by
+            :meth:`getPAZ`, :meth:`getCoordinates` and :meth:`getRESP` which
+            are cached. Defaults to ``0``, i.e. responses are not cached. If
+            enabled, :meth:`clearCache` has to be called after changing
+            blockettes.
+        :type lazy: Boolean.
+        :param lazy: Only the type and position of the blockettes of station
+            control headers of a SEED volume are read, the fields of each
+            blockette are parsed on first access. Speeds up reading large
+            volumes if only a few channels are needed.
         """
         self.record_length = 4096
         self.version = 2.4
@@ -84,12 +97,17 @@ class Parser(object):
         self.debug = debug
         self.strict = strict
         self.compact = compact
+        self.lazy = lazy
         self._format = None
         # All parsed data is organized in volume, abbreviations and a list of
         # stations.
         self.volume = None
         self.abbreviations = None
         self.stations = []
+        # index of channel epochs, built on first lookup by _select()
+        self._index = None
+        # extracted responses by channel epoch
+        self._cache = LRUCache(maxsize=cache_size)
         # if a file name is given, read it directly to the parser object
         if data:
             self.read(data)
@@ -252,7 +270,7 @@ class Parser(object):
         """
         result = self.getXSEED(*args, **kwargs)
         if isinstance(result, basestring):
-            open(filename, 'w').write(result)
+            utils.writeAtomically(filename, result, 'w')
             return
         elif isinstance(result, dict):
             for key, value in result.iteritems():
@@ -263,7 +281,7 @@ class Parser(object):
                 else:
                     # current meta data - leave original filename
                     fn = filename
-                open(fn, 'w').write(value)
+                utils.writeAtomically(fn, value, 'w')
             return
         else:
             raise TypeError
@@ -306,25 +324,49 @@ class Parser(object):
         """
         Writes a dataless SEED file with given name.
         """
-        fh = open(filename, 'wb')
-        fh.write(self.getSEED(*args, **kwargs))
-        fh.close()
+        utils.writeAtomically(filename, self.getSEED(*args, **kwargs))
 
-    def getRESP(self):
+    def getRESP(self, stations=None):
         """
         Returns a RESP representation of the current Parser object.
 
         It aims to produce the same RESP files as when running rdseed with
         the command: "rdseed -f seed.test -R".
+
+        :type stations: list of int, optional
+        :param stations: Indices of the stations in the ``stations`` attribute
+            the RESP representation is restricted to. Defaults to all
+            stations.
         """
         # Check if there are any stations at all.
         if len(self.stations) == 0:
             raise Exception('No data to be written.')
+        if stations is not None:
+            stations = tuple(stations)
+        resp_list = self._cache.get(('resp', stations))
+        if resp_list is None:
+            resp_list = [(filename, resp.getvalue())
+                         for filename, resp in self._getRESPList(stations)]
+            self._cache[('resp', stations)] = resp_list
+        new_resp_list = []
+        for filename, value in resp_list:
+            resp = StringIO(value)
+            resp.seek(0, 2)
+            new_resp_list.append([filename, resp])
+        return new_resp_list
+
+    def _getRESPList(self, stations=None):
+        """
+        Creates list of RESP file names and file like objects of all
+        channels of given station indices.
+        """
+        if stations is None:
+            stations = xrange(len(self.stations))
         filename = None
         # Channel Response list.
         resp_list = []
         # Loop over all stations.
-        for station in self.stations:
+        for station in [self.stations[_i] for _i in stations]:
             resp = StringIO('')
             blockettes = []
             # Read the current station information and store it.
@@ -379,71 +421,115 @@ class Parser(object):
                 new_resp_list.append(channel_list[0])
         return new_resp_list
 
+    def _buildIndex(self):
+        """
+        Builds an index of all channel epochs by SEED id and by channel code.
+
+        Each entry holds start and end timestamp of a channel epoch restricted
+        to the epoch of its station, blockette 50 and the blockettes of the
+        channel starting with blockette 52. Entries of a key are sorted by
+        start time together with the running maximum of the end times, which
+        allows a binary search for a given datetime.
+        """
+        # parse blockettes if not SEED. Needed for XSEED to be initialized.
+        # Done only once for all following lookups.
+        if self._format != 'SEED':
+            old_format = self._format
+            self.__init__(self.getSEED(), debug=self.debug,
+                          strict=self.strict, compact=self.compact,
+                          cache_size=self._cache.maxsize, lazy=self.lazy)
+            if old_format == "XSEED":
+                self._format = "XSEED"
+        epochs = {}
+        for station in self.stations:
+            b50 = None
+            for i, blk in enumerate(station):
+                if blk.id == 50:
+                    b50 = blk
+                elif blk.id == 52 and b50 is not None:
+                    # blockettes of a channel end with next blockette 50 or 52
+                    j = i + 1
+                    while j < len(station) and station[j].id not in (50, 52):
+                        j += 1
+                    start = max(self._getTimestamp(b50.start_effective_date),
+                                self._getTimestamp(blk.start_date))
+                    end = min(self._getTimestamp(b50.end_effective_date, 1),
+                              self._getTimestamp(blk.end_date, 1))
+                    key = (b50.network_code, b50.station_call_letters,
+                           blk.location_identifier, blk.channel_identifier)
+                    entry = (start, end, '.'.join(key), b50, station[i:j])
+                    epochs.setdefault(key, []).append(entry)
+                    epochs.setdefault(blk.channel_identifier, []).append(entry)
+        self._index = {}
+        for key, entries in epochs.iteritems():
+            entries.sort(key=lambda x: x[0])
+            max_ends = []
+            max_end = -float('inf')
+            for entry in entries:
+                max_end = max(max_end, entry[1])
+                max_ends.append(max_end)
+            self._index[key] = ([x[0] for x in entries], max_ends, entries)
+
+    def _getTimestamp(self, datetime, default=-1):
+        """
+        Returns timestamp of given date or -inf/+inf for a missing date.
+        """
+        if not datetime:
+            return default * float('inf')
+        return UTCDateTime(datetime).timestamp
+
+    def clearCache(self):
+        """
+        Clears all cached responses and the index of channel epochs.
+
+        Needs to be called if blockettes of the parser are changed manually,
+        the cache is cleared automatically when reading data.
+        """
+        self._index = None
+        self._cache.clear()
+
     def _select(self, seed_id, datetime=None):
         """
         Selects all blockettes related to given SEED id and datetime.
         """
-        old_format = self._format
-        # parse blockettes if not SEED. Needed foe XSEED to be intialized.
-        # XXX: Should potentially be fixed at some point.
-        if self._format != 'SEED':
-            self.__init__(self.getSEED())
-        if old_format == "XSEED":
-            self._format = "XSEED"
+        _start, _end, _id, b50, blockettes = \
+            self._selectEpoch(seed_id, datetime)
+        return [b50] + blockettes
+
+    def _selectEpoch(self, seed_id, datetime=None):
+        """
+        Selects index entry of the channel epoch of given SEED id and datetime.
+        """
+        if self._index is None:
+            self._buildIndex()
         # split id
         if '.' in seed_id:
             net, sta, loc, cha = seed_id.split('.')
+            key = (net, sta, loc, cha)
         else:
-            cha = seed_id
-            net = sta = loc = None
-        # create a copy of station list
-        stations = list(self.stations)
-        # filter blockettes list by given SEED id
-        station_flag = False
-        channel_flag = False
-        blockettes = []
-        for station in stations:
-            for blk in station:
-                if blk.id == 50:
-                    station_flag = False
-                    if net is not None and blk.network_code != net:
-                        continue
-                    if sta is not None and blk.station_call_letters != sta:
-                        continue
-                    if datetime is not None:
-                        if blk.start_effective_date > datetime:
-                            continue
-                        if blk.end_effective_date and \
-                           blk.end_effective_date < datetime:
-                            continue
-                    station_flag = True
-                    tmpb50 = blk
-                elif blk.id == 52 and station_flag:
-                    channel_flag = False
-                    if loc is not None and blk.location_identifier != loc:
-                        continue
-                    if blk.channel_identifier != cha:
-                        continue
-                    if datetime is not None:
-                        if blk.start_date > datetime:
-                            continue
-                        if blk.end_date and blk.end_date < datetime:
-                            continue
-                    channel_flag = True
-                    blockettes.append(tmpb50)
-                    blockettes.append(blk)
-                elif channel_flag and station_flag:
-                    blockettes.append(blk)
-        # check number of selected channels (equals number of blockette 52)
-        b50s = [b for b in blockettes if b.id == 50]
-        b52s = [b for b in blockettes if b.id == 52]
-        if len(b50s) == 0 or len(b52s) == 0:
+            key = seed_id
+        # find all channel epochs containing given datetime
+        matches = []
+        starts, max_ends, entries = self._index.get(key, ([], [], []))
+        if datetime is None:
+            matches = entries
+        else:
+            timestamp = UTCDateTime(datetime).timestamp
+            i = bisect.bisect_right(starts, timestamp) - 1
+            # epochs starting earlier may only match while the maximum of
+            # their end times is not before given datetime
+            while i >= 0 and max_ends[i] >= timestamp:
+                if entries[i][1] >= timestamp:
+                    matches.append(entries[i])
+                i -= 1
+        # check number of selected channels
+        if len(matches) == 0:
             msg = 'No channel found with the given SEED id: %s'
             raise SEEDParserException(msg % (seed_id))
-        elif len(b50s) > 1 or len(b52s) > 1:
+        elif len(matches) > 1:
             msg = 'More than one channel found with the given SEED id: %s'
             raise SEEDParserException(msg % (seed_id))
-        return blockettes
+        return matches[0]
 
     @deprecated_keywords({'channel_id': 'seed_id'})
     def getPAZ(self, seed_id, datetime=None):
@@ -465,7 +551,53 @@ class Parser(object):
             sensitivity, the gain in the dictionary is the A0 normalization
             constant
         """
-        blockettes = self._select(seed_id, datetime)
+        epoch = self._selectEpoch(seed_id, datetime)
+        data, messages = self._getCached('paz', epoch, self._extractPAZ)
+        for msg in messages:
+            warnings.warn(msg, UserWarning)
+        return copy.deepcopy(data)
+
+    def getPAZBulk(self, requests):
+        """
+        Return PAZ of multiple channels.
+
+        All channel epochs are indexed in a single pass over the volume on
+        the first lookup, the PAZ of each epoch is extracted only once.
+
+        :type requests: list
+        :param requests: List of SEED or channel ids or of tuples of SEED or
+            channel id and datetime, e.g.
+            ``[("BW.RJOB..EHZ", UTCDateTime(2010, 1, 1)), "BW.RJOB..EHN"]``.
+        :return: List of dictionaries containing PAZ in order of given
+            requests, see :meth:`getPAZ`.
+        """
+        results = []
+        for request in requests:
+            if isinstance(request, basestring):
+                request = (request,)
+            results.append(self.getPAZ(*request))
+        return results
+
+    def _getCached(self, kind, epoch, func):
+        """
+        Returns result of func for the blockettes of given channel epoch,
+        cached by kind of result and channel epoch.
+        """
+        start, end, seed_id, b50, blockettes = epoch
+        key = (kind, seed_id, start, end)
+        result = self._cache.get(key)
+        if result is None:
+            result = func([b50] + blockettes)
+            self._cache[key] = result
+        return result
+
+    def _extractPAZ(self, blockettes):
+        """
+        Extracts PAZ from given blockettes of a channel.
+
+        Returns dictionary containing PAZ and list of warning messages.
+        """
+        messages = []
         data = {}
         for blockette in blockettes:
             if blockette.id == 58:
@@ -494,7 +626,7 @@ class Parser(object):
                 if getattr(resp, label) != "A":
                     msg = 'Only supporting Laplace transform response ' + \
                           'type. Skipping other response information.'
-                    warnings.warn(msg, UserWarning)
+                    messages.append(msg)
                     continue
                 # A0_normalization_factor
                 data['gain'] = resp.A0_normalization_factor
@@ -514,7 +646,7 @@ class Parser(object):
                     except TypeError:
                         z = complex(resp.real_zero, resp.imaginary_zero)
                     data['zeros'].append(z)
-        return data
+        return data, messages
 
     @deprecated_keywords({'channel_id': 'seed_id'})
     def getCoordinates(self, seed_id, datetime=None):
@@ -529,7 +661,14 @@ class Parser(object):
         :return: Dictionary containing Coordinates (latitude, longitude,
             elevation)
         """
-        blockettes = self._select(seed_id, datetime)
+        epoch = self._selectEpoch(seed_id, datetime)
+        return dict(self._getCached('coordinates', epoch,
+                                    self._extractCoordinates))
+
+    def _extractCoordinates(self, blockettes):
+        """
+        Extracts coordinates from given blockettes of a channel.
+        """
         data = {}
         for blockette in blockettes:
             if blockette.id == 52:
@@ -540,15 +679,20 @@ class Parser(object):
                 break
         return data
 
-    def writeRESP(self, folder, zipped=False):
+    def writeRESP(self, folder, zipped=False, stations=None):
         """
         Writes for each channel a RESP file within a given folder.
 
+        Each file is written to a temporary file first and renamed afterwards,
+        so no incomplete files are left behind.
+
         :param folder: Folder name.
         :param zipped: Compresses all files into a single ZIP archive named by
             the folder name extended with the extension '.zip'.
+        :param stations: Indices of the stations to write, see
+            :meth:`getRESP`.
         """
-        new_resp_list = self.getRESP()
+        new_resp_list = self.getRESP(stations=stations)
         # Check if channel information could be found.
         if len(new_resp_list) == 0:
             msg = ("No channel information could be found. The SEED file "
@@ -558,19 +702,18 @@ class Parser(object):
             # Write single files.
             for response in new_resp_list:
                 if folder:
-                    file = open(os.path.join(folder, response[0]), 'w')
+                    filename = os.path.join(folder, response[0])
                 else:
-                    file = open(response[0], 'w')
-                response[1].seek(0, 0)
-                file.write(response[1].read())
-                file.close()
+                    filename = response[0]
+                utils.writeAtomically(filename, response[1].getvalue(), 'w')
         else:
             # Create a ZIP archive.
-            zip_file = zipfile.ZipFile(folder + os.extsep + "zip", "w")
+            fh = StringIO()
+            zip_file = zipfile.ZipFile(fh, "w")
             for response in new_resp_list:
-                response[1].seek(0, 0)
-                zip_file.writestr(response[0], response[1].read())
+                zip_file.writestr(response[0], response[1].getvalue())
             zip_file.close()
+            utils.writeAtomically(folder + os.extsep + "zip", fh.getvalue())
 
     def _parseSEED(self, data):
         """
@@ -954,6 +1097,8 @@ class Parser(object):
 
         # Also make the version of the format 2.4.
         self.volume[0].version_of_format = 2.4
+        # stations changed, index of channels must be rebuilt
+        self.clearCache()
 
     def _updateTemporaryStations(self, blkt_id, index_nr):
         """
@@ -989,6 +1134,7 @@ class Parser(object):
         if not data:
             return
         # Create StringIO for easier access.
+        raw_data = data
         data = StringIO(data)
         # Do not do anything if no data is passed or if a time series header
         # is passed.
@@ -1038,7 +1184,13 @@ class Parser(object):
                                                 compact=self.compact,
                                                 version=self.version,
                                                 record_type=record_type)
-                blockette_obj.parseSEED(data, blockette_length)
+                if self.lazy and record_type == 'S':
+                    # fields are parsed on first access
+                    blockette_obj.parseSEEDLazy(raw_data, data.tell(),
+                                                blockette_length)
+                    data.seek(blockette_length, 1)
+                else:
+                    blockette_obj.parseSEED(data, blockette_length)
                 root_attribute.append(blockette_obj)
                 self.blockettes.setdefault(blockette_id,
                                            []).append(blockette_obj)
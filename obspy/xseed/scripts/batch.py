@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for converting many Dataless SEED files with a pool of worker
+processes.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+
+from glob import glob
+import multiprocessing
+import os
+import sys
+
+
+def findDatalessFiles(filename, verbose=False):
+    """
+    Returns all Dataless SEED files matching given file names, glob patterns
+    or directories.
+    """
+    if not isinstance(filename, list):
+        filename = [filename]
+    files = []
+    for item in filename:
+        if os.path.isdir(item):
+            files.extend(sorted(glob(os.path.join(item, '*'))))
+        else:
+            files.extend(glob(item))
+    if verbose:
+        msg = 'Found %s files.' % len(files) + os.linesep
+        sys.stdout.write(msg)
+    dataless = []
+    for file in files:
+        if not os.path.isfile(file):
+            continue
+        f = open(file, 'rb')
+        if f.read(7)[6:] != 'V':
+            if verbose:
+                msg = 'Skipping file %s' % file
+                msg += '\t-- not a Dataless SEED file' + os.linesep
+                sys.stdout.write(msg)
+            f.close()
+            continue
+        f.close()
+        dataless.append(file)
+    return dataless
+
+
+def runJobs(func, jobs, workers=1):
+    """
+    Calls func for each job, using a pool of worker processes if more than
+    one worker is requested.
+
+    Returns list of results in the order of the given jobs.
+    """
+    if workers > 1 and len(jobs) > 1:
+        pool = multiprocessing.Pool(processes=workers)
+        try:
+            return pool.map(func, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    return [func(job) for job in jobs]
+
+
+def writeSummary(results, seconds, verbose=True):
+    """
+    Writes processing time of each file and total time to stdout and the
+    errors of failed files to stderr.
+
+    :type results: list
+    :param results: List of tuples of file name, processing time in seconds
+        and error message or ``None``.
+    :type seconds: float
+    :param seconds: Total time in seconds.
+    """
+    failed = 0
+    for file, duration, error in results:
+        if error is not None:
+            failed += 1
+            msg = '\tError parsing file %s' % file + os.linesep
+            msg += '\t' + error + os.linesep
+            sys.stderr.write(msg)
+        elif verbose:
+            msg = '%s: %.3f s' % (file, duration) + os.linesep
+            sys.stdout.write(msg)
+    if verbose:
+        msg = 'Converted %d of %d files in %.3f s' % (
+            len(results) - failed, len(results), seconds)
+        sys.stdout.write(msg + os.linesep)
+    return failed
@@ -4,51 +4,91 @@
 A command-line program that converts Dataless SEED into RESP files.
 """
 
-from glob import glob
 from obspy.xseed.parser import Parser
+from obspy.xseed.scripts.batch import findDatalessFiles, runJobs, \
+    writeSummary
 from optparse import OptionParser
 import os
 import sys
+import time
+
+
+def _writeRESP(job):
+    """
+    Writes RESP files of given stations of a Dataless SEED file.
+
+    Returns tuple of file name, processing time in seconds and error message
+    or None.
+    """
+    file, stations, options = job
+    start = time.time()
+    try:
+        # with a subset of stations only the needed blockettes are parsed
+        parser = Parser(file, debug=options.debug,
+                        lazy=stations is not None)
+        if options.zipped:
+            folder = os.path.join(os.path.curdir, os.path.basename(file))
+            parser.writeRESP(folder=folder, zipped=True)
+        else:
+            parser.writeRESP(folder=os.path.curdir, zipped=False,
+                             stations=stations)
+    except Exception, e:
+        if options.debug and options.workers <= 1:
+            raise
+        return file, time.time() - start, str(e)
+    return file, time.time() - start, None
+
+
+def _splitStations(file, workers):
+    """
+    Splits the stations of a Dataless SEED file into at most the given
+    number of groups, keeping all entries of a station within one group as
+    they are written into the same RESP files.
+    """
+    parser = Parser(file, lazy=True)
+    ids = []
+    for station in parser.stations:
+        id = (station[0].network_code, station[0].station_call_letters)
+        if id not in ids:
+            ids.append(id)
+    if len(ids) < 2:
+        return [None]
+    groups = [[] for _i in xrange(min(workers, len(ids)))]
+    for i, station in enumerate(parser.stations):
+        id = (station[0].network_code, station[0].station_call_letters)
+        groups[ids.index(id) % len(groups)].append(i)
+    return groups
 
 
 def dataless2resp(filename, options):
-    if isinstance(filename, list):
-        files = []
-        for item in filename:
-            files.extend(glob(item))
-    else:
-        files = glob(filename)
-    if options.verbose:
-        msg = 'Found %s files.' % len(files) + os.linesep
-        sys.stdout.write(msg)
+    files = findDatalessFiles(filename, options.verbose)
+    workers = getattr(options, 'workers', 1)
+    options.workers = workers
+    start = time.time()
+    jobs = []
     for file in files:
-        if not os.path.isfile(file):
-            continue
-        f = open(file, 'rb')
-        if f.read(7)[6] != 'V':
-            if options.verbose:
-                msg = 'Skipping file %s' % file
-                msg += '\t-- not a Dataless SEED file' + os.linesep
-                sys.stdout.write(msg)
-            f.close()
-            continue
-        f.close()
         if options.verbose:
             msg = 'Parsing file %s' % file + os.linesep
             sys.stdout.write(msg)
-        try:
-            parser = Parser(file, debug=options.debug)
-            if options.zipped:
-                folder = os.path.join(os.path.curdir, os.path.basename(file))
-                parser.writeRESP(folder=folder, zipped=True)
-            else:
-                parser.writeRESP(folder=os.path.curdir, zipped=False)
-        except Exception, e:
-            if options.debug:
-                raise
-            msg = '\tError parsing file %s' % file + os.linesep
-            msg += '\t' + str(e) + os.linesep
-            sys.stderr.write(msg)
+        # channels of a single file are distributed as well unless all
+        # channels are packed into one ZIP archive
+        if workers > 1 and len(files) < workers and not options.zipped:
+            try:
+                groups = _splitStations(file, workers)
+            except Exception:
+                groups = [None]
+        else:
+            groups = [None]
+        jobs.extend((file, stations, options) for stations in groups)
+    results = runJobs(_writeRESP, jobs, workers)
+    # summarize results of all jobs of a file
+    summary = []
+    for file in files:
+        file_results = [r for r in results if r[0] == file]
+        errors = [r[2] for r in file_results if r[2] is not None]
+        summary.append((file, sum(r[1] for r in file_results),
+                        errors and '; '.join(errors) or None))
+    writeSummary(summary, time.time() - start, options.verbose)
 
 
 def main():
@@ -63,6 +103,10 @@ def main():
     parser.add_option("-z", "--zipped", default=False,
                       action="store_true", dest="zipped",
                       help="Pack files of one station into a ZIP archive.")
+    parser.add_option("-j", "--workers", dest="workers", default=1,
+                      type="int",
+                      help="number of worker processes converting files "
+                           "(and stations of a single file) in parallel")
     (options, args) = parser.parse_args()
     if len(args) == 0:
         parser.print_help()
@@ -4,20 +4,39 @@
 A command-line program that converts Dataless SEED into XML-SEED files.
 """
 
-from glob import glob
 from obspy.xseed.parser import Parser
+from obspy.xseed.scripts.batch import findDatalessFiles, runJobs, \
+    writeSummary
 from optparse import OptionParser
 import os
 import sys
+import time
+
+
+def _writeXSEED(job):
+    """
+    Converts a Dataless SEED file into XML-SEED.
+
+    Returns tuple of file name, processing time in seconds and error message
+    or None.
+    """
+    file, output, options = job
+    start = time.time()
+    try:
+        parser = Parser(file, debug=options.debug)
+        parser.writeXSEED(output, version=str(options.version),
+                          split_stations=options.split_stations)
+    except Exception, e:
+        if options.debug and options.workers <= 1:
+            raise
+        return file, time.time() - start, str(e)
+    return file, time.time() - start, None
 
 
 def dataless2xseed(filename, options):
-    if isinstance(filename, list):
-        files = []
-        for item in filename:
-            files.extend(glob(item))
-    else:
-        files = glob(filename)
+    files = findDatalessFiles(filename, options.verbose)
+    workers = getattr(options, 'workers', 1)
+    options.workers = workers
     outdir = False
     outfile = False
     if options.output:
@@ -29,21 +48,9 @@ def dataless2xseed(filename, options):
             sys.stdout.write(msg)
         else:
             outfile = options.output
-    if options.verbose:
-        msg = 'Found %s files.' % len(files) + os.linesep
-        sys.stdout.write(msg)
+    start = time.time()
+    jobs = []
     for file in files:
-        if not os.path.isfile(file):
-            continue
-        f = open(file, 'rb')
-        if f.read(7)[6] != 'V':
-            if options.verbose:
-                msg = 'Skipping file %s' % file
-                msg += '\t-- not a Dataless SEED file' + os.linesep
-                sys.stdout.write(msg)
-            f.close()
-            continue
-        f.close()
         if outdir:
             output = os.path.join(outdir,
                                   os.path.basename(file) + os.extsep + 'xml')
@@ -54,16 +61,9 @@ def dataless2xseed(filename, options):
         if options.verbose:
             msg = 'Parsing file %s' % file + os.linesep
             sys.stdout.write(msg)
-        try:
-            parser = Parser(file, debug=options.debug)
-            parser.writeXSEED(output, version=str(options.version),
-                              split_stations=options.split_stations)
-        except Exception, e:
-            if options.debug:
-                raise
-            msg = '\tError parsing file %s' % file + os.linesep
-            msg += '\t' + str(e) + os.linesep
-            sys.stderr.write(msg)
+        jobs.append((file, output, options))
+    results = runJobs(_writeXSEED, jobs, workers)
+    writeSummary(results, time.time() - start, options.verbose)
 
 
 def main():
@@ -84,6 +84,10 @@ def main():
                       help="output filename or directory")
     parser.add_option("-v", "--version", dest="version", default=1.1,
                       help="XML-SEED version, 1.0 or 1.1", type="float")
+    parser.add_option("-j", "--workers", dest="workers", default=1,
+                      type="int",
+                      help="number of worker processes converting files in "
+                           "parallel")
     (options, args) = parser.parse_args()
     if len(args) == 0:
         parser.print_help()
@@ -12,10 +12,15 @@ from obspy.xseed.parser import Parser
 from obspy.xseed.utils import compareSEED, SEEDParserException
 import gzip
 import os
+import time
 import unittest
 import warnings
 
 
+# some debug flags
+SHOW_BENCHMARK = False
+
+
 class ParserTestCase(unittest.TestCase):
     """
     Parser test suite.
@@ -474,6 +479,160 @@ class ParserTestCase(unittest.TestCase):
         p._select(p.getInventory()["channels"][0]["channel_id"])
         self.assertEqual(p._format, "XSEED")
 
+    def test_selectIndex(self):
+        """
+        Channel lookups through the index of channel epochs find the same
+        blockettes as a linear search over all stations.
+        """
+        def select_linear(parser, net, sta, loc, cha, dt):
+            found = []
+            for station in parser.stations:
+                b50 = None
+                for i, blk in enumerate(station):
+                    if blk.id == 50:
+                        b50 = blk
+                        if blk.network_code != net or \
+                           blk.station_call_letters != sta or \
+                           blk.start_effective_date > dt or \
+                           (blk.end_effective_date and
+                                blk.end_effective_date < dt):
+                            b50 = None
+                    elif blk.id == 52 and b50 is not None and \
+                            blk.location_identifier == loc and \
+                            blk.channel_identifier == cha and \
+                            blk.start_date <= dt and \
+                            (not blk.end_date or blk.end_date >= dt):
+                        blockettes = [b50, blk]
+                        for blk in station[i + 1:]:
+                            if blk.id in (50, 52):
+                                break
+                            blockettes.append(blk)
+                        found.append(blockettes)
+            return found
+
+        for filename in ['dataless.seed.BW_RJOB', 'G.SPB.dataless',
+                         'dataless.seed.BW_FURT.xml']:
+            parser = Parser(os.path.join(self.path, filename))
+            for channel in parser.getInventory()['channels']:
+                seed_id = channel['channel_id']
+                start = channel['start_date']
+                end = channel['end_date']
+                dates = [start - 1, start, start + 1]
+                if end:
+                    dates += [end - 1, end, end + 1]
+                for dt in dates:
+                    expected = select_linear(parser, *(seed_id.split('.') +
+                                                       [dt]))
+                    if len(expected) == 1:
+                        self.assertEqual(parser._select(seed_id, dt),
+                                         expected[0])
+                    else:
+                        self.assertRaises(SEEDParserException,
+                                          parser._select, seed_id, dt)
+        # XSEED volumes are converted only once for all lookups
+        parser = Parser(os.path.join(self.path, 'dataless.seed.BW_FURT.xml'))
+        parser.getPAZ('BW.FURT..EHZ')
+        stations = parser.stations
+        parser.getPAZ('BW.FURT..EHN')
+        parser.getCoordinates('BW.FURT..EHE')
+        self.assertTrue(parser.stations is stations)
+        # index is rebuilt after reading another volume
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("ignore", UserWarning)
+            parser.read(os.path.join(self.path, 'dataless.seed.BW_RJOB'))
+        self.assertRaises(SEEDParserException, parser.getPAZ, 'BW.FURT..EHZ')
+        parser.getPAZ('BW.RJOB..EHZ', UTCDateTime('2010-01-01'))
+
+    def test_responseCache(self):
+        """
+        Extracted responses are cached per channel epoch.
+        """
+        filename = os.path.join(self.path, 'dataless.seed.BW_RJOB')
+        dt1 = UTCDateTime("2007-01-01")
+        dt2 = UTCDateTime("2010-01-01")
+        # responses are not cached by default
+        sp = Parser(filename)
+        paz1 = sp.getPAZ("BW.RJOB..EHZ", dt1)
+        self.assertEqual(len(sp._cache), 0)
+        for blk in sp.blockettes[58]:
+            blk.sensitivity_gain *= 2
+        self.assertEqual(sp.getPAZ("BW.RJOB..EHZ", dt1)['sensitivity'],
+                         2 * paz1['sensitivity'])
+        sp = Parser(filename, cache_size=16)
+        paz1 = sp.getPAZ("BW.RJOB..EHZ", dt1)
+        self.assertEqual(sp._cache.info()['size'], 1)
+        # returned dictionaries are copies of the cached ones
+        paz1['poles'].append(0j)
+        paz2 = sp.getPAZ("BW.RJOB..EHZ", dt1 + 3600)
+        self.assertEqual(len(paz2['poles']), 3)
+        self.assertEqual((sp._cache.hits, sp._cache.misses), (1, 1))
+        # bulk request
+        requests = [("BW.RJOB..EHZ", dt2), ("BW.RJOB..EHZ", dt1),
+                    ("BW.RJOB..EHN", dt2)]
+        result = sp.getPAZBulk(requests)
+        self.assertEqual(result, [sp.getPAZ(*r) for r in requests])
+        self.assertEqual(result[0]['seismometer_gain'], 1500.0)
+        self.assertEqual(result[1], paz2)
+        self.assertRaises(SEEDParserException, sp.getPAZBulk,
+                          [("BW.RJOB..EHZ", dt1), "BW.RJOB..BHZ"])
+        # coordinates and RESP files
+        coords = sp.getCoordinates("BW.RJOB..EHZ", dt1)
+        self.assertEqual(sp.getCoordinates("BW.RJOB..EHZ", dt1), coords)
+        resp1 = [(f, r.getvalue()) for f, r in sp.getRESP()]
+        resp2 = [(f, r.getvalue()) for f, r in sp.getRESP()]
+        self.assertEqual(resp1, resp2)
+        # explicit invalidation after changing blockettes
+        for blk in sp.blockettes[58]:
+            blk.sensitivity_gain *= 2
+        self.assertEqual(sp.getPAZ("BW.RJOB..EHZ", dt1), paz2)
+        sp.clearCache()
+        self.assertEqual(len(sp._cache), 0)
+        paz3 = sp.getPAZ("BW.RJOB..EHZ", dt1)
+        self.assertEqual(paz3['sensitivity'], 2 * paz2['sensitivity'])
+        # warnings are issued again for cached responses
+        for blk in sp.blockettes[53]:
+            blk.transfer_function_types = 'X'
+        sp.clearCache()
+        for _i in range(2):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always", UserWarning)
+                sp.getPAZ("BW.RJOB..EHZ", dt1)
+            self.assertEqual(len(w), 1)
+
+    def test_lazyParsing(self):
+        """
+        Blockettes of station control headers are parsed on first access.
+        """
+        filename = os.path.join(self.path, 'nied.dataless.gz')
+        data = gzip.open(filename).read()
+        start = time.time()
+        eager = Parser(StringIO(data))
+        eager_time = time.time() - start
+        start = time.time()
+        lazy = Parser(StringIO(data), lazy=True)
+        lazy_time = time.time() - start
+        blockettes = [blk for station in lazy.stations for blk in station]
+        self.assertTrue(all('_lazy_seed' in blk.__dict__
+                            for blk in blockettes if blk.id != 60))
+        # lookups parse only the needed blockettes
+        seed_id = eager.getInventory()['channels'][0]['channel_id']
+        self.assertEqual(lazy.getPAZ(seed_id), eager.getPAZ(seed_id))
+        self.assertEqual(lazy.getCoordinates(seed_id),
+                         eager.getCoordinates(seed_id))
+        parsed = [blk for blk in blockettes if '_lazy_seed' not in
+                  blk.__dict__ and blk.id not in (50, 52, 60)]
+        self.assertTrue(0 < len(parsed) < len(blockettes) / 10)
+        # everything else is parsed when needed
+        self.assertEqual(str(lazy), str(eager))
+        self.assertEqual(lazy.getSEED(), eager.getSEED())
+        for filename in ['dataless.seed.BW_RJOB', 'G.SPB.dataless',
+                         'CL.AIO.dataless']:
+            filename = os.path.join(self.path, filename)
+            self.assertEqual(Parser(filename, lazy=True).getXSEED(),
+                             Parser(filename).getXSEED())
+        if SHOW_BENCHMARK:
+            print "eager: %.3f s, lazy: %.3f s" % (eager_time, lazy_time)
+
     def test_createRESPFromXSEED(self):
         """
         Tests RESP file creation from XML-SEED.
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.xseed.scripts test suite.
+"""
+
+from StringIO import StringIO
+from obspy.xseed.parser import Parser
+from obspy.xseed.scripts.dataless2resp import dataless2resp, \
+    _splitStations
+from obspy.xseed.scripts.dataless2xseed import dataless2xseed
+from optparse import Values
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import warnings
+
+
+class ScriptsTestCase(unittest.TestCase):
+    """
+    Test cases for the dataless2resp and dataless2xseed scripts.
+    """
+    def setUp(self):
+        # directory where the test files are located
+        self.path = os.path.join(os.path.dirname(__file__), 'data')
+        self.files = ['dataless.seed.BW_FURT', 'dataless.seed.BW_MANZ',
+                      'dataless.seed.BW_RJOB', 'G.SPB.dataless']
+        self.tempdir = tempfile.mkdtemp()
+        self.indir = os.path.join(self.tempdir, 'in')
+        os.mkdir(self.indir)
+        for file in self.files:
+            shutil.copy(os.path.join(self.path, file), self.indir)
+        # broken and non dataless files
+        open(os.path.join(self.indir, 'broken'), 'wb').write(
+            open(os.path.join(self.path, 'G.SPB.dataless'), 'rb').read(4000))
+        open(os.path.join(self.indir, 'other'), 'wb').write('x' * 100)
+        self.cwd = os.getcwd()
+        self.stdout = sys.stdout
+        self.stderr = sys.stderr
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        sys.stdout = self.stdout
+        sys.stderr = self.stderr
+        shutil.rmtree(self.tempdir)
+
+    def _run(self, func, filename, folder, **kwargs):
+        """
+        Runs script function within given folder, returns stdout and stderr.
+        """
+        options = Values(dict(debug=False, verbose=True, zipped=False,
+                              workers=1, output=None, version=1.1,
+                              split_stations=False))
+        options._update_loose(kwargs)
+        os.mkdir(folder)
+        os.chdir(folder)
+        sys.stdout = StringIO()
+        sys.stderr = StringIO()
+        try:
+            func(filename, options)
+            return sys.stdout.getvalue(), sys.stderr.getvalue()
+        finally:
+            sys.stdout = self.stdout
+            sys.stderr = self.stderr
+            os.chdir(self.cwd)
+
+    def _readFolder(self, folder):
+        return dict((f, open(os.path.join(folder, f)).read())
+                    for f in os.listdir(folder))
+
+    def test_dataless2resp(self):
+        """
+        Converting files and stations in parallel gives the same RESP files.
+        """
+        # reference
+        folder = os.path.join(self.tempdir, 'ref')
+        os.mkdir(folder)
+        for file in self.files:
+            Parser(os.path.join(self.indir, file)).writeRESP(folder)
+        expected = self._readFolder(folder)
+        for workers in [1, 3]:
+            folder = os.path.join(self.tempdir, 'out%d' % workers)
+            out, err = self._run(dataless2resp, self.indir, folder,
+                                 workers=workers)
+            self.assertEqual(self._readFolder(folder), expected)
+            self.assertTrue('Converted 4 of 5 files' in out)
+            self.assertTrue('Skipping file %s' % os.path.join(self.indir,
+                                                              'other') in out)
+            self.assertTrue('Error parsing file %s' % os.path.join(
+                self.indir, 'broken') in err)
+        # stations of a single file are distributed, multiple entries of a
+        # station are written into the same RESP files
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("ignore", UserWarning)
+            parser = Parser(os.path.join(self.indir, self.files[0]))
+            for file in self.files[1:3] + self.files[2:3]:
+                data = open(os.path.join(self.indir, file), 'rb').read()
+                parser._parseSEED(StringIO(data))
+        filename = os.path.join(self.tempdir, 'multi')
+        parser.writeSEED(filename)
+        self.assertEqual(len(_splitStations(filename, 3)), 3)
+        folder = os.path.join(self.tempdir, 'ref_multi')
+        os.mkdir(folder)
+        Parser(filename).writeRESP(folder)
+        expected = self._readFolder(folder)
+        folder = os.path.join(self.tempdir, 'out_multi')
+        out, err = self._run(dataless2resp, filename, folder, workers=3)
+        self.assertEqual(self._readFolder(folder), expected)
+        self.assertTrue('Converted 1 of 1 files' in out)
+        # zipped
+        folder = os.path.join(self.tempdir, 'zipped')
+        self._run(dataless2resp, self.indir, folder, workers=2, zipped=True)
+        self.assertEqual(sorted(os.listdir(folder)),
+                         sorted(f + '.zip' for f in self.files))
+
+    def test_dataless2xseed(self):
+        """
+        Converting files in parallel gives the same XML-SEED files.
+        """
+        for workers in [1, 2]:
+            folder = os.path.join(self.tempdir, 'out%d' % workers)
+            out, err = self._run(dataless2xseed, [self.indir], folder,
+                                 workers=workers)
+            result = self._readFolder(folder)
+            self.assertEqual(sorted(result),
+                             sorted(f + '.xml' for f in self.files))
+            for file in self.files:
+                parser = Parser(os.path.join(self.indir, file))
+                self.assertEqual(result[file + '.xml'], parser.getXSEED())
+            self.assertTrue('Converted 4 of 5 files' in out)
+            self.assertTrue('broken' in err)
+
+
+def suite():
+    return unittest.makeSuite(ScriptsTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
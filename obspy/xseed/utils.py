@@ -10,6 +10,9 @@ Various additional utilities for ObsPy xseed.
 """
 
 from obspy import UTCDateTime
+import errno
+import os
+import stat
 import sys
 
 
@@ -213,3 +216,44 @@ def uniqueList(seq):
     for e in seq:
         keys[e] = 1
     return keys.keys()
+
+
+def writeAtomically(filename, data, mode='wb'):
+    """
+    Writes data into a temporary file which is renamed to given file name
+    afterwards, so the file is either complete or not changed at all.
+    """
+    folder = os.path.dirname(os.path.abspath(filename))
+    prefix = os.path.join(folder, '.' + os.path.basename(filename))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    if 'b' in mode:
+        flags |= getattr(os, 'O_BINARY', 0)
+    # the default mode lets the system apply the umask to the new file
+    while True:
+        temp = '%s.%s' % (prefix, os.urandom(4).encode('hex'))
+        try:
+            fd = os.open(temp, flags, 0666)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+        else:
+            break
+    try:
+        fh = os.fdopen(fd, mode)
+        try:
+            fh.write(data)
+        finally:
+            fh.close()
+        # keep the permissions of an existing file
+        try:
+            os.chmod(temp, stat.S_IMODE(os.stat(filename).st_mode))
+        except OSError:
+            pass
+        # renaming onto an existing file fails on Windows
+        if os.name == 'nt' and os.path.exists(filename):
+            os.remove(filename)
+        os.rename(temp, filename)
+    except:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise